@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+AsyncOpenAI 동시 요청 배치 실행기
+===============================
+
+여러 Chat Completion 요청을 한 번에 보내되,
+- 세마포어로 동시 요청 수를 제한하고
+- 토큰 버킷으로 분당 요청 수(RPM)와 분당 토큰 수(TPM)를 지키며
+- 429/5xx 오류는 지터(jitter)를 넣은 지수 백오프로 재시도합니다.
+
+사용법:
+1. 코드에서 사용:
+   runner = BatchRunner(AsyncOpenAI(), concurrency=8, rpm=500, tpm=200_000, model="gpt-4o-mini")
+   results = runner.run_sync([{"messages": [...]}, ...])
+2. 오프라인 동작 확인 (로컬 스텁 서버 사용): python async_batch_runner.py --requests 50 --error-rate 0.2
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import openai
+from openai import AsyncOpenAI
+
+from token_accounting import DEFAULT_MAX_TOKENS, DEFAULT_MODEL, count_message_tokens
+
+# 재시도할 HTTP 상태 코드
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+def estimate_request_tokens(request: Dict[str, Any]) -> int:
+    """요청 한 건이 소비할 토큰 수 추정 (로컬에서 센 프롬프트 토큰 + 최대 출력 토큰, 실제 사용량은 응답 후 정산)"""
+    prompt = count_message_tokens(request.get("messages", []), request.get("model", DEFAULT_MODEL))
+    return prompt + (request.get("max_tokens") or DEFAULT_MAX_TOKENS)
+
+
+class TokenBucket:
+    """분당 per_minute만큼 채워지고 capacity까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """amount만큼 토큰이 찰 때까지 기다렸다가 차감 (용량보다 큰 요청은 용량만큼만 차감)"""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def refund(self, amount: float) -> None:
+        """추정치와 실제 사용량의 차이 정산 (음수면 추가 차감)"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """RPM과 TPM을 함께 지키는 속도 제한기"""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        await self.requests.acquire(1)
+        await self.tokens.acquire(estimated_tokens)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        self.tokens.refund(estimated_tokens - actual_tokens)
+
+
+@dataclass
+class BatchResult:
+    """요청 한 건의 결과 (index는 입력 순서)"""
+    index: int
+    response: Any = None
+    error: Optional[BaseException] = None
+    attempts: int = 0
+    latency: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def content(self) -> Optional[str]:
+        return self.response.choices[0].message.content if self.ok else None
+
+
+class BatchRunner:
+    """AsyncOpenAI 기반 동시 요청 실행기"""
+
+    def __init__(self, client: Optional[AsyncOpenAI] = None, concurrency: int = 8,
+                 rpm: float = 500, tpm: float = 200_000, max_retries: int = 5,
+                 base_delay: float = 0.5, max_delay: float = 30.0, **defaults):
+        """
+        Args:
+            client: AsyncOpenAI 클라이언트 (없으면 환경변수 설정으로 생성,
+                    재시도는 이 클래스가 하므로 max_retries=0 권장)
+            concurrency: 동시에 진행할 최대 요청 수
+            rpm, tpm: 분당 요청 수 / 분당 토큰 수 한도
+            max_retries: 요청당 최대 재시도 횟수
+            base_delay, max_delay: 백오프 기본/최대 대기 시간(초)
+            defaults: 모든 요청에 공통으로 넣을 인자 (예: model="gpt-4o-mini")
+        """
+        self.client = client or AsyncOpenAI(max_retries=0)
+        self.concurrency = concurrency
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.defaults = defaults
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "tokens": 0}
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+            return True
+        return isinstance(error, openai.APIStatusError) and error.status_code in RETRY_STATUS
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        """재시도 대기 시간 - 서버가 Retry-After를 주면 따르고, 아니면 full jitter 지수 백오프"""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_delay)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def _run_one(self, index: int, request: Dict[str, Any], semaphore: asyncio.Semaphore,
+                       limiter: RateLimiter) -> BatchResult:
+        payload = {**self.defaults, **request}
+        estimate = estimate_request_tokens(payload)
+
+        async with semaphore:
+            started = time.perf_counter()  # 대기열 시간은 빼고 재시도 대기는 포함
+            attempt = 0
+            while True:
+                attempt += 1
+                await limiter.acquire(estimate)
+                try:
+                    response = await self.client.chat.completions.create(**payload)
+                except Exception as error:
+                    limiter.settle(estimate, 0)  # 거절된 요청은 토큰을 쓰지 않음
+                    if not self.is_retryable(error) or attempt > self.max_retries:
+                        self.stats["failures"] += 1
+                        return BatchResult(index, error=error, attempts=attempt,
+                                           latency=time.perf_counter() - started)
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(self.backoff(attempt, error))
+                    continue
+
+                usage = getattr(response, "usage", None)
+                if usage is not None:
+                    limiter.settle(estimate, usage.total_tokens)
+                    self.stats["tokens"] += usage.total_tokens
+                self.stats["requests"] += 1
+                return BatchResult(index, response=response, attempts=attempt,
+                                   latency=time.perf_counter() - started)
+
+    async def run(self, requests: List[Dict[str, Any]],
+                  on_result: Optional[Callable[[BatchResult], None]] = None) -> List[BatchResult]:
+        """
+        요청 목록을 동시에 실행하고 입력 순서대로 결과 반환
+
+        Args:
+            on_result: 요청 한 건이 끝날 때마다(완료 순서대로) 호출할 함수 (예: 체크포인트 저장)
+        """
+        # 세마포어와 버킷은 실행 중인 이벤트 루프에서 만들어야 함
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limiter = RateLimiter(self.rpm, self.tpm)
+
+        async def run_one(index: int, request: Dict[str, Any]) -> BatchResult:
+            result = await self._run_one(index, request, semaphore, limiter)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        return await asyncio.gather(*(run_one(i, request) for i, request in enumerate(requests)))
+
+    def run_sync(self, requests: List[Dict[str, Any]],
+                 on_result: Optional[Callable[[BatchResult], None]] = None) -> List[BatchResult]:
+        """이벤트 루프 밖(일반 스크립트)에서 실행할 때 사용"""
+        return asyncio.run(self.run(requests, on_result))
+
+
+def main():
+    """로컬 스텁 서버를 띄워 재시도/속도 제한 동작 확인"""
+    from mock_openai_server import start_mock_server
+
+    parser = argparse.ArgumentParser(description="AsyncOpenAI 배치 실행기 오프라인 확인")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rpm", type=float, default=600)
+    parser.add_argument("--tpm", type=float, default=200_000)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = start_mock_server(latency=args.latency, error_rate=args.error_rate)
+    client = AsyncOpenAI(base_url=server.base_url, api_key="mock", max_retries=0)
+    runner = BatchRunner(client, concurrency=args.concurrency, rpm=args.rpm, tpm=args.tpm,
+                         base_delay=0.05, model="gpt-4o-mini")
+
+    requests = [{"messages": [{"role": "user", "content": f"{i}번째 질문입니다."}], "max_tokens": 50}
+                for i in range(args.requests)]
+
+    started = time.perf_counter()
+    results = runner.run_sync(requests)
+    elapsed = time.perf_counter() - started
+
+    ok = sum(result.ok for result in results)
+    print(f"✅ 성공 {ok}/{len(results)}건 · 재시도 {runner.stats['retries']}회 · "
+          f"실패 {runner.stats['failures']}건")
+    print(f"⏱️ {elapsed:.2f}초 ({len(results) / elapsed:.1f} req/s), 토큰 {runner.stats['tokens']:,}개")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -16,20 +16,84 @@ import os
 import json
 import time
 import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
 from typing import List, Dict, Any
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+from async_batch_runner import BatchRunner
+from response_cache import ResponseCache, CachedChatClient
+from semantic_cache import OpenAIEmbedder, SemanticCache
+from conversation_memory import TokenBudgetMemory, make_openai_summarizer
+from token_accounting import (AccountedChatClient, BudgetExceeded, UsageTracker, count_message_tokens,
+                              estimate_cost, exact_counting)
+from stream_pipeline import StreamPipeline, console_sink, file_sink, openai_deltas
+from structured_output import StructuredOutputError, stream_structured
 
 # 환경변수 로드
 load_dotenv()
 
+
+@dataclass
+class CityWeather:
+    """구조화 출력 예제: 도시 하나의 날씨"""
+    city: str
+    temperature: float = field(metadata={"description": "섭씨 기온"})
+    condition: str = field(metadata={"description": "맑음, 흐림, 비, 눈 중 하나"})
+
+
+@dataclass
+class WeatherReport:
+    """구조화 출력 예제: 여러 도시의 날씨 보고서"""
+    cities: List[CityWeather]
+    summary: str = field(metadata={"description": "전체 날씨 한 문장 요약"})
+
+
 class ChatCompletionDemo:
     """Chat Completion API 데모 클래스"""
     
-    def __init__(self):
-        """OpenAI 클라이언트 초기화"""
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, base_url: str = None, use_cache: bool = True, use_semantic_cache: bool = False,
+                 session_budget: float = None):
+        """
+        OpenAI 클라이언트 초기화
+
+        Args:
+            base_url: API 서버 주소 (예: 로컬 스텁 서버 "http://127.0.0.1:8000/v1",
+                      없으면 OPENAI_BASE_URL 환경변수 또는 OpenAI 기본 주소)
+            use_cache: 낮은 temperature의 동일한 요청은 저장된 응답을 재사용
+            use_semantic_cache: 정확히 같은 요청이 없을 때 OpenAI 임베딩으로 마지막 질문이 의미상 거의 같은
+                                요청도 재사용 (임베딩 API 호출이 추가되며, use_cache와 함께 켜야 함)
+            session_budget: 세션 전체 비용 한도(USD), 넘는 요청은 보내기 전에 거절
+        """
+        # 요청 전 토큰/비용 계산 - 요청당 4,000 토큰을 넘는 요청은 보내기 전에 거절
+        # (대화 기록을 조용히 잃지 않도록 잘라내기(trim)는 쓰지 않고, 긴 대화는 TokenBudgetMemory로 관리)
+        self.usage = UsageTracker(max_request_tokens=4000, session_budget=session_budget)
+        if use_semantic_cache and not use_cache:
+            raise ValueError("use_semantic_cache는 use_cache=True일 때만 쓸 수 있습니다.")
+        raw_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=base_url)
+        self.client = AccountedChatClient(raw_client, self.usage)
+        self.base_url = base_url
+        self.cache = ResponseCache() if use_cache else None
+        self.semantic_cache = SemanticCache(embedder=OpenAIEmbedder(raw_client)) if use_semantic_cache else None
+        if self.cache:
+            self.client = CachedChatClient(self.client, self.cache, self.semantic_cache)
         self.model = "gpt-4o-mini"  # 비용 효율적인 모델 사용
+
+    @asynccontextmanager
+    async def async_client(self):
+        """
+        여러 요청을 동시에 보낼 때 쓰는 AsyncOpenAI 클라이언트 (재시도는 BatchRunner가 담당)
+
+        httpx 연결 풀은 만든 이벤트 루프에 묶이므로 asyncio.run()마다 그 안에서 새로 만들고 닫습니다.
+        """
+        client = AccountedChatClient(
+            AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=self.base_url, max_retries=0), self.usage)
+        if self.cache:
+            client = CachedChatClient(client, self.cache, self.semantic_cache)
+        try:
+            yield client
+        finally:
+            await client.close()
         
     def basic_chat_completion(self) -> None:
         """기본 Chat Completion 예제"""
@@ -182,39 +246,40 @@ class ChatCompletionDemo:
         print("📋 출력 포맷 제어 예제")
         print("=" * 50)
         
-        # JSON 형식 출력 요청
+        # 스키마(WeatherReport)를 response_format으로 넘기고 스트리밍으로 받기
         messages = [
-            {"role": "system", "content": "당신은 정확한 JSON 형식으로 응답하는 어시스턴트입니다."},
+            {"role": "system", "content": "당신은 날씨 정보를 정리하는 어시스턴트입니다."},
             {"role": "user", "content": """
-다음 정보를 JSON 형식으로 정리해주세요:
+다음 정보를 정리해주세요:
 
 서울과 부산 두 도시의 예상 날씨 정보
 - 서울: 기온 22도, 맑음
 - 부산: 기온 25도, 흐림
-
-JSON 형식으로 응답해주세요.
 """}
         ]
-        
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.1,
-            max_tokens=200
-        )
-        
-        print("📄 JSON 형식 출력:")
+
+        print("📄 완성되는 대로 받은 필드:")
         try:
-            # JSON 파싱 가능한지 확인
-            json_str = response.choices[0].message.content.strip()
-            if json_str.startswith('```json'):
-                json_str = json_str.replace('```json', '').replace('```', '').strip()
-            
-            parsed_json = json.loads(json_str)
-            print(json.dumps(parsed_json, indent=2, ensure_ascii=False))
-        except json.JSONDecodeError:
-            print("원본 응답:")
-            print(response.choices[0].message.content)
+            stream = stream_structured(
+                self.client,
+                WeatherReport,
+                model=self.model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=200
+            )
+            for event in stream:
+                # 도시 객체와 요약처럼 화면에 바로 쓸 수 있는 단위만 출력
+                if len(event.path) == 2 and event.path[0] == "cities":
+                    print(f"   ⏱️ {event.elapsed:.2f}초  {event.name}: {event.value}")
+                elif event.path == ("summary",):
+                    print(f"   ⏱️ {event.elapsed:.2f}초  summary: {event.value}")
+        except StructuredOutputError as e:
+            print(f"❌ 스키마와 맞지 않는 응답: {e}")
+            return
+
+        print(f"\n✅ 검증된 결과 (첫 필드 {stream.first_field:.2f}초):")
+        print(json.dumps(asdict(stream.result), indent=2, ensure_ascii=False))
 
     def conversation_memory_demo(self) -> None:
         """대화 메모리 관리 예제"""
@@ -222,41 +287,38 @@ JSON 형식으로 응답해주세요.
         print("💭 대화 메모리 관리 예제")
         print("=" * 50)
         
-        # 대화 히스토리를 누적하는 방식
-        messages = [
-            {"role": "system", "content": "당신은 여행 전문가입니다. 고객의 여행 계획을 도와주세요."}
-        ]
-        
-        # 첫 번째 질문
-        messages.append({"role": "user", "content": "부산 여행에서 꼭 가봐야 할 곳 하나만 추천해주세요."})
-        
-        response1 = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.7,
-            max_tokens=200
+        # 토큰 예산을 넘으면 오래된 대화를 요약으로 접는 메모리
+        # (시스템 프롬프트 + 요약 접두부는 그대로 유지되어 프롬프트 캐시에 유리)
+        memory = TokenBudgetMemory(
+            "당신은 여행 전문가입니다. 고객의 여행 계획을 도와주세요.",
+            make_openai_summarizer(self.client, self.model),
+            max_prompt_tokens=400,
+            keep_recent=1
         )
         
-        print("👤 사용자: 부산 여행에서 꼭 가봐야 할 곳 하나만 추천해주세요.")
-        print(f"🤖 AI: {response1.choices[0].message.content}")
-        
-        # AI 응답을 대화 히스토리에 추가
-        messages.append({"role": "assistant", "content": response1.choices[0].message.content})
-        
-        # 두 번째 질문 (맥락 유지)
-        messages.append({"role": "user", "content": "거기까지 부산역에서 어떻게 가나요?"})
-        
-        response2 = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.7,
-            max_tokens=200
-        )
+        questions = [
+            "부산 여행에서 꼭 가봐야 할 곳 하나만 추천해주세요.",
+            "거기까지 부산역에서 어떻게 가나요?",
+            "근처에 점심 먹을 만한 곳도 있을까요?",
+            "처음에 추천해주신 곳 이름이 뭐였죠?"
+        ]
         
-        print("\n👤 사용자: 거기까지 부산역에서 어떻게 가나요?")
-        print(f"🤖 AI: {response2.choices[0].message.content}")
+        for question in questions:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=memory.build(question),
+                temperature=0.7,
+                max_tokens=200
+            )
+            reply = response.choices[0].message.content
+            
+            print(f"\n👤 사용자: {question}")
+            print(f"🤖 AI: {reply}")
+            
+            # AI 응답을 대화 히스토리에 추가 (턴별 토큰 수도 기록)
+            memory.add_turn(question, reply, response.usage)
         
-        print(f"\n📊 총 메시지 수: {len(messages)}")
+        memory.print_report()
 
     def parameter_comparison(self) -> None:
         """매개변수 비교 예제"""
@@ -266,25 +328,26 @@ JSON 형식으로 응답해주세요.
         
         prompt = "창의적인 단편소설 아이디어 하나를 제안해주세요."
         
-        # Temperature 비교
+        # Temperature 비교 - 세 요청을 동시에 보내고 (속도 제한/재시도는 BatchRunner가 처리)
         temperatures = [0.1, 0.7, 1.5]
+        messages = [
+            {"role": "system", "content": "당신은 창의적인 작가입니다."},
+            {"role": "user", "content": prompt}
+        ]
         
-        for temp in temperatures:
-            messages = [
-                {"role": "system", "content": "당신은 창의적인 작가입니다."},
-                {"role": "user", "content": prompt}
-            ]
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temp,
-                max_tokens=150
-            )
-            
-            print(f"\n🌡️ Temperature {temp}:")
-            print(response.choices[0].message.content)
-            time.sleep(1)  # API 호출 제한 고려
+        async def compare():
+            async with self.async_client() as client:
+                runner = BatchRunner(client, concurrency=len(temperatures), model=self.model)
+                return await runner.run([
+                    {"messages": messages, "temperature": temp, "max_tokens": 150}
+                    for temp in temperatures
+                ])
+
+        results = asyncio.run(compare())
+        
+        for temp, result in zip(temperatures, results):
+            print(f"\n🌡️ Temperature {temp} ({result.latency:.2f}초):")
+            print(result.content if result.ok else f"❌ 오류 발생: {result.error}")
 
     def streaming_response(self) -> None:
         """스트리밍 응답 예제"""
@@ -300,24 +363,30 @@ JSON 형식으로 응답해주세요.
         print("🔄 실시간 스트리밍 응답:")
         print("-" * 30)
         
-        try:
-            stream = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=300,
-                stream=True
-            )
-            
-            for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
-                    print(chunk.choices[0].delta.content, end='', flush=True)
-                    
-            print("\n" + "-" * 30)
+        # 응답 조각을 콘솔과 파일에 동시에 전달 (느린 소비자가 있어도 스트림 읽기는 멈추지 않음)
+        async def stream():
+            async with self.async_client() as client:
+                pipeline = StreamPipeline(openai_deltas(
+                    client,
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=300
+                ))
+                pipeline.attach(console_sink)
+                pipeline.attach(file_sink(".cache/streams/chat_completion.txt"))
+                return await pipeline.run(timeout=60)
+
+        result = asyncio.run(stream())
+        
+        print("-" * 30)
+        if result.error:
+            print(f"❌ 스트리밍 오류: {result.error}")
+        elif result.cancelled:
+            print(f"⏹️ 시간 초과로 중단 ({len(result.text)}자까지 수신)")
+        else:
             print("✅ 스트리밍 완료")
-            
-        except Exception as e:
-            print(f"❌ 스트리밍 오류: {e}")
+        print(f"⏱️ {result.metrics.summary()}")
 
     def token_counting_demo(self) -> None:
         """토큰 사용량 모니터링 예제"""
@@ -329,27 +398,37 @@ JSON 형식으로 응답해주세요.
             {"role": "system", "content": "당신은 효율적인 응답을 제공하는 어시스턴트입니다."},
             {"role": "user", "content": "Python에서 리스트와 튜플의 차이점을 설명해주세요."}
         ]
+        max_tokens = 200
+        
+        # 보내기 전에 로컬 토크나이저로 계산
+        prompt_tokens = count_message_tokens(messages, self.model)
+        approx = "" if exact_counting(self.model) else " (tiktoken 없음 - 글자 수 기반 근사치)"
+        print("🧮 요청 전 계산:")
+        print(f"   - 프롬프트 토큰: {prompt_tokens}{approx}")
+        print(f"   - 최대 예상 비용: ${estimate_cost(self.model, prompt_tokens, max_tokens):.6f} "
+              f"(출력 {max_tokens} 토큰을 모두 쓰는 경우)")
         
         response = self.client.chat.completions.create(
             model=self.model,
             messages=messages,
             temperature=0.5,
-            max_tokens=200
+            max_tokens=max_tokens
         )
         
         usage = response.usage
         print(f"📊 토큰 사용량 분석:")
-        print(f"   - 프롬프트 토큰: {usage.prompt_tokens}")
+        print(f"   - 프롬프트 토큰: {usage.prompt_tokens} (로컬 계산 {prompt_tokens})")
         print(f"   - 완료 토큰: {usage.completion_tokens}")
         print(f"   - 총 토큰: {usage.total_tokens}")
+        print(f"💰 실제 비용: ${estimate_cost(self.model, usage.prompt_tokens, usage.completion_tokens):.6f}")
         
-        # 대략적인 비용 계산 (gpt-4o-mini 기준)
-        # 입력: $0.00015 / 1K tokens, 출력: $0.0006 / 1K tokens
-        input_cost = (usage.prompt_tokens / 1000) * 0.00015
-        output_cost = (usage.completion_tokens / 1000) * 0.0006
-        total_cost = input_cost + output_cost
+        # 예산을 넘는 요청은 네트워크 호출 없이 바로 거절됨
+        strict = UsageTracker(max_request_tokens=100)
+        try:
+            strict.preflight({"model": self.model, "messages": messages, "max_tokens": max_tokens})
+        except BudgetExceeded as e:
+            print(f"🚫 요청당 100 토큰 한도였다면 보내기 전에 거절: {e}")
         
-        print(f"💰 예상 비용: ${total_cost:.6f}")
         print(f"\n📝 응답 내용:")
         print(response.choices[0].message.content)
 
@@ -378,13 +457,19 @@ JSON 형식으로 응답해주세요.
         for i, (name, demo_func) in enumerate(demos, 1):
             try:
                 print(f"\n\n📌 [{i}/{len(demos)}] {name} 실행 중...")
-                demo_func()
+                with self.usage.scope(name):
+                    demo_func()
                 time.sleep(2)  # API 호출 제한 고려
             except Exception as e:
                 print(f"❌ {name} 실행 중 오류: {e}")
                 continue
         
         print("\n\n🎉 모든 데모 실행 완료!")
+        self.usage.print_report()
+        if self.cache:
+            self.cache.print_report()
+        if self.semantic_cache:
+            self.semantic_cache.print_report()
         print("\n💡 실습 포인트:")
         print("   1. 각 프롬프트 기법의 차이점을 비교해보세요")
         print("   2. Temperature 값에 따른 응답 변화를 관찰하세요")
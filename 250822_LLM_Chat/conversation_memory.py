@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+토큰 예산 기반 대화 메모리
+========================
+
+대화가 길어질수록 매 요청의 프롬프트 토큰(과 지연 시간)이 계속 늘어나는 문제를 막기 위해,
+- 보낼 메시지의 토큰 수를 로컬에서 세고
+- 예산(max_prompt_tokens)을 넘으면 오래된 대화를 요약 한 개로 접어 넣으며
+- [시스템 프롬프트, 요약] 접두부는 다음 요약 전까지 바이트 단위로 똑같이 유지해서
+  OpenAI 프롬프트 캐싱(같은 접두부 재사용)이 잘 걸리도록 합니다.
+요약은 예산을 넘을 때마다 조금씩이 아니라 low_water 비율까지 한 번에 접으므로 자주 바뀌지 않습니다.
+
+사용법:
+    memory = TokenBudgetMemory("당신은 여행 전문가입니다.", make_openai_summarizer(client, "gpt-4o-mini"),
+                               max_prompt_tokens=1000)
+    messages = memory.build("부산 여행지 추천해주세요.")
+    response = client.chat.completions.create(model=..., messages=messages)
+    memory.add_turn("부산 여행지 추천해주세요.", response.choices[0].message.content, response.usage)
+    memory.print_report()
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from token_accounting import count_message_tokens
+
+SUMMARY_PREFIX = "지금까지의 대화 요약:\n"
+
+SUMMARY_PROMPT = (
+    "다음은 사용자와 어시스턴트의 대화입니다. 이후 대화에 필요한 사실(사용자의 목적, 조건, "
+    "이미 추천하거나 답한 내용, 고유명사)을 빠짐없이 남기고 나머지는 생략해서 "
+    "{max_words}단어 이내의 한국어로 요약해주세요."
+)
+
+
+def format_transcript(turns: List[Dict[str, str]]) -> str:
+    names = {"user": "사용자", "assistant": "어시스턴트"}
+    return "\n".join(f"{names.get(m['role'], m['role'])}: {m['content']}" for m in turns)
+
+
+def summary_messages(summary: str, turns: List[Dict[str, str]], max_tokens: int) -> List[Dict[str, str]]:
+    """(이전 요약, 접을 대화)로 요약 요청 메시지 구성"""
+    transcript = format_transcript(turns)
+    if summary:
+        transcript = f"[이전 요약]\n{summary}\n\n[이어지는 대화]\n{transcript}"
+    return [
+        {"role": "system", "content": SUMMARY_PROMPT.format(max_words=max_tokens // 2)},
+        {"role": "user", "content": transcript},
+    ]
+
+
+def make_openai_summarizer(client, model: str, max_tokens: int = 300) -> Callable[[str, List[Dict]], str]:
+    """
+    OpenAI 클라이언트로 (이전 요약, 접을 대화) -> 새 요약을 만드는 함수 생성
+
+    temperature=0으로 호출하므로 CachedChatClient를 넘기면 같은 요약 요청은 캐시에서 재사용됩니다.
+    """
+    def summarize(summary: str, turns: List[Dict[str, str]]) -> str:
+        response = client.chat.completions.create(
+            model=model,
+            messages=summary_messages(summary, turns, max_tokens),
+            temperature=0,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content.strip()
+
+    return summarize
+
+
+def make_langchain_summarizer(llm, max_tokens: int = 300) -> Callable[[str, List[Dict]], str]:
+    """LangChain 채팅 모델로 요약 함수 생성 (temperature=0으로 묶어 호출)"""
+    summarizer = llm.bind(temperature=0, max_tokens=max_tokens)
+
+    def summarize(summary: str, turns: List[Dict[str, str]]) -> str:
+        return summarizer.invoke(summary_messages(summary, turns, max_tokens)).content.strip()
+
+    return summarize
+
+
+class TokenBudgetMemory:
+    """시스템 프롬프트 + 누적 요약 + 최근 대화로 프롬프트를 구성하는 메모리"""
+
+    def __init__(self, system_prompt: str, summarize: Callable[[str, List[Dict]], str],
+                 max_prompt_tokens: int = 1500, keep_recent: int = 2, low_water: float = 0.6,
+                 count_tokens: Callable[[List[Dict]], int] = count_message_tokens):
+        """
+        Args:
+            system_prompt: 항상 맨 앞에 두는 시스템 메시지
+            summarize: (이전 요약, 접을 대화 메시지 목록) -> 새 요약 문자열
+            max_prompt_tokens: 새 질문까지 포함한 프롬프트 토큰 예산
+            keep_recent: 요약하지 않고 그대로 남길 최근 대화 턴 수
+            low_water: 요약할 때 예산의 이 비율 이하가 될 때까지 한 번에 접음
+            count_tokens: 메시지 목록 -> 토큰 수 (로컬 토크나이저로 바꿔 끼울 수 있음)
+        """
+        self.system_prompt = system_prompt
+        self.summarize = summarize
+        self.max_prompt_tokens = max_prompt_tokens
+        self.keep_recent = keep_recent
+        self.low_water = low_water
+        self.count_tokens = count_tokens
+        self.summary = ""
+        self.turns = []  # 요약되지 않은 최근 대화 [(user 메시지, assistant 메시지), ...]
+        self.full_history = []  # 비교용: 아무것도 버리지 않았을 때의 전체 대화
+        self.history = []  # 턴별 기록
+        self.compactions = 0
+
+    def prefix(self) -> List[Dict[str, str]]:
+        """[시스템, 요약] 접두부 - 요약이 바뀌기 전까지 내용이 그대로라 프롬프트 캐시에 적중"""
+        messages = [{"role": "system", "content": self.system_prompt}]
+        if self.summary:
+            messages.append({"role": "system", "content": SUMMARY_PREFIX + self.summary})
+        return messages
+
+    def _messages(self, user_input: str) -> List[Dict[str, str]]:
+        recent = [message for turn in self.turns for message in turn]
+        return self.prefix() + recent + [{"role": "user", "content": user_input}]
+
+    def _compact(self, user_input: str) -> None:
+        """예산을 넘으면 오래된 턴부터 low_water 이하가 될 때까지 모아서 한 번에 요약"""
+        if self.count_tokens(self._messages(user_input)) <= self.max_prompt_tokens:
+            return
+        target = self.max_prompt_tokens * self.low_water
+        folded = []
+        while len(self.turns) > self.keep_recent:
+            folded.extend(self.turns.pop(0))
+            if self.count_tokens(self._messages(user_input)) <= target:
+                break
+        if folded:
+            self.summary = self.summarize(self.summary, folded)
+            self.compactions += 1
+
+    def build(self, user_input: str) -> List[Dict[str, str]]:
+        """예산에 맞춘 이번 요청 메시지 목록"""
+        self._compact(user_input)
+        return self._messages(user_input)
+
+    def add_turn(self, user_input: str, reply: str, usage: Any = None) -> None:
+        """
+        응답을 받은 뒤 대화를 저장하고 턴별 토큰 수를 기록
+
+        Args:
+            usage: 응답의 usage (OpenAI CompletionUsage 또는 LangChain usage_metadata dict) - 있으면
+                   실제 프롬프트 토큰과 캐시된 토큰 수를 함께 기록
+        """
+        sent = self._messages(user_input)
+        turn = ({"role": "user", "content": user_input}, {"role": "assistant", "content": reply})
+        full = [{"role": "system", "content": self.system_prompt}] + self.full_history + [turn[0]]
+        self.history.append({
+            "turn": len(self.history) + 1,
+            "prompt_tokens": self.count_tokens(sent),
+            "full_tokens": self.count_tokens(full),
+            "api_prompt_tokens": _usage_value(usage, "prompt_tokens", "input_tokens"),
+            "cached_tokens": _cached_tokens(usage),
+            "summarized": bool(self.summary),
+        })
+        self.turns.append(turn)
+        self.full_history.extend(turn)
+
+    def print_report(self) -> None:
+        print("\n🧮 턴별 프롬프트 토큰 (로컬 추정 / API 보고 / 캐시 적중):")
+        for row in self.history:
+            api = row["api_prompt_tokens"] if row["api_prompt_tokens"] is not None else "-"
+            cached = row["cached_tokens"] if row["cached_tokens"] is not None else "-"
+            note = " (요약 사용)" if row["summarized"] else ""
+            print(f"   - {row['turn']}턴: {row['prompt_tokens']:>5} / {api:>5} / {cached:>5}  "
+                  f"[전체 기록이었다면 {row['full_tokens']}]{note}")
+        if self.history:
+            sent = sum(row["prompt_tokens"] for row in self.history)
+            full = sum(row["full_tokens"] for row in self.history)
+            print(f"   - 합계: {sent:,} 토큰 (전체 기록 방식 {full:,} 토큰), 요약 {self.compactions}회, "
+                  f"예산 {self.max_prompt_tokens} 토큰")
+
+
+def _usage_value(usage: Any, *names: str) -> Optional[Any]:
+    for name in names:
+        value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+        if value is not None:
+            return value
+    return None
+
+
+def _cached_tokens(usage: Any) -> Optional[int]:
+    """프롬프트 캐시에서 재사용된 토큰 수 (OpenAI: prompt_tokens_details, LangChain: input_token_details)"""
+    details = _usage_value(usage, "prompt_tokens_details", "input_token_details")
+    return _usage_value(details, "cached_tokens", "cache_read") if details is not None else None
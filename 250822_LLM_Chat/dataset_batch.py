@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+데이터셋 배치 프롬프트 작업
+=========================
+
+DataFrame의 행마다 프롬프트를 만들어 LLM에 보내는 대량 작업 실행기입니다.
+- 열 이름을 자리표시자로 쓰는 템플릿({Make}, {co2:.0f} 등)으로 행별 메시지를 만들고
+- 내용이 똑같은 프롬프트는 한 번만 보내서 그 결과를 해당하는 행 모두에 채우며
+- BatchRunner(동시 요청 수 제한, RPM/TPM 토큰 버킷, 재시도)로 비동기 동시 실행하고
+- 끝난 요청은 즉시 체크포인트 파일(.cache/batch_jobs/<이름>.jsonl)에 추가하므로
+  중단된 뒤 다시 실행하면 남은 요청만 보냅니다 (실패한 요청도 다시 실행할 때 재시도).
+끝나면 처리량(요청/초, 행/초), 지연 시간, 토큰·비용(token_accounting 단가표) 보고서를 출력합니다.
+
+사용법:
+    async with AsyncOpenAI(max_retries=0) as client:       # 클라이언트는 실행할 이벤트 루프 안에서 만들고 닫음
+        job = DatasetBatchJob(
+            "co2_by_make",
+            BatchRunner(client, concurrency=8, model="gpt-4o-mini", max_tokens=150),
+            user_template=CO2_TEMPLATE,
+            system_prompt="당신은 자동차 환경 데이터 분석가입니다.",
+        )
+        result = await job.run(co2_by_make())     # 입력 DataFrame + "response" 열
+    job.print_report()
+
+    python dataset_batch.py --dataset covid --limit 10    # 로컬 모의 서버로 동작 확인 (다시 실행하면 체크포인트 재사용)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from openai import AsyncOpenAI
+
+from async_batch_runner import BatchResult, BatchRunner
+from response_cache import cache_key
+from token_accounting import DEFAULT_MODEL, estimate_cost
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "dataset")
+CHECKPOINT_DIR = ".cache/batch_jobs"
+
+CO2_TEMPLATE = (
+    "자동차 제조사 {Make}: 모델 {models}종, 평균 CO2 배출량 {co2:.0f}g/km, "
+    "평균 복합 연비 {fuel:.1f}L/100km. 이 제조사의 친환경성을 한두 문장으로 평가해주세요."
+)
+
+# 차량(행) 단위 템플릿 - 같은 제조사·차급의 차량은 프롬프트가 같아 요청 한 번으로 처리됨
+VEHICLE_CLASS_TEMPLATE = "{Make}의 {Vehicle Class} 차급 차량을 고려하는 구매자에게 연비 관점의 조언을 한 문장으로 해주세요."
+
+COVID_TEMPLATE = (
+    "인도 {region} 지역의 {date} 기준 누적 확진 {confirmed:,}명, 완치 {cured:,}명, "
+    "사망 {deaths:,}명(치명률 {fatality:.2f}%)입니다. 이 지역의 상황을 한두 문장으로 요약해주세요."
+)
+
+
+def load_dataset(name: str) -> pd.DataFrame:
+    """저장소 dataset/ 폴더의 CSV 읽기"""
+    return pd.read_csv(os.path.join(DATASET_DIR, name))
+
+
+def co2_by_make() -> pd.DataFrame:
+    """CO2_Emissions.csv -> 제조사별 모델 수, 평균 CO2 배출량, 평균 복합 연비"""
+    frame = load_dataset("CO2_Emissions.csv")
+    return frame.groupby("Make").agg(
+        models=("Model", "nunique"),
+        co2=("CO2 Emissions(g/km)", "mean"),
+        fuel=("Fuel Consumption Comb (L/100 km)", "mean"),
+    ).reset_index()
+
+
+def covid_by_region() -> pd.DataFrame:
+    """Covid19-India.csv -> 지역별 마지막 날짜의 누적 수치와 치명률"""
+    frame = load_dataset("Covid19-India.csv")
+    latest = frame.sort_values("date").groupby("region").tail(1).reset_index(drop=True)
+    latest["fatality"] = latest["deaths"] / latest["confirmed"].clip(lower=1) * 100
+    return latest
+
+
+@dataclass
+class BatchJobReport:
+    """배치 작업 한 번 실행의 집계 (토큰·비용은 이번 실행에서 보낸 요청만)"""
+    rows: int = 0
+    unique_prompts: int = 0
+    resumed: int = 0  # 체크포인트에서 재사용한 프롬프트 수
+    sent: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+class DatasetBatchJob:
+    """DataFrame 행 -> 프롬프트 -> 응답 열을 만드는 재개 가능한 배치 작업"""
+
+    def __init__(self, name: str, runner: BatchRunner, user_template: str, system_prompt: Optional[str] = None,
+                 output_column: str = "response", checkpoint_dir: str = CHECKPOINT_DIR, **params):
+        """
+        Args:
+            name: 작업 이름 (체크포인트 파일 이름으로 사용)
+            runner: 요청을 보낼 BatchRunner (model, max_tokens 등 공통 인자는 runner에 지정)
+            user_template: 행의 열 값으로 채울 사용자 메시지 템플릿 (str.format 문법)
+            system_prompt: 모든 요청에 공통으로 넣을 시스템 메시지
+            output_column: 응답을 넣을 열 이름
+            params: 요청마다 추가할 인자 (예: temperature=0.2)
+        """
+        self.name = name
+        self.runner = runner
+        self.user_template = user_template
+        self.system_prompt = system_prompt
+        self.output_column = output_column
+        self.checkpoint_path = os.path.join(checkpoint_dir, f"{name}.jsonl")
+        self.params = params
+        self.report = None
+
+    def render(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """행 하나 -> 요청 매개변수"""
+        try:
+            content = self.user_template.format_map(row)
+        except KeyError as e:
+            raise KeyError(f"템플릿 자리표시자 {e}에 해당하는 열이 없습니다.") from e
+        messages = [{"role": "system", "content": self.system_prompt}] if self.system_prompt else []
+        messages.append({"role": "user", "content": content})
+        return {**self.params, "messages": messages}
+
+    def load_checkpoint(self) -> Dict[str, Dict[str, Any]]:
+        """체크포인트에 저장된 {프롬프트 키: 결과}"""
+        done = {}
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:  # 쓰는 도중 중단되어 잘린 마지막 줄
+                        continue
+                    done[entry["key"]] = entry
+        return done
+
+    def clear_checkpoint(self) -> None:
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    async def run(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """모든 행을 처리하고 output_column을 붙인 DataFrame 반환 (실패한 행은 None)"""
+        report = self.report = BatchJobReport(rows=len(frame))
+
+        # 내용 기반 키로 같은 프롬프트를 묶음 (runner 공통 인자까지 포함해서 모델이 바뀌면 다른 키)
+        unique = {}
+        row_keys = []
+        for row in frame.to_dict("records"):
+            request = self.render(row)
+            key = cache_key({**self.runner.defaults, **request})
+            unique.setdefault(key, request)
+            row_keys.append(key)
+        report.unique_prompts = len(unique)
+
+        done = self.load_checkpoint()
+        pending = [key for key in unique if key not in done]
+        report.resumed = report.unique_prompts - len(pending)
+
+        if os.path.dirname(self.checkpoint_path):
+            os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        started = time.perf_counter()
+        with open(self.checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            def save(result: BatchResult) -> None:
+                if not result.ok:
+                    report.failed += 1
+                    if len(report.errors) < 3:
+                        report.errors.append(f"{type(result.error).__name__}: {result.error}")
+                    return
+                key = pending[result.index]
+                model = {**self.runner.defaults, **unique[key]}.get("model", DEFAULT_MODEL)
+                usage = result.response.usage
+                entry = {"key": key, "content": result.content, "model": model,
+                         "prompt_tokens": usage.prompt_tokens if usage else 0,
+                         "completion_tokens": usage.completion_tokens if usage else 0}
+                checkpoint.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                checkpoint.flush()  # 중단되어도 끝난 요청은 남도록 한 건마다 기록
+                done[key] = entry
+
+                report.sent += 1
+                report.prompt_tokens += entry["prompt_tokens"]
+                report.completion_tokens += entry["completion_tokens"]
+                report.cost += estimate_cost(model, entry["prompt_tokens"], entry["completion_tokens"])
+                report.latencies.append(result.latency)
+
+            await self.runner.run([unique[key] for key in pending], on_result=save)
+        report.elapsed = time.perf_counter() - started
+
+        output = frame.copy()
+        output[self.output_column] = [done[key]["content"] if key in done else None for key in row_keys]
+        return output
+
+    def run_sync(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        이벤트 루프 밖(일반 스크립트)에서 실행할 때 사용
+
+        runner의 AsyncOpenAI 클라이언트가 이 asyncio.run 루프에서 쓰이므로 한 번만 실행하고 버리는
+        클라이언트일 때만 사용하세요 (여러 번 실행하면 run()을 하나의 루프 안에서 호출).
+        """
+        return asyncio.run(self.run(frame))
+
+    def print_report(self) -> None:
+        report = self.report
+        if report is None:
+            print("   - 아직 실행하지 않았습니다.")
+            return
+        print(f"\n📦 배치 작업 '{self.name}' 보고서:")
+        print(f"   - 행 {report.rows:,}개 → 고유 프롬프트 {report.unique_prompts:,}개 "
+              f"(중복 {report.rows - report.unique_prompts:,}개는 요청 없이 결과 공유)")
+        print(f"   - 체크포인트 재사용 {report.resumed:,}건, 이번에 전송 {report.sent:,}건, "
+              f"실패 {report.failed:,}건" + (" (다시 실행하면 재시도)" if report.failed else ""))
+        for error in report.errors:
+            print(f"     ⚠️ {error}")
+        if report.elapsed > 0:
+            print(f"   - ⏱️ {report.elapsed:.2f}초, {report.sent / report.elapsed:.1f} req/s, "
+                  f"행 기준 {report.rows / report.elapsed:.1f} rows/s")
+        if report.latencies:
+            print(f"   - 요청 지연 p50 {np.percentile(report.latencies, 50):.2f}초 / "
+                  f"p95 {np.percentile(report.latencies, 95):.2f}초")
+        per_row = report.cost / report.rows if report.rows else 0.0
+        print(f"   - 💰 입력 {report.prompt_tokens:,} / 출력 {report.completion_tokens:,} 토큰, "
+              f"${report.cost:.6f} (행당 ${per_row:.6f})")
+        print(f"   - 체크포인트: {self.checkpoint_path}")
+
+
+DATASETS = {
+    "co2": ("co2_by_make", co2_by_make, CO2_TEMPLATE, "당신은 자동차 환경 데이터 분석가입니다."),
+    "co2-class": ("co2_vehicle_class", lambda: load_dataset("CO2_Emissions.csv"), VEHICLE_CLASS_TEMPLATE,
+                  "당신은 자동차 구매 상담사입니다."),
+    "covid": ("covid_by_region", covid_by_region, COVID_TEMPLATE, "당신은 공중보건 데이터 분석가입니다."),
+}
+
+
+def main():
+    """로컬 스텁 서버를 띄워 중복 제거/체크포인트 재개 동작 확인"""
+    from mock_openai_server import start_mock_server
+
+    parser = argparse.ArgumentParser(description="데이터셋 배치 프롬프트 작업 오프라인 확인")
+    parser.add_argument("--dataset", choices=sorted(DATASETS), default="co2")
+    parser.add_argument("--limit", type=int, default=0, help="앞에서부터 이 행 수만 처리 (0이면 전체)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fresh", action="store_true", help="체크포인트를 지우고 처음부터 실행")
+    args = parser.parse_args()
+
+    name, load, template, system_prompt = DATASETS[args.dataset]
+    frame = load()
+    if args.limit:
+        frame = frame.head(args.limit)
+
+    server = start_mock_server(latency=args.latency, error_rate=args.error_rate)
+
+    async def run_job():
+        async with AsyncOpenAI(base_url=server.base_url, api_key="mock", max_retries=0) as client:
+            runner = BatchRunner(client, concurrency=args.concurrency, base_delay=0.05, max_retries=2,
+                                 model="gpt-4o-mini", max_tokens=150)
+            job = DatasetBatchJob(f"{name}_mock", runner, template, system_prompt)
+            if args.fresh:
+                job.clear_checkpoint()
+            return job, await job.run(frame)
+
+    job, result = asyncio.run(run_job())
+    print(result[[result.columns[0], job.output_column]].head().to_string())
+    job.print_report()
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
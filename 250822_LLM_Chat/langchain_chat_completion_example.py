@@ -23,9 +23,17 @@ from dotenv import load_dotenv
 # LangChain imports
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.prompts import ChatPromptTemplate
 from langchain.callbacks import get_openai_callback
-from langchain.memory import ConversationBufferMemory, ConversationBufferWindowMemory
+from openai import AsyncOpenAI
+
+from response_cache import ResponseCache, make_langchain_cache
+from semantic_cache import OpenAIEmbedder, SemanticCache
+from conversation_memory import TokenBudgetMemory, make_langchain_summarizer
+from token_accounting import AccountedChatClient, UsageTracker, make_langchain_callback
+from stream_pipeline import StreamPipeline, console_sink, file_sink, langchain_deltas
+from async_batch_runner import BatchRunner
+from dataset_batch import CO2_TEMPLATE, DatasetBatchJob, co2_by_make
 
 # 환경변수 로드
 load_dotenv()
@@ -33,13 +41,39 @@ load_dotenv()
 class LangChainChatDemo:
     """LangChain을 활용한 Chat Completion 데모"""
     
-    def __init__(self):
-        """LangChain ChatOpenAI 초기화"""
+    def __init__(self, base_url: str = None, use_cache: bool = True, use_semantic_cache: bool = False,
+                 session_budget: float = None):
+        """
+        LangChain ChatOpenAI 초기화
+
+        Args:
+            base_url: API 서버 주소 (예: 로컬 모의 서버 "http://127.0.0.1:8000/v1",
+                      없으면 OPENAI_BASE_URL 환경변수 또는 OpenAI 기본 주소)
+            use_cache: 낮은 temperature의 동일한 요청은 저장된 응답을 재사용
+                       (temperature를 낮춘 llm.bind(...) 호출에도 적용)
+            use_semantic_cache: 정확히 같은 프롬프트가 없을 때 OpenAI 임베딩으로 의미상 거의 같은
+                                프롬프트도 재사용 (임베딩 API 호출이 추가되며, use_cache와 함께 켜야 함)
+            session_budget: 세션 전체 비용 한도(USD), 넘는 요청은 보내기 전에 거절
+        """
+        # 모델 호출 직전에 로컬에서 토큰/비용을 계산해 예산을 검사하고, 응답 사용량은 세션 단위로 집계
+        self.usage = UsageTracker(max_request_tokens=4000, session_budget=session_budget)
+        self.base_url = base_url
+        if use_semantic_cache and not use_cache:
+            raise ValueError("use_semantic_cache는 use_cache=True일 때만 쓸 수 있습니다.")
+        self.cache = ResponseCache() if use_cache else None
         self.llm = ChatOpenAI(
             model="gpt-4o-mini",
             temperature=0.7,
-            max_tokens=500
+            max_tokens=500,
+            base_url=base_url,
+            callbacks=[make_langchain_callback(self.usage, "gpt-4o-mini", 500)]
         )
+        self.semantic_cache = (SemanticCache(embedder=OpenAIEmbedder(self.llm.root_client))
+                               if use_semantic_cache else None)
+        if self.cache:
+            # 모델 설정 문자열에는 서버 주소가 없으므로 실제로 요청이 가는 주소를 캐시 키에 더함
+            self.llm.cache = make_langchain_cache(self.cache, self.semantic_cache,
+                                                  endpoint=str(self.llm.root_client.base_url))
         
     def basic_langchain_chat(self) -> None:
         """기본 LangChain Chat 예제"""
@@ -107,18 +141,13 @@ class LangChainChatDemo:
         print("💭 대화 메모리 관리 예제")
         print("=" * 50)
         
-        # ConversationBufferMemory 사용
-        memory = ConversationBufferMemory(return_messages=True)
-        
-        # 프롬프트 템플릿 (메모리 포함)
-        template = ChatPromptTemplate.from_messages([
-            ("system", "당신은 여행 상담사입니다. 고객의 여행 계획을 도와주세요."),
-            MessagesPlaceholder(variable_name="history"),
-            ("human", "{input}")
-        ])
-        
-        # 체인 구성
-        chain = template | self.llm
+        # 전체 대화를 쌓는 ConversationBufferMemory 대신 토큰 예산 기반 메모리 사용
+        # 예산(1,000 토큰)을 넘으면 오래된 대화를 요약으로 접고, 시스템 + 요약 접두부는 그대로 유지
+        memory = TokenBudgetMemory(
+            "당신은 여행 상담사입니다. 고객의 여행 계획을 도와주세요.",
+            make_langchain_summarizer(self.llm),
+            max_prompt_tokens=1000
+        )
         
         # 대화 시뮬레이션
         conversations = [
@@ -131,23 +160,16 @@ class LangChainChatDemo:
         for i, user_input in enumerate(conversations, 1):
             print(f"\n👤 사용자 {i}: {user_input}")
             
-            # 메모리에서 대화 히스토리 가져오기
-            history = memory.chat_memory.messages
-            
             with get_openai_callback() as callback:
-                response = chain.invoke({
-                    "input": user_input,
-                    "history": history
-                })
+                response = self.llm.invoke(memory.build(user_input))
                 
                 print(f"🤖 AI: {response.content}")
                 print(f"💰 토큰: {callback.total_tokens}")
                 
-                # 메모리에 대화 저장
-                memory.chat_memory.add_user_message(user_input)
-                memory.chat_memory.add_ai_message(response.content)
+                # 메모리에 대화 저장 (턴별 프롬프트 토큰 기록)
+                memory.add_turn(user_input, response.content, response.usage_metadata)
         
-        print(f"\n📊 총 대화 히스토리 길이: {len(memory.chat_memory.messages)}")
+        memory.print_report()
 
     def window_memory_demo(self) -> None:
         """윈도우 메모리 예제"""
@@ -155,20 +177,15 @@ class LangChainChatDemo:
         print("🪟 윈도우 메모리 예제")
         print("=" * 50)
         
-        # 최근 4개 메시지만 유지 (2턴)
-        window_memory = ConversationBufferWindowMemory(
-            k=4,  # 최근 4개 메시지만 유지
-            return_messages=True
+        # 최근 2턴만 원문으로 유지하되, 밀려난 대화는 버리지 않고 요약으로 남김
+        # (ConversationBufferWindowMemory는 윈도우 밖의 내용을 잊어버림)
+        memory = TokenBudgetMemory(
+            "당신은 도움이 되는 어시스턴트입니다.",
+            make_langchain_summarizer(self.llm),
+            max_prompt_tokens=600,
+            keep_recent=2
         )
         
-        template = ChatPromptTemplate.from_messages([
-            ("system", "당신은 도움이 되는 어시스턴트입니다."),
-            MessagesPlaceholder(variable_name="history"),
-            ("human", "{input}")
-        ])
-        
-        chain = template | self.llm
-        
         # 긴 대화 시뮬레이션
         long_conversations = [
             "안녕하세요! 파이썬 공부를 시작하려고 합니다.",
@@ -176,27 +193,25 @@ class LangChainChatDemo:
             "리스트와 튜플의 차이점은 무엇인가요?",
             "반복문은 어떻게 사용하나요?",
             "함수는 어떻게 정의하나요?",
-            "처음 질문이 뭐였는지 기억하시나요?"  # 윈도우 밖의 내용
+            "처음 질문이 뭐였는지 기억하시나요?"  # 요약으로만 남아 있는 내용
         ]
         
         for i, user_input in enumerate(long_conversations, 1):
             print(f"\n👤 [{i}] {user_input}")
             
-            history = window_memory.chat_memory.messages
-            print(f"📝 현재 메모리 크기: {len(history)} 메시지")
+            messages = memory.build(user_input)
+            print(f"📝 현재 메모리 크기: {len(messages)} 메시지 "
+                  f"(요약 {'있음' if memory.summary else '없음'}, 최근 {len(memory.turns)}턴)")
             
-            response = chain.invoke({
-                "input": user_input,
-                "history": history
-            })
+            response = self.llm.invoke(messages)
             
             print(f"🤖 {response.content}")
             
-            # 윈도우 메모리에 저장
-            window_memory.chat_memory.add_user_message(user_input)
-            window_memory.chat_memory.add_ai_message(response.content)
+            memory.add_turn(user_input, response.content, response.usage_metadata)
             
             time.sleep(1)
+        
+        memory.print_report()
 
     async def async_batch_processing(self) -> None:
         """비동기 배치 처리 예제"""
@@ -249,6 +264,41 @@ class LangChainChatDemo:
             print(f"   답변: {response.content[:100]}...")
             print()
 
+    def dataset_batch_job_demo(self) -> None:
+        """데이터셋 배치 작업 예제 (DataFrame 행마다 프롬프트)"""
+        print("\n" + "=" * 50)
+        print("📦 데이터셋 배치 작업 예제")
+        print("=" * 50)
+        
+        # 고정된 질문 목록 대신 CO2_Emissions.csv를 제조사별로 집계한 행마다 인사이트 생성
+        frame = co2_by_make()
+        print(f"📊 제조사 {len(frame)}곳의 집계 데이터로 프롬프트 생성")
+        
+        # 요청은 AsyncOpenAI + BatchRunner로 동시에 보내고, 사용량은 세션 보고서에 함께 집계
+        # (httpx 연결 풀이 이벤트 루프에 묶이므로 클라이언트는 asyncio.run 안에서 만들고 닫음)
+        async def run_job():
+            client = AccountedChatClient(AsyncOpenAI(base_url=self.base_url, max_retries=0), self.usage)
+            try:
+                runner = BatchRunner(client, concurrency=8, model="gpt-4o-mini", max_tokens=120)
+                job = DatasetBatchJob(
+                    "co2_by_make",
+                    runner,
+                    user_template=CO2_TEMPLATE,
+                    system_prompt="당신은 자동차 환경 데이터 분석가입니다.",
+                    temperature=0.2
+                )
+                # 중단된 뒤 다시 실행하면 체크포인트에 없는 제조사만 요청
+                return job, await job.run(frame)
+            finally:
+                await client.close()
+        
+        job, result = asyncio.run(run_job())
+        
+        print("\n📊 처리 결과 (CO2 배출량이 높은 순 상위 5곳):")
+        for _, row in result.sort_values("co2", ascending=False).head(5).iterrows():
+            print(f"- {row['Make']} ({row['co2']:.0f}g/km): {(row['response'] or '실패')[:100]}")
+        job.print_report()
+
     def streaming_response_demo(self) -> None:
         """스트리밍 응답 예제"""
         print("\n" + "=" * 50)
@@ -263,12 +313,20 @@ class LangChainChatDemo:
         print("📖 실시간 스토리 생성:")
         print("-" * 30)
         
-        # 스트리밍으로 응답 받기
-        for chunk in self.llm.stream(messages):
-            print(chunk.content, end='', flush=True)
+        # astream() 조각을 파이프라인으로 받아 콘솔과 파일에 나눠 전달
+        pipeline = StreamPipeline(langchain_deltas(self.llm, messages))
+        pipeline.attach(console_sink)
+        pipeline.attach(file_sink(".cache/streams/langchain_story.txt"))
+        result = asyncio.run(pipeline.run(timeout=60))
         
-        print("\n" + "-" * 30)
-        print("✅ 스토리 생성 완료")
+        print("-" * 30)
+        if result.error:
+            print(f"❌ 스트리밍 오류: {result.error}")
+        elif result.cancelled:
+            print(f"⏹️ 시간 초과로 중단 ({len(result.text)}자까지 수신)")
+        else:
+            print("✅ 스토리 생성 완료")
+        print(f"⏱️ {result.metrics.summary()}")
 
     def advanced_prompting_techniques(self) -> None:
         """고급 프롬프팅 기법 예제"""
@@ -316,6 +374,7 @@ class LangChainChatDemo:
             ("프롬프트 템플릿", self.prompt_template_example),
             ("대화 메모리 관리", self.conversation_memory_demo),
             ("윈도우 메모리", self.window_memory_demo),
+            ("데이터셋 배치 작업", self.dataset_batch_job_demo),
             ("스트리밍 응답", self.streaming_response_demo),
             ("고급 프롬프팅 기법", self.advanced_prompting_techniques),
         ]
@@ -323,7 +382,8 @@ class LangChainChatDemo:
         for i, (name, demo_func) in enumerate(demos, 1):
             try:
                 print(f"\n\n📌 [{i}/{len(demos)}] {name} 실행 중...")
-                demo_func()
+                with self.usage.scope(name):
+                    demo_func()
                 time.sleep(2)
             except Exception as e:
                 print(f"❌ {name} 실행 중 오류: {e}")
@@ -332,11 +392,17 @@ class LangChainChatDemo:
         # 비동기 데모는 별도 실행
         print(f"\n\n📌 [{len(demos)+1}/{len(demos)+1}] 비동기 배치 처리 실행 중...")
         try:
-            asyncio.run(self.async_batch_processing())
+            with self.usage.scope("비동기 배치 처리"):
+                asyncio.run(self.async_batch_processing())
         except Exception as e:
             print(f"❌ 비동기 배치 처리 실행 중 오류: {e}")
         
         print("\n\n🎉 모든 LangChain 데모 실행 완료!")
+        self.usage.print_report()
+        if self.cache:
+            self.cache.print_report()
+        if self.semantic_cache:
+            self.semantic_cache.print_report()
         print("\n💡 LangChain 활용 포인트:")
         print("   1. 프롬프트 템플릿으로 재사용성 향상")
         print("   2. 메모리 관리로 대화 맥락 유지")
@@ -365,9 +431,10 @@ def main():
         print("6. 비동기 배치 처리")
         print("7. 스트리밍 응답")
         print("8. 고급 프롬프팅 기법")
+        print("9. 데이터셋 배치 작업")
         print("0. 종료")
         
-        choice = input("\n선택 (0-8): ").strip()
+        choice = input("\n선택 (0-9): ").strip()
         
         if choice == "0":
             print("👋 실습을 종료합니다!")
@@ -388,6 +455,8 @@ def main():
             demo.streaming_response_demo()
         elif choice == "8":
             demo.advanced_prompting_techniques()
+        elif choice == "9":
+            demo.dataset_batch_job_demo()
         else:
             print("❌ 올바른 번호를 선택해주세요!")
 
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Chat Completion 지연 시간/처리량 벤치마크
+=======================================
+
+로컬 모의 서버(mock_openai_server.py) 또는 --base-url로 지정한 서버에 요청을 보내
+동기, 비동기, 배치(BatchRunner), 스트리밍 경로의
+초당 요청 수(req/s), 첫 토큰까지의 시간(TTFT), p50/p99 지연 시간을 비교합니다.
+
+사용법:
+1. 모의 서버로 오프라인 측정 (서버 자동 실행):
+   python llm_benchmark.py --requests 100 --concurrency 16 --latency 0.1 --token-rate 200 --reply-tokens 100
+2. 이미 실행 중인 서버 측정:
+   python llm_benchmark.py --base-url http://127.0.0.1:8000/v1 --paths sync stream
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from openai import AsyncOpenAI, OpenAI
+
+from async_batch_runner import BatchRunner
+from mock_openai_server import start_mock_server
+
+PATHS = ["sync", "async", "batch", "stream", "langchain"]
+MODEL = "gpt-4o-mini"
+
+
+def make_messages(i: int) -> List[Dict]:
+    return [
+        {"role": "system", "content": "당신은 도움이 되는 어시스턴트입니다."},
+        {"role": "user", "content": f"벤치마크 질문 {i}: 인공지능의 미래를 한 문단으로 설명해주세요."},
+    ]
+
+
+def summarize(name: str, elapsed: float, latencies: List[float], errors: int,
+              ttfts: Optional[List[float]] = None) -> Dict:
+    """경로별 측정 결과 요약 (시간 단위: 초)"""
+    result = {
+        "path": name,
+        "ok": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": float(np.percentile(latencies, 50)) if latencies else None,
+        "p99": float(np.percentile(latencies, 99)) if latencies else None,
+        "ttft_p50": None,
+        "ttft_p99": None,
+    }
+    if ttfts:
+        result["ttft_p50"] = float(np.percentile(ttfts, 50))
+        result["ttft_p99"] = float(np.percentile(ttfts, 99))
+    return result
+
+
+def bench_sync(base_url: str, api_key: str, n: int, max_tokens: int) -> Dict:
+    """동기 클라이언트로 한 건씩 순서대로 요청"""
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    with OpenAI(base_url=base_url, api_key=api_key) as client:
+        for i in range(n):
+            t0 = time.perf_counter()
+            try:
+                client.chat.completions.create(model=MODEL, messages=make_messages(i), max_tokens=max_tokens)
+                latencies.append(time.perf_counter() - t0)
+            except Exception:
+                errors += 1
+    return summarize("sync", time.perf_counter() - started, latencies, errors)
+
+
+async def bench_async(base_url: str, api_key: str, n: int, max_tokens: int, concurrency: int) -> Dict:
+    """비동기 클라이언트로 concurrency개씩 동시에 요청 (재시도/속도 제한 없음)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            t0 = time.perf_counter()
+            try:
+                await client.chat.completions.create(model=MODEL, messages=make_messages(i),
+                                                     max_tokens=max_tokens)
+                latencies.append(time.perf_counter() - t0)
+            except Exception:
+                errors += 1
+
+    # 연결 풀은 이 이벤트 루프 안에서 닫아야 asyncio.run 종료 후 정리 오류가 나지 않음
+    async with AsyncOpenAI(base_url=base_url, api_key=api_key) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n)))
+        elapsed = time.perf_counter() - started
+    return summarize("async", elapsed, latencies, errors)
+
+
+async def bench_batch(base_url: str, api_key: str, n: int, max_tokens: int, concurrency: int) -> Dict:
+    """BatchRunner (세마포어 + RPM/TPM 토큰 버킷 + 재시도) 경로"""
+    async with AsyncOpenAI(base_url=base_url, api_key=api_key, max_retries=0) as client:
+        runner = BatchRunner(client, concurrency=concurrency, rpm=60_000, tpm=10_000_000,
+                             base_delay=0.05, model=MODEL)
+        started = time.perf_counter()
+        results = await runner.run([{"messages": make_messages(i), "max_tokens": max_tokens}
+                                    for i in range(n)])
+        elapsed = time.perf_counter() - started
+    return summarize("batch", elapsed, [r.latency for r in results if r.ok],
+                     sum(not r.ok for r in results))
+
+
+async def bench_stream(base_url: str, api_key: str, n: int, max_tokens: int, concurrency: int) -> Dict:
+    """스트리밍 요청 - 첫 내용 조각이 도착한 시점을 TTFT로 기록"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, ttfts, errors = [], [], 0
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            t0 = time.perf_counter()
+            first = None
+            try:
+                stream = await client.chat.completions.create(model=MODEL, messages=make_messages(i),
+                                                              max_tokens=max_tokens, stream=True)
+                async for chunk in stream:
+                    if first is None and chunk.choices and chunk.choices[0].delta.content:
+                        first = time.perf_counter() - t0
+                latencies.append(time.perf_counter() - t0)
+                if first is not None:
+                    ttfts.append(first)
+            except Exception:
+                errors += 1
+
+    async with AsyncOpenAI(base_url=base_url, api_key=api_key) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n)))
+        elapsed = time.perf_counter() - started
+    return summarize("stream", elapsed, latencies, errors, ttfts)
+
+
+async def bench_langchain(base_url: str, api_key: str, n: int, max_tokens: int, concurrency: int) -> Optional[Dict]:
+    """LangChain ChatOpenAI.abatch 경로 (langchain-openai가 없으면 건너뜀)"""
+    try:
+        from langchain_core.runnables import RunnableLambda
+        from langchain_openai import ChatOpenAI
+    except ImportError:
+        print("⚠️ langchain-openai가 설치되어 있지 않아 langchain 경로는 건너뜁니다.")
+        return None
+
+    llm = ChatOpenAI(model=MODEL, base_url=base_url, api_key=api_key, max_tokens=max_tokens)
+    inputs = [[(m["role"], m["content"]) for m in make_messages(i)] for i in range(n)]
+
+    # abatch는 요청별 시간을 주지 않으므로 ainvoke 한 건씩 시간을 재는 Runnable로 감싸서 abatch 실행
+    async def timed_invoke(messages) -> float:
+        t0 = time.perf_counter()
+        await llm.ainvoke(messages)
+        return time.perf_counter() - t0
+
+    started = time.perf_counter()
+    outputs = await RunnableLambda(timed_invoke).abatch(inputs, config={"max_concurrency": concurrency},
+                                                        return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    latencies = [output for output in outputs if not isinstance(output, Exception)]
+    return summarize("langchain", elapsed, latencies, n - len(latencies))
+
+
+def format_ms(value: Optional[float]) -> str:
+    return f"{value * 1000:8.1f}" if value is not None else f"{'-':>8}"
+
+
+def print_report(results: List[Dict]) -> None:
+    print("\n📊 벤치마크 결과")
+    print(f"{'경로':<10} {'성공':>5} {'오류':>5} {'req/s':>8} {'p50(ms)':>8} {'p99(ms)':>8} "
+          f"{'TTFT50':>8} {'TTFT99':>8}")
+    print("-" * 70)
+    for r in results:
+        print(f"{r['path']:<10} {r['ok']:>5} {r['errors']:>5} {r['rps']:>8.1f} {format_ms(r['p50'])} "
+              f"{format_ms(r['p99'])} {format_ms(r['ttft_p50'])} {format_ms(r['ttft_p99'])}")
+
+
+def run_benchmarks(base_url: str, api_key: str, paths: List[str], n: int, max_tokens: int,
+                   concurrency: int) -> List[Dict]:
+    results = []
+    for path in paths:
+        print(f"⏱️ {path} 경로 측정 중... ({n}건)")
+        if path == "sync":
+            result = bench_sync(base_url, api_key, n, max_tokens)
+        else:
+            bench = {"async": bench_async, "batch": bench_batch, "stream": bench_stream,
+                     "langchain": bench_langchain}[path]
+            result = asyncio.run(bench(base_url, api_key, n, max_tokens, concurrency))
+        if result:
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat Completion 지연 시간/처리량 벤치마크")
+    parser.add_argument("--base-url", help="측정할 서버 주소 (없으면 모의 서버를 자동 실행)")
+    parser.add_argument("--api-key", default="mock")
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=PATHS)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-tokens", type=int, default=200)
+    # 모의 서버 설정
+    parser.add_argument("--latency", type=float, default=0.1, help="모의 서버 첫 토큰 지연(초)")
+    parser.add_argument("--token-rate", type=float, default=200, help="모의 서버 초당 생성 토큰 수")
+    parser.add_argument("--reply-tokens", type=int, default=100, help="모의 서버 응답 길이(토큰)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="모의 서버 오류 비율")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = start_mock_server(latency=args.latency, token_rate=args.token_rate,
+                                   reply_tokens=args.reply_tokens, error_rate=args.error_rate)
+        base_url = server.base_url
+        print(f"🧪 모의 서버 실행: {base_url} (지연 {args.latency}초, {args.token_rate:g} tok/s)")
+
+    try:
+        results = run_benchmarks(base_url, args.api_key, args.paths, args.requests,
+                                 args.max_tokens, args.concurrency)
+        print_report(results)
+    finally:
+        if server:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+로컬 OpenAI 호환 스텁 서버
+=========================
+
+API 키와 네트워크 없이 /v1/chat/completions 요청을 흉내 내는 테스트용 서버입니다.
+일반 응답과 스트리밍(SSE, stream=True) 응답을 모두 지원하며,
+response_format(json_schema/json_object)이 있으면 스키마에 맞는 모의 JSON을 돌려줍니다.
+첫 토큰까지의 지연, 초당 생성 토큰 수, 오류(429/5xx) 비율을 조절해서
+재시도·속도 제한 로직 확인과 지연 시간/처리량 벤치마크(llm_benchmark.py)에 사용합니다.
+
+사용법:
+1. 서버 실행: python mock_openai_server.py --port 8000 --latency 0.2 --token-rate 50 --error-rate 0.1
+2. 클라이언트 연결: OpenAI(base_url="http://127.0.0.1:8000/v1", api_key="mock")
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+
+def rough_token_count(text: str) -> int:
+    """대략적인 토큰 수 (한글 기준 약 2글자당 1토큰)"""
+    return max(1, len(text) // 2)
+
+
+def mock_reply(messages: List[Dict], max_tokens: int, reply_tokens: int = 0) -> str:
+    """
+    마지막 사용자 메시지를 바탕으로 만든 결정적 모의 응답
+
+    reply_tokens가 주어지면 응답 길이를 그 토큰 수(최대 max_tokens)까지 채웁니다.
+    """
+    last_user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    reply = f"모의 응답입니다. 질문 요약: {' '.join(last_user.split())[:80]}"
+    target = min(reply_tokens, max_tokens) if reply_tokens else max_tokens
+    while reply_tokens and rough_token_count(reply) < target:
+        reply += " 모의 토큰"
+    return reply[:max(1, target) * 2]
+
+
+def mock_json(schema: Dict, defs: Dict = None):
+    """JSON 스키마에 맞는 결정적 모의 값 (response_format=json_schema 요청용)"""
+    defs = schema.get("$defs", {}) if defs is None else defs
+    if "$ref" in schema:
+        return mock_json(defs[schema["$ref"].split("/")[-1]], defs)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "anyOf" in schema:
+        return mock_json(schema["anyOf"][0], defs)
+    kind = schema.get("type", "string")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {key: mock_json(value, defs) for key, value in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [mock_json(schema.get("items", {}), defs) for _ in range(2)]
+    return {"string": "모의 값", "integer": 1, "number": 1.5, "boolean": True, "null": None}[kind]
+
+
+def split_tokens(text: str) -> List[str]:
+    """스트리밍용으로 응답을 약 2글자 단위 조각으로 나눔"""
+    return [text[i:i + 2] for i in range(0, len(text), 2)]
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """POST /v1/chat/completions 만 처리하는 요청 핸들러"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive 연결 재사용
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: Dict, headers: Dict = None) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _injected_error(self) -> Tuple[int, Dict, Dict]:
+        """설정된 비율로 429 또는 5xx 오류 응답 생성 (오류가 없으면 None)"""
+        if random.random() >= self.server.error_rate:
+            return None
+        if random.random() < 0.5:
+            return 429, {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_error",
+                                   "code": "rate_limit_exceeded"}}, {"Retry-After": "0.1"}
+        status = random.choice([500, 502, 503])
+        return status, {"error": {"message": f"Mock server error {status}", "type": "server_error",
+                                  "code": None}}, {}
+
+    def _write_chunk(self, data: bytes) -> None:
+        """HTTP/1.1 chunked 인코딩으로 조각 하나 전송"""
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_stream(self, completion_id: str, model: str, content: str, usage: Dict,
+                     include_usage: bool) -> None:
+        """SSE 형식으로 응답을 token_rate 속도에 맞춰 조각조각 전송"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send(chunk: Dict) -> None:
+            self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+
+        def event(delta: Dict, finish_reason=None) -> None:
+            send({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            })
+
+        try:
+            event({"role": "assistant", "content": ""})
+            for piece in split_tokens(content):
+                if self.server.token_rate:
+                    time.sleep(1 / self.server.token_rate)
+                event({"content": piece})
+            event({}, "stop")
+            if include_usage:
+                # stream_options={"include_usage": True} 이면 마지막에 사용량 조각 추가
+                send({"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                      "model": model, "choices": [], "usage": usage})
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 스트림을 중간에 취소함
+            self.close_connection = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        time.sleep(self.server.latency)
+        error = self._injected_error()
+        if error:
+            self._send_json(*error)
+            return
+
+        messages = body.get("messages", [])
+        max_tokens = body.get("max_tokens") or body.get("max_completion_tokens") or 256
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            content = json.dumps(mock_json(response_format["json_schema"]["schema"]), ensure_ascii=False)
+        elif response_format.get("type") == "json_object":
+            content = json.dumps({"answer": mock_reply(messages, max_tokens)}, ensure_ascii=False)
+        else:
+            content = mock_reply(messages, max_tokens, self.server.reply_tokens)
+        prompt_tokens = sum(rough_token_count(m.get("content") or "") + 4 for m in messages)
+        completion_tokens = rough_token_count(content)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "mock-model")
+
+        with self.server.lock:
+            self.server.request_count += 1
+
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            self._send_stream(completion_id, model, content, usage, include_usage)
+            return
+
+        # 일반 응답은 전체 토큰을 다 생성한 뒤에 한 번에 보냄
+        if self.server.token_rate:
+            time.sleep(len(split_tokens(content)) / self.server.token_rate)
+
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """
+    지연 시간, 생성 속도, 오류 비율을 설정할 수 있는 스텁 서버
+
+    Args:
+        latency: 첫 토큰 전까지 대기 시간(초) - 프롬프트 처리 시간에 해당
+        token_rate: 초당 생성 토큰 수 (0이면 지연 없이 한 번에 생성)
+        error_rate: 429/5xx 오류 응답 비율 (0~1)
+        reply_tokens: 응답 길이(토큰 수), 0이면 짧은 요약 응답
+    """
+
+    daemon_threads = True
+    request_queue_size = 128  # 동시 연결이 많은 벤치마크에서 연결 거부 방지
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, verbose: bool = False, token_rate: float = 0.0,
+                 reply_tokens: int = 0):
+        super().__init__((host, port), MockOpenAIHandler)
+        self.latency = latency
+        self.token_rate = token_rate
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+        self.verbose = verbose
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_mock_server(**options) -> MockOpenAIServer:
+    """백그라운드 스레드에서 스텁 서버를 시작해 반환 (port=0이면 빈 포트 자동 선택)"""
+    server = MockOpenAIServer(**options)
+    threading.Thread(target=server.serve_forever, name="mock-openai", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 OpenAI 호환 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="첫 토큰 전 대기 시간(초)")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="초당 생성 토큰 수 (0이면 즉시)")
+    parser.add_argument("--reply-tokens", type=int, default=0, help="응답 길이(토큰 수)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429/5xx 오류 비율 (0~1)")
+    parser.add_argument("--verbose", action="store_true", help="요청 로그 출력")
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(args.host, args.port, args.latency, args.error_rate, args.verbose,
+                              args.token_rate, args.reply_tokens)
+    print(f"🧪 모의 OpenAI 서버 실행 중: {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 서버를 종료합니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+결정적 Chat Completion 응답 캐시
+==============================
+
+(서버 주소, 모델, 메시지, temperature, max_tokens, 기타 매개변수)를 정규화한 JSON의 SHA-256 해시를 키로
+응답을 저장하는 2단계 캐시입니다.
+- 1단계: 메모리 LRU (최근 max_memory건)
+- 2단계: SQLite 파일 (최대 max_entries건, 오래 안 쓴 항목부터 삭제)
+항목마다 TTL이 있고, temperature가 max_temperature 이하인 (결정적인) 요청만 캐시합니다.
+
+사용법:
+    cache = ResponseCache()
+    client = CachedChatClient(OpenAI(), cache)          # OpenAI / AsyncOpenAI 모두 가능
+    client = CachedChatClient(OpenAI(), cache, semantic=SemanticCache(embedder=OpenAIEmbedder(OpenAI())))   # 의미가 같은 질문까지 재사용
+    llm.cache = make_langchain_cache(cache, endpoint=str(llm.root_client.base_url))   # LangChain
+    cache.print_report()
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# 실행 위치와 상관없이 모듈 옆 .cache/에 저장 (.gitignore 대상)
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "chat_responses.db")
+
+# 캐시 키에서 제외할 인자 (응답 내용에 영향을 주지 않음)
+IGNORED_PARAMS = {"stream", "stream_options", "timeout", "extra_headers", "extra_query", "user"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    value       TEXT    NOT NULL,
+    tokens      INTEGER NOT NULL DEFAULT 0,
+    created_at  REAL    NOT NULL,
+    expires_at  REAL    NOT NULL,
+    accessed_at REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+"""
+
+
+def cache_key(params: Dict[str, Any]) -> str:
+    """요청 매개변수의 내용 기반 해시 (키 순서와 무관)"""
+    relevant = {k: v for k, v in params.items() if k not in IGNORED_PARAMS and v is not None}
+    canonical = json.dumps(relevant, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def endpoint_scope(client) -> Dict[str, Any]:
+    """
+    요청이 가는 곳 (서버 주소, 조직, 프로젝트)
+
+    캐시 키에 함께 넣어서 모의 서버와 실제 OpenAI처럼 다른 서버의 응답이 서로 섞이지 않도록 합니다.
+    """
+    return {"base_url": str(client.base_url),
+            "organization": getattr(client, "organization", None),
+            "project": getattr(client, "project", None)}
+
+
+class ResponseCache:
+    """메모리 LRU + SQLite 2단계 응답 캐시"""
+
+    def __init__(self, path: str = CACHE_PATH, max_memory: int = 256, max_entries: int = 10_000,
+                 ttl: float = 7 * 24 * 3600, max_temperature: float = 0.2):
+        """
+        Args:
+            path: SQLite 파일 경로 (None이면 메모리 캐시만 사용)
+            max_memory: 메모리에 둘 최대 항목 수
+            max_entries: 디스크에 둘 최대 항목 수
+            ttl: 항목 유효 기간(초)
+            max_temperature: 이 값보다 temperature가 높은 요청은 캐시하지 않음
+        """
+        self.path = path
+        self.max_memory = max_memory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self.memory = OrderedDict()  # key -> (만료 시각, 값, 토큰 수)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "skipped": 0, "tokens_saved": 0}
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+
+    def skip(self) -> None:
+        """캐시 대상이 아닌 요청 수 기록"""
+        with self._lock:
+            self.stats["skipped"] += 1
+
+    def cacheable(self, params: Dict[str, Any]) -> bool:
+        """결정적인 요청만 캐시 (스트리밍, 여러 개 생성(n>1), 높은 temperature 제외)"""
+        if params.get("stream") or (params.get("n") or 1) > 1:
+            return False
+        temperature = params.get("temperature")  # 지정하지 않으면 API 기본값 1.0
+        return temperature is not None and temperature <= self.max_temperature
+
+    def _remember(self, key: str, entry) -> None:
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory:
+            self.memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """캐시된 값 (없거나 만료되었으면 None) - 적중 통계를 함께 기록"""
+        now = time.time()
+        with self._lock:
+            entry = self.memory.get(key)
+            if entry and entry[0] > now:
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self.stats["tokens_saved"] += entry[2]
+                return entry[1]
+            self.memory.pop(key, None)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT expires_at, value, tokens FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[0] > now:
+                    with self._db:
+                        self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                    value = json.loads(row[1])
+                    self._remember(key, (row[0], value, row[2]))
+                    self.stats["disk_hits"] += 1
+                    self.stats["tokens_saved"] += row[2]
+                    return value
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, value: Any, tokens: int = 0) -> None:
+        """값 저장 (value는 JSON으로 직렬화 가능해야 함)"""
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, (expires_at, value, tokens))
+            if self._db is None:
+                return
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, tokens, created_at, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), tokens, now, expires_at, now)
+                )
+                self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                overflow = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+                if overflow > 0:
+                    self._db.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)", (overflow,)
+                    )
+
+    def clear(self) -> None:
+        with self._lock:
+            self.memory.clear()
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM responses")
+
+    def hit_rate(self) -> Optional[float]:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else None
+
+    def print_report(self) -> None:
+        hit_rate = self.hit_rate()
+        print("\n🗄️ 응답 캐시 통계:")
+        print(f"   - 적중률: {hit_rate * 100:.1f}%" if hit_rate is not None else "   - 적중률: -")
+        print(f"   - 메모리 적중: {self.stats['memory_hits']}건, 디스크 적중: {self.stats['disk_hits']}건, "
+              f"미스: {self.stats['misses']}건, 캐시 제외: {self.stats['skipped']}건")
+        print(f"   - 절약한 토큰: {self.stats['tokens_saved']:,}개")
+
+
+class _CachedCompletions:
+    """
+    client.chat.completions 대체 - create()만 캐시를 거치고 나머지는 원본에 위임
+
+    정확히 같은 요청을 먼저 찾고, 없으면 의미 기반 캐시(semantic_cache.SemanticCache)를 찾습니다.
+    두 캐시 모두 요청 매개변수에 endpoint_scope()를 더한 값으로 조회합니다.
+    """
+
+    def __init__(self, completions, cache: ResponseCache, scope: Dict[str, Any], semantic=None):
+        self._completions = completions
+        self._cache = cache
+        self._scope = scope
+        self._semantic = semantic
+        # AsyncOpenAI의 create는 데코레이터로 감싸져 있어 원래 함수를 꺼내 확인
+        self._is_async = inspect.iscoroutinefunction(inspect.unwrap(completions.create))
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+    def _lookup(self, kwargs):
+        if not self._cache.cacheable(kwargs):
+            self._cache.skip()
+            return None, None
+        scoped = {**kwargs, "endpoint": self._scope}
+        key = cache_key(scoped)
+        cached = self._cache.get(key)
+        if cached is None and self._semantic is not None:
+            cached = self._semantic.get(scoped)
+        return key, (_restore(cached) if cached is not None else None)
+
+    def _store(self, key, kwargs, response, latency):
+        if key is not None:
+            usage = getattr(response, "usage", None)
+            tokens = usage.total_tokens if usage else 0
+            value = response.model_dump(mode="json")
+            self._cache.put(key, value, tokens)
+            if self._semantic is not None:
+                self._semantic.put({**kwargs, "endpoint": self._scope}, value, tokens, latency)
+        return response
+
+    def create(self, **kwargs):
+        if self._is_async:
+            return self._acreate(**kwargs)
+        key, cached = self._lookup(kwargs)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        response = self._completions.create(**kwargs)
+        return self._store(key, kwargs, response, time.perf_counter() - started)
+
+    async def _acreate(self, **kwargs):
+        key, cached = self._lookup(kwargs)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        response = await self._completions.create(**kwargs)
+        return self._store(key, kwargs, response, time.perf_counter() - started)
+
+
+def _restore(data: Dict[str, Any]):
+    from openai.types.chat import ChatCompletion
+    return ChatCompletion.model_validate(data)
+
+
+class _CachedChat:
+    def __init__(self, chat, cache: ResponseCache, scope: Dict[str, Any], semantic=None):
+        self._chat = chat
+        self.completions = _CachedCompletions(chat.completions, cache, scope, semantic)
+
+    def __getattr__(self, name):
+        return getattr(self._chat, name)
+
+
+class CachedChatClient:
+    """
+    OpenAI / AsyncOpenAI 클라이언트 래퍼
+
+    client.chat.completions.create() 호출만 캐시를 거치며, 그 밖의 속성은 원래 클라이언트에 위임하므로
+    기존 코드의 self.client를 그대로 바꿔 끼울 수 있습니다.
+    """
+
+    def __init__(self, client, cache: ResponseCache, semantic=None):
+        self._client = client
+        self.cache = cache
+        self.semantic = semantic
+        self.chat = _CachedChat(client.chat, cache, endpoint_scope(client), semantic)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def make_langchain_cache(cache: ResponseCache, semantic=None, endpoint: Optional[str] = None):
+    """
+    ResponseCache를 LangChain 캐시(BaseCache)로 감싸서 반환
+
+    ChatOpenAI(cache=...)로 넘기면 LangChain이 (프롬프트, 모델 설정 문자열) 단위로 조회합니다.
+    모델 설정 문자열에는 서버 주소가 없으므로 endpoint(예: str(llm.root_client.base_url))를 키에 더합니다.
+    모델 설정 문자열의 temperature가 max_temperature보다 높으면 캐시하지 않습니다.
+    semantic이 주어지면 같은 모델 설정 안에서 직렬화된 프롬프트 전체의 유사도로 한 번 더 찾습니다.
+    """
+    from langchain_core.caches import BaseCache
+    from langchain_core.load import dumps, loads
+
+    temperature_pattern = re.compile(r"""['"]temperature['"]\s*[,:]\s*([0-9.]+)""")
+
+    def cacheable(llm_string: str) -> bool:
+        match = temperature_pattern.search(llm_string)
+        return match is not None and float(match.group(1)) <= cache.max_temperature
+
+    def key_for(prompt: str, llm_string: str) -> str:
+        return cache_key({"prompt": prompt, "llm": llm_string, "endpoint": endpoint})
+
+    def namespace_for(llm_string: str) -> str:
+        return cache_key({"llm": llm_string, "endpoint": endpoint})
+
+    def generation_tokens(generations) -> int:
+        total = 0
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            total += usage.get("total_tokens", 0)
+        return total
+
+    class LangChainResponseCache(BaseCache):
+        def lookup(self, prompt, llm_string):
+            if not cacheable(llm_string):
+                cache.skip()
+                return None
+            value = cache.get(key_for(prompt, llm_string))
+            if value is None and semantic is not None:
+                match = semantic.lookup(namespace_for(llm_string), prompt)
+                value = match[0] if match else None
+            return loads(value) if value is not None else None
+
+        def update(self, prompt, llm_string, return_val):
+            if cacheable(llm_string):
+                value, tokens = dumps(return_val), generation_tokens(return_val)
+                cache.put(key_for(prompt, llm_string), value, tokens)
+                if semantic is not None:
+                    semantic.store(namespace_for(llm_string), prompt, value, tokens)
+
+        def clear(self, **kwargs):
+            cache.clear()
+
+    return LangChainResponseCache()
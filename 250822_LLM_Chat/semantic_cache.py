@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+의미 기반(semantic) 프롬프트 캐시
+================================
+
+정확히 같은 요청만 재사용하는 response_cache.py와 달리, 표현만 조금 다른 비슷한 질문에도
+저장된 응답을 돌려줍니다.
+- 임베딩: OpenAI 임베딩 모델(OpenAIEmbedder) 또는 외부 모델 없이 CPU에서 계산하는 글자 n-gram
+  해싱 벡터(HashingEmbedder, 기본값)
+- 검색: NumPy 전수 비교(기본) 또는 hnswlib HNSW 근사 최근접 이웃 (설치된 경우)
+- 시스템 프롬프트, 이전 대화, 모델, 매개변수가 모두 같은 요청끼리만 마지막 사용자 메시지의
+  유사도를 비교하고, threshold 이상이면 캐시 적중으로 처리합니다.
+
+주의: 글자 n-gram 임베딩은 의미가 아니라 표면적인 글자 겹침을 잽니다. 긴 few-shot 프롬프트에서
+"쓸만하지만 가격이 너무 비싸요"와 "쓸만하고 가격도 싸요"(반대 감정), "학교에 갔다"와 "학교에 안 갔다"
+(부정)도 0.95를 넘습니다. 그래서 해싱 임베딩은 띄어쓰기·문장부호·대소문자만 다른 같은 문장
+(유사도 0.999 이상)만 재사용하도록 제한하고, 그보다 느슨한 threshold는 실제 임베딩 모델에서만 허용합니다.
+
+사용법:
+    semantic = SemanticCache(embedder=OpenAIEmbedder(OpenAI()))   # threshold 0.95
+    semantic = SemanticCache()                                       # 해싱 임베딩, threshold 0.999
+    client = CachedChatClient(OpenAI(), ResponseCache(), semantic=semantic)
+    semantic.print_report()
+"""
+
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # 선택 의존성 - 없으면 NumPy 전수 비교만 사용
+    hnswlib = None
+
+from response_cache import cache_key
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+DEFAULT_THRESHOLD = 0.95
+HASHING_THRESHOLD = 0.999  # 해싱 임베딩은 표기만 다른 같은 문장까지만 재사용
+
+
+class HashingEmbedder:
+    """
+    글자 n-gram 특징 해싱 임베딩
+
+    공백과 문장부호를 지운 뒤 n-gram마다 crc32 해시로 차원과 부호를 정해 더하고,
+    로그 스케일과 L2 정규화를 적용합니다. 따라서 두 벡터의 내적이 곧 코사인 유사도입니다.
+    학습이 필요 없고 실행마다 결과가 같습니다.
+    """
+
+    def __init__(self, dim: int = 1024, ngram_range: Tuple[int, int] = (1, 3)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def __call__(self, text: str) -> np.ndarray:
+        text = _NON_WORD.sub("", text.lower())
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            for i in range(len(text) - n + 1):
+                h = zlib.crc32(text[i:i + n].encode("utf-8"))
+                vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class OpenAIEmbedder:
+    """OpenAI 임베딩 API (동기 클라이언트) - 응답 벡터를 L2 정규화해서 반환"""
+
+    def __init__(self, client, model: str = "text-embedding-3-small", dim: int = 1536):
+        self.client = client
+        self.model = model
+        self.dim = dim
+
+    def __call__(self, text: str) -> np.ndarray:
+        response = self.client.embeddings.create(model=self.model, input=text or " ")
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class NumpyIndex:
+    """고정 크기 슬롯에 벡터를 저장하고 내적으로 전수 비교하는 인덱스"""
+
+    def __init__(self, dim: int, max_entries: int):
+        self.vectors = np.zeros((min(64, max_entries), dim), dtype=np.float32)
+        self.max_entries = max_entries
+        self.size = 0
+
+    def set(self, slot: int, vector: np.ndarray) -> None:
+        if slot >= len(self.vectors):  # 필요할 때 두 배씩 늘림
+            grown = np.zeros((min(self.max_entries, len(self.vectors) * 2), self.vectors.shape[1]),
+                             dtype=np.float32)
+            grown[:len(self.vectors)] = self.vectors
+            self.vectors = grown
+        self.vectors[slot] = vector
+        self.size = max(self.size, slot + 1)
+
+    def search(self, vector: np.ndarray, k: int = 1) -> List[Tuple[int, float]]:
+        if self.size == 0:
+            return []
+        scores = self.vectors[:self.size] @ vector
+        k = min(k, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+
+class HNSWIndex:
+    """hnswlib 기반 근사 최근접 이웃 인덱스 (내적 공간)"""
+
+    def __init__(self, dim: int, max_entries: int, ef: int = 64, m: int = 16):
+        if hnswlib is None:
+            raise ImportError("HNSW 인덱스를 쓰려면 hnswlib를 설치하세요: pip install hnswlib")
+        self.index = hnswlib.Index(space="ip", dim=dim)
+        self.index.init_index(max_elements=max_entries, ef_construction=200, M=m)
+        self.index.set_ef(ef)
+        self.size = 0
+
+    def set(self, slot: int, vector: np.ndarray) -> None:
+        self.index.add_items(vector[np.newaxis, :], [slot])  # 같은 슬롯이면 덮어씀
+        self.size = max(self.size, slot + 1)
+
+    def search(self, vector: np.ndarray, k: int = 1) -> List[Tuple[int, float]]:
+        if self.size == 0:
+            return []
+        labels, distances = self.index.knn_query(vector, k=min(k, self.size))
+        return [(int(label), 1.0 - float(distance)) for label, distance in zip(labels[0], distances[0])]
+
+
+def split_request(params: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    요청을 (네임스페이스, 비교할 텍스트)로 나눔
+
+    마지막 사용자 메시지 내용만 유사도로 비교하고, 나머지(모델, 매개변수, 앞선 메시지)는
+    네임스페이스 해시로 묶어 정확히 같아야 하도록 합니다.
+    """
+    messages = list(params.get("messages", []))
+    last = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=None)
+    if last is None:
+        return cache_key(params), ""
+    text = str(messages[last].get("content") or "")
+    messages[last] = {**messages[last], "content": None}
+    return cache_key({**params, "messages": messages}), text
+
+
+class SemanticCache:
+    """네임스페이스별 벡터 인덱스 + 응답 저장소"""
+
+    def __init__(self, threshold: Optional[float] = None, max_entries: int = 5000, index: str = "numpy",
+                 embedder=None):
+        """
+        Args:
+            threshold: 이 값 이상의 코사인 유사도면 캐시 적중
+                       (None이면 임베딩 모델은 DEFAULT_THRESHOLD, 해싱 임베딩은 HASHING_THRESHOLD)
+            max_entries: 네임스페이스별 최대 항목 수 (넘으면 가장 오래된 슬롯부터 덮어씀)
+            index: "numpy"(전수 비교) 또는 "hnsw"(hnswlib 필요)
+            embedder: (텍스트 -> L2 정규화 벡터) 함수와 dim 속성을 가진 객체 (None이면 HashingEmbedder)
+        """
+        self.embedder = embedder or HashingEmbedder()
+        hashing = isinstance(self.embedder, HashingEmbedder)
+        if threshold is None:
+            threshold = HASHING_THRESHOLD if hashing else DEFAULT_THRESHOLD
+        elif hashing and threshold < HASHING_THRESHOLD:
+            raise ValueError(f"글자 n-gram 해싱 임베딩은 의미를 구분하지 못하므로 threshold를 "
+                             f"{HASHING_THRESHOLD} 이상으로 두거나 embedder=OpenAIEmbedder(...)를 쓰세요.")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.index_type = index
+        self.spaces = {}  # 네임스페이스 -> {"index", "entries", "next"}
+        self.stats = {"lookups": 0, "hits": 0, "similarity_sum": 0.0, "tokens_saved": 0,
+                      "latency_saved": 0.0, "lookup_time": 0.0}
+        self._lock = threading.Lock()
+
+    def _space(self, namespace: str) -> Dict[str, Any]:
+        space = self.spaces.get(namespace)
+        if space is None:
+            index_class = HNSWIndex if self.index_type == "hnsw" else NumpyIndex
+            space = {"index": index_class(self.embedder.dim, self.max_entries), "entries": {}, "next": 0}
+            self.spaces[namespace] = space
+        return space
+
+    def lookup(self, namespace: str, text: str) -> Optional[Tuple[Any, float]]:
+        """가장 비슷한 저장 응답과 유사도 (threshold 미만이면 None)"""
+        started = time.perf_counter()
+        vector = self.embedder(text)
+        with self._lock:
+            self.stats["lookups"] += 1
+            space = self.spaces.get(namespace)
+            matches = space["index"].search(vector, k=1) if space else []
+            self.stats["lookup_time"] += time.perf_counter() - started
+            if not matches or matches[0][1] < self.threshold:
+                return None
+
+            slot, similarity = matches[0]
+            value, tokens, latency, _ = space["entries"][slot]
+            self.stats["hits"] += 1
+            self.stats["similarity_sum"] += similarity
+            self.stats["tokens_saved"] += tokens
+            self.stats["latency_saved"] += latency
+            return value, similarity
+
+    def store(self, namespace: str, text: str, value: Any, tokens: int = 0, latency: float = 0.0) -> None:
+        vector = self.embedder(text)
+        with self._lock:
+            space = self._space(namespace)
+            slot = space["next"] % self.max_entries
+            space["index"].set(slot, vector)
+            space["entries"][slot] = (value, tokens, latency, text)
+            space["next"] += 1
+
+    # OpenAI 요청 매개변수 기준 편의 함수
+
+    def get(self, params: Dict[str, Any]) -> Optional[Any]:
+        match = self.lookup(*split_request(params))
+        return match[0] if match else None
+
+    def put(self, params: Dict[str, Any], value: Any, tokens: int = 0, latency: float = 0.0) -> None:
+        namespace, text = split_request(params)
+        self.store(namespace, text, value, tokens, latency)
+
+    def print_report(self) -> None:
+        lookups, hits = self.stats["lookups"], self.stats["hits"]
+        print("\n🧭 의미 기반 캐시 통계:")
+        print(f"   - 적중률: {hits / lookups * 100:.1f}% ({hits}/{lookups}건)" if lookups else "   - 적중률: -")
+        if hits:
+            print(f"   - 평균 유사도: {self.stats['similarity_sum'] / hits:.3f} (기준 {self.threshold})")
+        print(f"   - 절약한 토큰: {self.stats['tokens_saved']:,}개, "
+              f"절약한 응답 시간: {self.stats['latency_saved']:.2f}초")
+        if lookups:
+            print(f"   - 평균 조회 시간: {self.stats['lookup_time'] / lookups * 1000:.2f}ms")
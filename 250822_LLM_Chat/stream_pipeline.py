@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+스트리밍 응답 파이프라인
+======================
+
+스트리밍 응답의 텍스트 조각(delta)을 한 곳에서 받아
+- 전체 응답을 버퍼에 이어 붙이고
+- 첫 토큰까지의 시간(TTFT)과 조각 사이 간격을 측정하며
+- 콘솔, 파일, Streamlit(st.write_stream) 같은 여러 소비자에게 나눠 줍니다.
+소비자마다 크기가 정해진 큐를 두고, 큐가 가득 차면 뒤따르는 조각을 하나로 합쳐 두었다가
+큐가 비면 한 번에 넘깁니다. 그래서 느린 소비자가 있어도 HTTP 스트림 읽기는 멈추지 않고,
+소비자는 순서대로 빠짐없이 (다만 더 큰 덩어리로) 받습니다.
+
+사용법:
+    pipeline = StreamPipeline(openai_deltas(AsyncOpenAI(), model="gpt-4o-mini", messages=[...]))
+    pipeline.attach(console_sink)
+    pipeline.attach(file_sink(".cache/streams/answer.txt"))
+    result = asyncio.run(pipeline.run(timeout=30))
+    print(result.text, result.metrics.summary())
+
+    # Streamlit 등 동기 코드에서
+    st.write_stream(SyncStream(lambda: openai_deltas(client, ...)))
+"""
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+_DONE = object()
+
+
+async def openai_deltas(client, **params) -> AsyncIterator[str]:
+    """AsyncOpenAI(또는 그 래퍼) 스트리밍 응답의 텍스트 조각 - 중단되면 HTTP 스트림도 닫음"""
+    stream = await client.chat.completions.create(stream=True, **params)
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        await stream.close()
+
+
+async def langchain_deltas(llm, messages) -> AsyncIterator[str]:
+    """LangChain 채팅 모델 astream()의 텍스트 조각"""
+    async for chunk in llm.astream(messages):
+        if chunk.content:
+            yield chunk.content
+
+
+@dataclass
+class StreamMetrics:
+    """스트림 한 건의 시간 측정값 (단위: 초)"""
+    started: float = field(default_factory=time.perf_counter)
+    first_token: Optional[float] = None
+    finished: Optional[float] = None
+    deltas: int = 0
+    chars: int = 0
+    gaps: List[float] = field(default_factory=list)  # 조각 사이 간격
+    _last: Optional[float] = None
+
+    def mark(self, delta: str) -> None:
+        now = time.perf_counter()
+        if self.first_token is None:
+            self.first_token = now
+        else:
+            self.gaps.append(now - self._last)
+        self._last = now
+        self.deltas += 1
+        self.chars += len(delta)
+
+    @property
+    def ttft(self) -> Optional[float]:
+        return self.first_token - self.started if self.first_token is not None else None
+
+    @property
+    def total(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def gap_percentile(self, q: float) -> Optional[float]:
+        return float(np.percentile(self.gaps, q)) if self.gaps else None
+
+    def summary(self) -> str:
+        if self.ttft is None:
+            return f"받은 조각 없음 ({self.total:.2f}초)"
+        rate = self.chars / (self.total - self.ttft) if self.total > self.ttft else 0.0
+        text = f"TTFT {self.ttft * 1000:.0f}ms, 전체 {self.total:.2f}초, 조각 {self.deltas}개 ({rate:.0f}자/초)"
+        if self.gaps:
+            text += (f", 조각 간격 p50 {self.gap_percentile(50) * 1000:.0f}ms"
+                     f" / p95 {self.gap_percentile(95) * 1000:.0f}ms")
+        return text
+
+
+@dataclass
+class StreamResult:
+    text: str
+    metrics: StreamMetrics
+    cancelled: bool = False
+    error: Optional[BaseException] = None  # 스트림(생산자) 오류
+    consumer_errors: Dict[str, BaseException] = field(default_factory=dict)
+
+
+class _Subscriber:
+    """
+    소비자 한 명의 크기 제한 큐
+
+    큐가 가득 차면 이후 조각은 backlog에 모아 두었다가 큐가 비면 하나로 합쳐서 넘기므로
+    offer()는 절대 기다리지 않습니다.
+    """
+
+    def __init__(self, maxsize: int):
+        self.queue = asyncio.Queue(maxsize)
+        self.backlog = []
+        self.closed = False
+        self.coalesced = 0
+
+    def offer(self, delta: str) -> None:
+        if self.backlog or self.queue.full():
+            self.backlog.append(delta)
+            self.coalesced += 1
+        else:
+            self.queue.put_nowait(delta)
+
+    def close(self) -> None:
+        self.closed = True
+        if not self.queue.full():
+            self.queue.put_nowait(_DONE)  # 기다리고 있는 소비자를 깨움
+
+    async def __aiter__(self):
+        while True:
+            if self.queue.empty():
+                if self.backlog:
+                    merged, self.backlog = "".join(self.backlog), []
+                    yield merged
+                    continue
+                if self.closed:
+                    return
+            item = await self.queue.get()
+            if item is not _DONE:
+                yield item
+
+
+class StreamPipeline:
+    """텍스트 조각 비동기 생성기 하나를 여러 소비자에게 나눠 주는 파이프라인"""
+
+    def __init__(self, source: AsyncIterator[str], queue_size: int = 32):
+        """
+        Args:
+            source: 텍스트 조각을 내보내는 비동기 생성기 (openai_deltas, langchain_deltas 등)
+            queue_size: 소비자별 큐 크기 (가득 차면 조각을 합쳐서 전달)
+        """
+        self.source = source
+        self.queue_size = queue_size
+        self.consumers = []  # (이름, 소비 함수, 구독자)
+        self.buffer = []
+        self.metrics = StreamMetrics()
+        self._producer = None
+
+    def attach(self, consumer: Callable[[AsyncIterator[str]], Awaitable], name: Optional[str] = None,
+               queue_size: Optional[int] = None) -> None:
+        """consumer(조각 비동기 반복자)를 소비자로 등록 - run() 전에 호출"""
+        subscriber = _Subscriber(queue_size or self.queue_size)
+        self.consumers.append((name or getattr(consumer, "__name__", f"consumer{len(self.consumers)}"),
+                               consumer, subscriber))
+
+    @property
+    def text(self) -> str:
+        """지금까지 받은 전체 응답"""
+        return "".join(self.buffer)
+
+    def cancel(self) -> None:
+        """스트림 중단 - 소비자는 이미 받은 조각까지 처리하고 끝남"""
+        if self._producer is not None:
+            self._producer.cancel()
+
+    async def _produce(self) -> None:
+        try:
+            async for delta in self.source:
+                self.buffer.append(delta)
+                self.metrics.mark(delta)
+                for _, _, subscriber in self.consumers:
+                    subscriber.offer(delta)
+        finally:
+            self.metrics.finished = time.perf_counter()
+            for _, _, subscriber in self.consumers:
+                subscriber.close()
+            await self.source.aclose()
+
+    async def run(self, timeout: Optional[float] = None) -> StreamResult:
+        """스트림을 끝까지 (또는 timeout초까지) 읽고 모든 소비자가 끝나길 기다림"""
+        self.metrics = StreamMetrics()
+        self._producer = asyncio.ensure_future(self._produce())
+        tasks = {name: asyncio.ensure_future(consumer(subscriber))
+                 for name, consumer, subscriber in self.consumers}
+
+        result = StreamResult("", self.metrics)
+        done, _ = await asyncio.wait({self._producer}, timeout=timeout)
+        if not done:
+            self._producer.cancel()
+        try:
+            await self._producer
+        except asyncio.CancelledError:
+            if not self._producer.cancelled():  # run() 자체가 취소된 경우
+                raise
+            result.cancelled = True
+        except Exception as error:
+            result.error = error
+
+        for name, task in tasks.items():
+            try:
+                await task
+            except Exception as error:  # 소비자 하나의 오류가 다른 소비자를 멈추지 않음
+                result.consumer_errors[name] = error
+        result.text = self.text
+        return result
+
+
+# 기본 소비자들
+
+async def console_sink(deltas: AsyncIterator[str]) -> None:
+    async for delta in deltas:
+        print(delta, end="", flush=True)
+    print()
+
+
+def file_sink(path: str) -> Callable[[AsyncIterator[str]], Awaitable]:
+    """받은 조각을 파일에 이어 쓰는 소비자 (쓰기는 별도 스레드에서 실행해 이벤트 루프를 막지 않음)"""
+    async def write_file(deltas: AsyncIterator[str]) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            async for delta in deltas:
+                await asyncio.to_thread(f.write, delta)
+
+    write_file.__name__ = f"file:{path}"
+    return write_file
+
+
+class SyncStream:
+    """
+    동기 코드(Streamlit st.write_stream 등)에서 쓰는 반복자
+
+    백그라운드 스레드의 이벤트 루프에서 파이프라인을 실행하고, 크기 제한 큐로 조각을 넘겨 받습니다.
+    반복을 끝까지 마치면 result에 전체 텍스트와 측정값이 들어 있고, 중간에 멈추면 스트림도 취소됩니다.
+    """
+
+    def __init__(self, make_source: Callable[[], AsyncIterator[str]], queue_size: int = 32,
+                 extra_consumers: Optional[Dict[str, Callable]] = None):
+        """
+        Args:
+            make_source: 텍스트 조각 비동기 생성기를 만드는 함수 (스레드의 이벤트 루프 안에서 호출)
+            extra_consumers: 함께 붙일 비동기 소비자 {이름: 소비 함수} (예: 파일 저장)
+        """
+        self.make_source = make_source
+        self.queue_size = queue_size
+        self.extra_consumers = extra_consumers or {}
+        self.result = None
+        self._pipeline = None
+        self._loop = None
+
+    def cancel(self) -> None:
+        if self._loop is not None and self._pipeline is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._pipeline.cancel)
+            except RuntimeError:  # 이미 끝나서 이벤트 루프가 닫힘
+                pass
+
+    def __iter__(self) -> Iterator[str]:
+        handoff = queue.Queue(self.queue_size)
+
+        async def forward(deltas: AsyncIterator[str]) -> None:
+            async for delta in deltas:  # 호출한 스레드가 느리면 이 소비자만 기다림
+                await asyncio.to_thread(handoff.put, delta)
+
+        async def main() -> None:
+            self._loop = asyncio.get_running_loop()
+            self._pipeline = StreamPipeline(self.make_source(), self.queue_size)
+            self._pipeline.attach(forward, "sync")
+            for name, consumer in self.extra_consumers.items():
+                self._pipeline.attach(consumer, name)
+            try:
+                self.result = await self._pipeline.run()
+            finally:
+                handoff.put(_DONE)
+
+        worker = threading.Thread(target=asyncio.run, args=(main(),), name="stream-pipeline", daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = handoff.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            if worker.is_alive():
+                self.cancel()  # 반복을 중간에 멈춘 경우 스트림 취소
+            while worker.is_alive():  # forward가 put에서 막혀 있지 않도록 큐를 비우며 종료 대기
+                try:
+                    handoff.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+        if self.result is not None and self.result.error is not None:
+            raise self.result.error
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+구조화 출력 (JSON 스키마) + 스트리밍 증분 JSON 파싱
+=================================================
+
+"JSON으로 답해주세요"라고 부탁한 뒤 응답이 다 오면 문자열을 파싱하는 대신,
+- dataclass 또는 pydantic 모델에서 JSON 스키마를 만들어 response_format(strict)으로 넘기고
+- 스트리밍으로 받은 조각을 증분 JSON 파서에 넣어, 필드 값이 완성되는 즉시 호출한 쪽에 알려주며
+- 최상위 필드는 완성되는 즉시, 전체 결과는 끝난 뒤 스키마로 검증합니다.
+긴 구조화 응답에서도 앞쪽 필드부터 바로 쓸 수 있어 체감 지연이 줄어듭니다.
+
+사용법:
+    @dataclass
+    class City:
+        name: str
+        temperature: float
+
+    stream = stream_structured(client, City, model="gpt-4o-mini", messages=[...])
+    for event in stream:
+        print(event.name, event.value, f"{event.elapsed:.2f}초")
+    city = stream.result          # 검증된 City 인스턴스
+
+    city = parse_structured(client, City, model="gpt-4o-mini", messages=[...])   # 스트리밍 없이
+"""
+
+import dataclasses
+import json
+import time
+import typing
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_CHARS = set("+-0123456789.eEtruefalsn")
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class StructuredOutputError(ValueError):
+    """스키마와 맞지 않는 응답, 또는 모델이 응답을 거절한 경우"""
+
+
+# ----------------------------------------------------------------------
+# 스키마
+# ----------------------------------------------------------------------
+
+def _is_pydantic(schema) -> bool:
+    return hasattr(schema, "model_json_schema")
+
+
+def _type_schema(tp) -> Dict[str, Any]:
+    """파이썬 타입 힌트 -> JSON 스키마"""
+    origin, args = typing.get_origin(tp), typing.get_args(tp)
+    if tp in JSON_TYPES:
+        return {"type": JSON_TYPES[tp]}
+    if dataclasses.is_dataclass(tp):
+        return dataclass_schema(tp)
+    if origin in (list, List):
+        return {"type": "array", "items": _type_schema(args[0])}
+    if origin is typing.Literal:
+        return {"type": JSON_TYPES[type(args[0])], "enum": list(args)}
+    if origin is typing.Union and type(None) in args:  # Optional[T]
+        inner = _type_schema(next(arg for arg in args if arg is not type(None)))
+        return {"anyOf": [inner, {"type": "null"}]}
+    raise TypeError(f"JSON 스키마로 바꿀 수 없는 타입입니다: {tp}")
+
+
+def dataclass_schema(cls) -> Dict[str, Any]:
+    """dataclass -> strict JSON 스키마 (모든 필드 필수, 추가 필드 불가, 설명은 field metadata)"""
+    hints = typing.get_type_hints(cls)
+    properties = {}
+    for field in dataclasses.fields(cls):
+        properties[field.name] = _type_schema(hints[field.name])
+        if "description" in field.metadata:
+            properties[field.name]["description"] = field.metadata["description"]
+    return {"type": "object", "properties": properties, "required": list(properties),
+            "additionalProperties": False}
+
+
+def _strictify(node: Any) -> Any:
+    """pydantic 스키마를 strict 모드 규칙에 맞춤 (default 제거, 모든 속성 필수, 추가 속성 불가)"""
+    if isinstance(node, dict):
+        node = {key: _strictify(value) for key, value in node.items() if key != "default"}
+        if node.get("type") == "object" and "properties" in node:
+            node["required"] = list(node["properties"])
+            node["additionalProperties"] = False
+    elif isinstance(node, list):
+        node = [_strictify(value) for value in node]
+    return node
+
+
+def json_schema_for(schema) -> Dict[str, Any]:
+    if _is_pydantic(schema):
+        return _strictify(schema.model_json_schema())
+    if dataclasses.is_dataclass(schema):
+        return dataclass_schema(schema)
+    raise TypeError("schema는 dataclass 또는 pydantic 모델이어야 합니다.")
+
+
+def response_format_for(schema, name: Optional[str] = None) -> Dict[str, Any]:
+    """Chat Completion response_format 인자 (json_schema, strict)"""
+    return {"type": "json_schema",
+            "json_schema": {"name": name or schema.__name__, "schema": json_schema_for(schema), "strict": True}}
+
+
+# ----------------------------------------------------------------------
+# 검증
+# ----------------------------------------------------------------------
+
+def _coerce(tp, value: Any, path: str) -> Any:
+    """value가 타입 힌트 tp에 맞는지 확인하고 (dataclass면 인스턴스로) 변환"""
+    origin, args = typing.get_origin(tp), typing.get_args(tp)
+    if origin is typing.Union and type(None) in args:
+        if value is None:
+            return None
+        tp = next(arg for arg in args if arg is not type(None))
+        origin, args = typing.get_origin(tp), typing.get_args(tp)
+
+    if dataclasses.is_dataclass(tp):
+        if not isinstance(value, dict):
+            raise StructuredOutputError(f"{path}: 객체가 필요합니다 (받은 값: {value!r})")
+        hints = typing.get_type_hints(tp)
+        names = [field.name for field in dataclasses.fields(tp)]
+        missing = [name for name in names if name not in value]
+        extra = [name for name in value if name not in names]
+        if missing or extra:
+            raise StructuredOutputError(f"{path}: 빠진 필드 {missing}, 알 수 없는 필드 {extra}")
+        return tp(**{name: _coerce(hints[name], value[name], f"{path}.{name}") for name in names})
+    if origin in (list, List):
+        if not isinstance(value, list):
+            raise StructuredOutputError(f"{path}: 배열이 필요합니다 (받은 값: {value!r})")
+        return [_coerce(args[0], item, f"{path}[{i}]") for i, item in enumerate(value)]
+    if origin is typing.Literal:
+        if value not in args:
+            raise StructuredOutputError(f"{path}: {list(args)} 중 하나여야 합니다 (받은 값: {value!r})")
+        return value
+    if tp is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if tp in JSON_TYPES and (not isinstance(value, tp) or (tp is int and isinstance(value, bool))):
+        raise StructuredOutputError(f"{path}: {tp.__name__} 타입이 필요합니다 (받은 값: {value!r})")
+    return value
+
+
+def validate(schema, data: Any):
+    """전체 응답을 스키마 인스턴스로 검증"""
+    if _is_pydantic(schema):
+        from pydantic import ValidationError
+        try:
+            return schema.model_validate(data)
+        except ValidationError as e:
+            raise StructuredOutputError(str(e)) from e
+    return _coerce(schema, data, schema.__name__)
+
+
+def validate_field(schema, name: str, value: Any) -> Any:
+    """최상위 필드 하나만 먼저 검증 (스트리밍 중 필드가 완성될 때 사용)"""
+    if _is_pydantic(schema):
+        from pydantic import TypeAdapter, ValidationError
+        if name not in schema.model_fields:
+            raise StructuredOutputError(f"{schema.__name__}: 알 수 없는 필드 {name}")
+        try:
+            return TypeAdapter(schema.model_fields[name].annotation).validate_python(value)
+        except ValidationError as e:
+            raise StructuredOutputError(str(e)) from e
+    hints = typing.get_type_hints(schema)
+    if name not in hints:
+        raise StructuredOutputError(f"{schema.__name__}: 알 수 없는 필드 {name}")
+    return _coerce(hints[name], value, f"{schema.__name__}.{name}")
+
+
+# ----------------------------------------------------------------------
+# 증분 JSON 파서
+# ----------------------------------------------------------------------
+
+class _Frame:
+    __slots__ = ("container", "path", "key")
+
+    def __init__(self, container, path: Tuple):
+        self.container = container
+        self.path = path
+        self.key = None  # 객체에서 값을 기다리는 키 (None이면 다음 문자열이 키)
+
+
+class IncrementalJSONParser:
+    """
+    조각으로 나뉘어 도착하는 JSON 문서를 한 글자씩 읽는 파서
+
+    feed()는 이번 조각으로 완성된 값들을 (경로, 값) 목록으로 돌려줍니다.
+    경로는 루트부터의 키/인덱스 튜플이며(예: ("cities", 0, "name")), 객체·배열은 닫힐 때 전체가 나옵니다.
+    document에는 지금까지 완성된 값으로 채운 부분 문서가 들어 있습니다.
+    """
+
+    def __init__(self):
+        self.document = None
+        self.done = False
+        self._stack = []
+        self._token = None  # "string" | "scalar" | None
+        self._buffer = []
+        self._escape = None  # 백슬래시 뒤의 이스케이프 문자열
+        self._events = []
+
+    def feed(self, text: str) -> List[Tuple[Tuple, Any]]:
+        for char in text:
+            self._read(char)
+        events, self._events = self._events, []
+        return events
+
+    def close(self) -> List[Tuple[Tuple, Any]]:
+        """입력 끝 - 끝나지 않은 숫자/리터럴을 마무리하고, 문서가 덜 끝났으면 오류"""
+        if self._token == "scalar":
+            self._end_scalar()
+        if self._token or self._stack or not self.done:
+            raise StructuredOutputError("JSON 문서가 끝나지 않았습니다.")
+        events, self._events = self._events, []
+        return events
+
+    def _read(self, char: str) -> None:
+        if self._token == "string":
+            self._read_string(char)
+            return
+        if self._token == "scalar":
+            if char in _SCALAR_CHARS:
+                self._buffer.append(char)
+                return
+            self._end_scalar()
+
+        if char in _WHITESPACE or char in ",:":
+            return
+        if char == "{":
+            self._open({})
+        elif char == "[":
+            self._open([])
+        elif char in "}]":
+            if not self._stack:
+                raise StructuredOutputError(f"짝이 맞지 않는 {char}")
+            frame = self._stack.pop()
+            self._emit(frame.path, frame.container)
+            self.done = not self._stack
+        elif char == '"':
+            self._token, self._buffer = "string", []
+        else:
+            self._token, self._buffer = "scalar", [char]
+
+    def _read_string(self, char: str) -> None:
+        if self._escape is not None:
+            self._escape += char
+            if self._escape[0] == "u":
+                if len(self._escape) == 5:
+                    self._buffer.append(chr(int(self._escape[1:], 16)))
+                    self._escape = None
+            elif self._escape in _ESCAPES:
+                self._buffer.append(_ESCAPES[self._escape])
+                self._escape = None
+            else:
+                raise StructuredOutputError(f"잘못된 이스케이프 \\{self._escape}")
+        elif char == "\\":
+            self._escape = ""
+        elif char == '"':
+            self._token = None
+            # 😀 같은 서로게이트 쌍을 한 글자로 합침
+            text = "".join(self._buffer).encode("utf-16", "surrogatepass").decode("utf-16")
+            frame = self._stack[-1] if self._stack else None
+            if isinstance(frame, _Frame) and isinstance(frame.container, dict) and frame.key is None:
+                frame.key = text
+            else:
+                self._value(text)
+        else:
+            self._buffer.append(char)
+
+    def _end_scalar(self) -> None:
+        self._token = None
+        literal = "".join(self._buffer)
+        try:
+            self._value(json.loads(literal))
+        except json.JSONDecodeError as e:
+            raise StructuredOutputError(f"잘못된 JSON 값: {literal}") from e
+
+    def _attach(self, value: Any) -> Tuple:
+        """부모 컨테이너에 값을 넣고 그 경로 반환"""
+        if not self._stack:
+            self.document = value
+            return ()
+        frame = self._stack[-1]
+        if isinstance(frame.container, dict):
+            path = frame.path + (frame.key,)
+            frame.container[frame.key] = value
+            frame.key = None
+        else:
+            path = frame.path + (len(frame.container),)
+            frame.container.append(value)
+        return path
+
+    def _open(self, container) -> None:
+        self._stack.append(_Frame(container, self._attach(container)))
+
+    def _value(self, value: Any) -> None:
+        self._emit(self._attach(value), value)
+        self.done = not self._stack
+
+    def _emit(self, path: Tuple, value: Any) -> None:
+        self._events.append((path, value))
+
+
+# ----------------------------------------------------------------------
+# 요청
+# ----------------------------------------------------------------------
+
+@dataclass
+class FieldEvent:
+    """스트리밍 중 완성된 값 하나"""
+    path: Tuple
+    value: Any
+    elapsed: float  # 요청 시작부터 걸린 시간(초)
+
+    @property
+    def name(self) -> str:
+        return ".".join(str(part) for part in self.path)
+
+
+class StructuredStream:
+    """
+    구조화 출력 스트리밍 응답 반복자
+
+    반복하면 완성된 값마다 FieldEvent를 내보내고, 끝까지 반복하면 result에 검증된 인스턴스가 들어갑니다.
+    최상위 필드는 완성되는 즉시 검증하므로 스키마와 다르면 스트림 도중에 StructuredOutputError가 납니다.
+    """
+
+    def __init__(self, stream, schema, started: Optional[float] = None):
+        self.stream = stream
+        self.schema = schema
+        self.parser = IncrementalJSONParser()
+        self.started = started or time.perf_counter()
+        self.parts = []
+        self.result = None
+        self.first_field = None  # 첫 필드가 완성되기까지 걸린 시간(초)
+
+    @property
+    def partial(self) -> Any:
+        """지금까지 완성된 값으로 채운 부분 문서"""
+        return self.parser.document
+
+    def _events(self, events) -> Iterator[FieldEvent]:
+        for path, value in events:
+            if len(path) == 1:
+                validate_field(self.schema, path[0], value)
+            elapsed = time.perf_counter() - self.started
+            if self.first_field is None and path:
+                self.first_field = elapsed
+            yield FieldEvent(path, value, elapsed)
+
+    def __iter__(self) -> Iterator[FieldEvent]:
+        refusal = []
+        try:
+            for chunk in self.stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if getattr(delta, "refusal", None):
+                    refusal.append(delta.refusal)
+                if delta.content:
+                    self.parts.append(delta.content)
+                    yield from self._events(self.parser.feed(delta.content))
+        finally:
+            self.stream.close()
+        if refusal:
+            raise StructuredOutputError(f"모델이 응답을 거절했습니다: {''.join(refusal)}")
+        yield from self._events(self.parser.close())
+        self.result = validate(self.schema, json.loads("".join(self.parts)))
+
+
+def stream_structured(client, schema, **params) -> StructuredStream:
+    """response_format(JSON 스키마)을 붙여 스트리밍 요청을 보내고 StructuredStream 반환"""
+    started = time.perf_counter()
+    stream = client.chat.completions.create(response_format=response_format_for(schema), stream=True, **params)
+    return StructuredStream(stream, schema, started)
+
+
+def parse_structured(client, schema, **params):
+    """스트리밍 없이 요청하고 검증된 인스턴스 반환 (응답 캐시를 거칠 수 있는 경로)"""
+    response = client.chat.completions.create(response_format=response_format_for(schema), **params)
+    message = response.choices[0].message
+    if getattr(message, "refusal", None):
+        raise StructuredOutputError(f"모델이 응답을 거절했습니다: {message.refusal}")
+    return validate(schema, json.loads(message.content))
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+요청 전 토큰/비용 계산
+=====================
+
+응답을 받은 뒤에야 알 수 있던 토큰 수와 비용을 요청을 보내기 전에 로컬에서 계산합니다.
+- 토큰 수: tiktoken BPE 인코더로 계산 (모델별 인코더는 한 번만 만들어 재사용),
+  tiktoken이 없으면 글자 수 기반 추정으로 대체
+- 비용: 모델별 단가표(PRICING)로 계산 (날짜가 붙은 스냅샷 이름도 접두어로 찾음)
+- 예산: 요청당 토큰/비용, 세션 전체 비용 한도를 넘는 요청은 네트워크 호출 전에 거절하거나
+  (on_over_budget="trim"이면) 오래된 메시지를 잘라서 보내고 뺀 메시지를 출력
+- 집계: 데모(구간)별, 모델별 사용량과 비용을 모아 세션 보고서 출력
+
+사용법:
+    tracker = UsageTracker(max_request_tokens=4000, session_budget=0.05)
+    client = AccountedChatClient(OpenAI(), tracker)
+    with tracker.scope("기본 예제"):
+        client.chat.completions.create(model="gpt-4o-mini", messages=[...], max_tokens=200)
+    tracker.print_report()
+"""
+
+import inspect
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # 선택 의존성 - 없으면 글자 수 기반 추정 사용
+    tiktoken = None
+
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_MAX_TOKENS = 256
+
+# 채팅 형식 오버헤드 (OpenAI 문서 기준: 메시지마다 3토큰, 응답 시작에 3토큰, name 필드 1토큰)
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_NAME = 1
+REPLY_PRIMING_TOKENS = 3
+
+# 100만 토큰당 USD 단가 (입력, 캐시된 입력, 출력)
+PRICING = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-3.5-turbo": (0.50, 0.50, 1.50),
+}
+
+
+class BudgetExceeded(Exception):
+    """예산을 넘는 요청 - 네트워크 호출 전에 발생"""
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str):
+    """
+    모델의 BPE 인코더 (처음 한 번만 로드)
+
+    tiktoken이 없거나 인코딩 파일을 받을 수 없으면(오프라인 등) None - 실패도 캐시되어 다시 시도하지 않음
+    """
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:  # 모르는 모델은 최신 GPT-4o 계열 인코딩 사용
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:  # 인코딩 파일 다운로드 실패 (requests ConnectionError, OSError 등)
+        return None
+
+
+def exact_counting(model: str = DEFAULT_MODEL) -> bool:
+    """tiktoken으로 정확히 세는지 여부 (False면 글자 수 기반 근사치)"""
+    return get_encoding(model) is not None
+
+
+def count_text_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    encoding = get_encoding(model)
+    if encoding is None:
+        return len(text) // 2  # 한글 기준 약 2글자당 1토큰
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _content_text(content: Any) -> str:
+    """메시지 content (문자열 또는 [{"type": "text", "text": ...}, ...])의 텍스트 부분"""
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content or "")
+
+
+def count_message_tokens(messages: List[Dict[str, Any]], model: str = DEFAULT_MODEL) -> int:
+    """채팅 메시지 목록의 프롬프트 토큰 수"""
+    total = REPLY_PRIMING_TOKENS
+    for message in messages:
+        total += TOKENS_PER_MESSAGE + count_text_tokens(_content_text(message.get("content")), model)
+        if message.get("name"):
+            total += TOKENS_PER_NAME + count_text_tokens(message["name"], model)
+    return total
+
+
+def price_for(model: str) -> Optional[Tuple[float, float, float]]:
+    """단가표에서 가장 길게 일치하는 접두어의 단가 (예: gpt-4o-mini-2024-07-18 -> gpt-4o-mini)"""
+    matches = [name for name in PRICING if model.startswith(name)]
+    return PRICING[max(matches, key=len)] if matches else None
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int = 0, cached_tokens: int = 0) -> float:
+    """USD 비용 (단가표에 없는 모델은 0)"""
+    price = price_for(model)
+    if price is None:
+        return 0.0
+    input_price, cached_price, output_price = price
+    return ((prompt_tokens - cached_tokens) * input_price + cached_tokens * cached_price
+            + completion_tokens * output_price) / 1_000_000
+
+
+class UsageTracker:
+    """요청 전 예산 검사 + 응답 후 사용량 집계"""
+
+    def __init__(self, max_request_tokens: Optional[int] = None, max_request_cost: Optional[float] = None,
+                 session_budget: Optional[float] = None, on_over_budget: str = "reject"):
+        """
+        Args:
+            max_request_tokens: 요청 한 건의 (프롬프트 + 최대 출력) 토큰 한도
+            max_request_cost: 요청 한 건의 최대 예상 비용(USD)
+            session_budget: 세션 전체 비용 한도(USD) - 이미 쓴 비용 + 이번 요청 최대 비용으로 판단
+            on_over_budget: "reject"(BudgetExceeded 발생) 또는 "trim"(시스템 메시지와 마지막 질문은
+                            남기고 오래된 메시지부터 잘라냄, 잘라낸 내용은 출력, 그래도 넘으면 거절)
+        """
+        self.max_request_tokens = max_request_tokens
+        self.max_request_cost = max_request_cost
+        self.session_budget = session_budget
+        self.on_over_budget = on_over_budget
+        self.label = "기타"
+        self.totals = defaultdict(lambda: {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                                           "cached_tokens": 0, "cost": 0.0})
+        self.models = defaultdict(lambda: {"requests": 0, "tokens": 0, "cost": 0.0})
+        self.stats = {"rejected": 0, "trimmed": 0, "trimmed_messages": 0}
+        self.approximate = False  # 요청 전 토큰 수를 글자 수로 근사한 적이 있는지
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def scope(self, label: str):
+        """with 블록 안의 요청을 label(예: 데모 이름)로 집계"""
+        previous, self.label = self.label, label
+        try:
+            yield
+        finally:
+            self.label = previous
+
+    @property
+    def spent(self) -> float:
+        return sum(row["cost"] for row in self.totals.values())
+
+    def _over_budget(self, model: str, prompt_tokens: int, max_tokens: int) -> Optional[str]:
+        worst_cost = estimate_cost(model, prompt_tokens, max_tokens)
+        note = "" if exact_counting(model) else " (tiktoken 없이 글자 수로 추정한 값)"
+        if self.max_request_tokens is not None and prompt_tokens + max_tokens > self.max_request_tokens:
+            return f"요청 토큰 {prompt_tokens + max_tokens:,}개가 한도 {self.max_request_tokens:,}개를 넘습니다{note}"
+        if self.max_request_cost is not None and worst_cost > self.max_request_cost:
+            return f"요청 예상 비용 ${worst_cost:.6f}이 한도 ${self.max_request_cost:.6f}를 넘습니다{note}"
+        if self.session_budget is not None and self.spent + worst_cost > self.session_budget:
+            return f"세션 비용 ${self.spent + worst_cost:.6f}이 예산 ${self.session_budget:.6f}를 넘습니다{note}"
+        return None
+
+    def preflight(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        보내기 전 예산 검사 - 통과한(필요하면 잘라낸) 요청 매개변수 반환
+
+        Raises:
+            BudgetExceeded: 예산을 넘고 잘라낼 수도 없는 경우
+        """
+        model = params.get("model", DEFAULT_MODEL)
+        max_tokens = params.get("max_tokens") or params.get("max_completion_tokens") or DEFAULT_MAX_TOKENS
+        messages = list(params.get("messages", []))
+        prompt_tokens = count_message_tokens(messages, model)
+        if not exact_counting(model):
+            self.approximate = True
+        reason = self._over_budget(model, prompt_tokens, max_tokens)
+
+        if reason and self.on_over_budget == "trim":
+            # 시스템 메시지와 마지막 메시지는 남기고 가장 오래된 대화부터 제거
+            original_tokens, dropped = prompt_tokens, []
+            while reason:
+                removable = [i for i, m in enumerate(messages[:-1]) if m.get("role") != "system"]
+                if not removable:
+                    break
+                dropped.append(messages.pop(removable[0]))
+                prompt_tokens = count_message_tokens(messages, model)
+                reason = self._over_budget(model, prompt_tokens, max_tokens)
+            if not reason:
+                self.stats["trimmed"] += 1
+                self.stats["trimmed_messages"] += len(dropped)
+                roles = ", ".join(m.get("role", "?") for m in dropped)
+                print(f"✂️ 예산 초과로 오래된 메시지 {len(dropped)}개({roles})를 빼고 보냅니다: "
+                      f"프롬프트 토큰 {original_tokens:,} → {prompt_tokens:,}")
+                params = {**params, "messages": messages}
+
+        if reason:
+            self.stats["rejected"] += 1
+            raise BudgetExceeded(reason)
+        return params
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0,
+               estimated: bool = False) -> float:
+        """응답 사용량 기록 후 비용 반환 (estimated: API가 사용량을 주지 않아 로컬에서 센 값)"""
+        cost = estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+        with self._lock:
+            row = self.totals[self.label]
+            row["requests"] += 1
+            row["prompt_tokens"] += prompt_tokens
+            row["completion_tokens"] += completion_tokens
+            row["cached_tokens"] += cached_tokens
+            row["cost"] += cost
+            by_model = self.models[model]
+            by_model["requests"] += 1
+            by_model["tokens"] += prompt_tokens + completion_tokens
+            by_model["cost"] += cost
+            if estimated:
+                row["estimated"] = True
+        return cost
+
+    def record_usage(self, model: str, usage: Any) -> float:
+        """OpenAI CompletionUsage 기록"""
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or 0
+        return self.record(model, usage.prompt_tokens, usage.completion_tokens, cached)
+
+    def print_report(self) -> None:
+        print("\n💰 세션 토큰/비용 보고서:")
+        if not self.totals:
+            print("   - 기록된 요청이 없습니다.")
+        for label, row in self.totals.items():
+            print(f"   - {label}: {row['requests']}건, 입력 {row['prompt_tokens']:,} "
+                  f"(캐시 {row['cached_tokens']:,}) / 출력 {row['completion_tokens']:,} 토큰, "
+                  f"${row['cost']:.6f}" + (" (일부 로컬 추정)" if row.get("estimated") else ""))
+        for model, row in self.models.items():
+            unpriced = "" if price_for(model) else " (단가표에 없음)"
+            print(f"   - [{model}] {row['requests']}건, {row['tokens']:,} 토큰, ${row['cost']:.6f}{unpriced}")
+        total_tokens = sum(row["tokens"] for row in self.models.values())
+        print(f"   - 합계: {total_tokens:,} 토큰, ${self.spent:.6f}"
+              + (f" / 예산 ${self.session_budget:.4f}" if self.session_budget is not None else ""))
+        print(f"   - 사전 차단: {self.stats['rejected']}건, 잘라서 전송: {self.stats['trimmed']}건"
+              f" (뺀 메시지 {self.stats['trimmed_messages']}개)")
+        if self.approximate:
+            print("   - ⚠️ tiktoken을 쓸 수 없어 요청 전 토큰 수와 예산 검사는 글자 수 기반 근사치입니다")
+
+
+class _AccountedStream:
+    """스트리밍 응답 래퍼 - 조각을 그대로 넘기면서 출력 토큰을 로컬에서 세고, 끝나면 기록"""
+
+    def __init__(self, stream, tracker: UsageTracker, model: str, prompt_tokens: int):
+        self._stream = stream
+        self._tracker = tracker
+        self._model = model
+        self._prompt_tokens = prompt_tokens
+        self._parts = []
+        self._usage = None
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    # with / async with 문은 __getattr__을 거치지 않으므로 직접 구현
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def close(self):
+        """응답 연결 닫기 (AsyncStream이면 await해야 하는 코루틴 반환)"""
+        return self._stream.close()
+
+    def _observe(self, chunk) -> None:
+        if getattr(chunk, "usage", None) is not None:  # stream_options={"include_usage": True}
+            self._usage = chunk.usage
+        for choice in chunk.choices or []:
+            if choice.delta.content:
+                self._parts.append(choice.delta.content)
+
+    def _finish(self) -> None:
+        if self._usage is not None:
+            self._tracker.record_usage(self._model, self._usage)
+        else:
+            completion = count_text_tokens("".join(self._parts), self._model)
+            self._tracker.record(self._model, self._prompt_tokens, completion, estimated=True)
+
+    def __iter__(self):
+        try:
+            for chunk in self._stream:
+                self._observe(chunk)
+                yield chunk
+        finally:  # 중간에 취소해도 받은 만큼은 기록
+            self._finish()
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                self._observe(chunk)
+                yield chunk
+        finally:
+            self._finish()
+
+
+class _AccountedCompletions:
+    """client.chat.completions 대체 - create() 전후로 예산 검사와 사용량 기록"""
+
+    def __init__(self, completions, tracker: UsageTracker, is_async: bool):
+        self._completions = completions
+        self._tracker = tracker
+        if is_async:  # 바깥 래퍼(CachedChatClient)가 코루틴 함수로 알아볼 수 있도록 교체
+            self.create = self._acreate
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+    def _prepare(self, kwargs) -> Tuple[Dict[str, Any], str, int]:
+        kwargs = self._tracker.preflight(kwargs)
+        model = kwargs.get("model", DEFAULT_MODEL)
+        return kwargs, model, count_message_tokens(kwargs.get("messages", []), model)
+
+    def _finish(self, kwargs, response, model: str, prompt_tokens: int):
+        if kwargs.get("stream"):
+            return _AccountedStream(response, self._tracker, model, prompt_tokens)
+        if getattr(response, "usage", None) is not None:
+            self._tracker.record_usage(model, response.usage)
+        else:
+            completion = count_text_tokens(response.choices[0].message.content or "", model)
+            self._tracker.record(model, prompt_tokens, completion, estimated=True)
+        return response
+
+    def create(self, **kwargs):
+        kwargs, model, prompt_tokens = self._prepare(kwargs)
+        return self._finish(kwargs, self._completions.create(**kwargs), model, prompt_tokens)
+
+    async def _acreate(self, **kwargs):
+        kwargs, model, prompt_tokens = self._prepare(kwargs)
+        return self._finish(kwargs, await self._completions.create(**kwargs), model, prompt_tokens)
+
+
+class _AccountedChat:
+    def __init__(self, chat, tracker: UsageTracker, is_async: bool):
+        self._chat = chat
+        self.completions = _AccountedCompletions(chat.completions, tracker, is_async)
+
+    def __getattr__(self, name):
+        return getattr(self._chat, name)
+
+
+class AccountedChatClient:
+    """
+    OpenAI / AsyncOpenAI 클라이언트 래퍼
+
+    CachedChatClient 안쪽(실제 클라이언트 바로 바깥)에 두면 캐시 적중 요청은 비용 없이 지나가고,
+    네트워크로 나가는 요청만 예산 검사와 집계를 거칩니다.
+    """
+
+    def __init__(self, client, tracker: UsageTracker):
+        self._client = client
+        self.tracker = tracker
+        is_async = inspect.iscoroutinefunction(inspect.unwrap(client.chat.completions.create))
+        self.chat = _AccountedChat(client.chat, tracker, is_async)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def make_langchain_callback(tracker: UsageTracker, model: str = DEFAULT_MODEL, max_tokens: int = 0):
+    """
+    LangChain 콜백 핸들러 생성 - 모델 호출 직전에 예산을 검사(거절만 가능)하고 응답 사용량을 기록
+
+    ChatOpenAI(callbacks=[...])로 넘기면 invoke/stream/batch 호출 모두에 적용됩니다.
+    """
+    from langchain_core.callbacks import BaseCallbackHandler
+    from langchain_core.messages import convert_to_openai_messages
+
+    class UsageCallback(BaseCallbackHandler):
+        raise_error = True  # BudgetExceeded를 삼키지 않고 호출한 쪽으로 전달
+
+        def __init__(self):
+            self.prompt_tokens = {}
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            params = kwargs.get("invocation_params") or {}
+            name = params.get("model_name") or params.get("model") or model
+            for batch in messages:
+                request = {"model": name, "messages": convert_to_openai_messages(batch),
+                           "max_tokens": params.get("max_tokens") or max_tokens or DEFAULT_MAX_TOKENS}
+                self.prompt_tokens[run_id] = (name, count_message_tokens(request["messages"], name))
+                tracker.preflight(request)
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            name, prompt_tokens = self.prompt_tokens.pop(run_id, (model, 0))
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                    if usage:
+                        cached = (usage.get("input_token_details") or {}).get("cache_read", 0)
+                        tracker.record(name, usage["input_tokens"], usage["output_tokens"], cached)
+                    else:
+                        completion = count_text_tokens(generation.text, name)
+                        tracker.record(name, prompt_tokens, completion, estimated=True)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            self.prompt_tokens.pop(run_id, None)
+
+    return UsageCallback()
@@ -0,0 +1,118 @@
+# AutoCarz 이미지 에셋 파이프라인
+# 원본 PNG를 화면 표시 폭에 맞게 미리 줄여 WebP/PNG로 인코딩하고
+# 원본 해시 기준으로 디스크에 저장하여, 매 실행마다 다시 인코딩하지 않도록 합니다.
+
+import hashlib
+import io
+import os
+
+from PIL import Image, features
+
+IMAGE_FOLDER = "autocarz/image"
+CACHE_DIR = ".cache/autocarz_images"
+
+# 파일명 -> 화면 제목
+IMAGE_FILES = {
+    "roadkill_by_region_year.png": "각 권역 연도별 로드킬 건수",
+    "roadkill_yearly_trend.png": "연도별 로드킬 총 건수 추이",
+    "region_abnormal_ratio.png": "권역별 이상 지역 비율",
+    "roadtype_comparison.png": "연도별 도로유형별 로드킬 건수 비교",
+    "roadtype_trend.png": "도로유형별 로드킬 합계 및 추이",
+    "animal_roadkill.png": "동물 종류별 로드킬 건수 및 합계",
+    "animal_yearly_ratio.png": "동물종류 연도별 로드킬 비율",
+    "combined_4_5.png": "도로유형별 분석 (통합)"
+}
+
+# 표시 폭 (wide 레이아웃 기준: 전체 폭 / 2단 컬럼 폭)
+FULL_WIDTH = 1400
+HALF_WIDTH = 720
+
+# 페이지별로 필요한 이미지와 표시 폭
+PAGE_IMAGES = {
+    "종합 대시보드": {},
+    "실시간 모니터링 현황": {
+        "roadkill_yearly_trend.png": FULL_WIDTH,
+        "roadkill_by_region_year.png": FULL_WIDTH,
+    },
+    "연도별 로드킬 분석": {
+        "roadkill_yearly_trend.png": FULL_WIDTH,
+    },
+    "지역별 통계 분석": {
+        "roadkill_by_region_year.png": HALF_WIDTH,
+        "region_abnormal_ratio.png": HALF_WIDTH,
+    },
+    "도로유형별 분석": {
+        "combined_4_5.png": FULL_WIDTH,
+        "roadtype_comparison.png": HALF_WIDTH,
+        "roadtype_trend.png": HALF_WIDTH,
+    },
+    "동물종류별 분석": {
+        "animal_roadkill.png": HALF_WIDTH,
+        "animal_yearly_ratio.png": HALF_WIDTH,
+    },
+}
+
+# WebP 인코더가 없는 Pillow 빌드에서는 PNG로 대체
+IMAGE_FORMAT = "WEBP" if features.check("webp") else "PNG"
+
+_hash_cache = {}
+
+
+def source_hash(path):
+    """원본 파일 내용의 SHA-1 해시 (수정 시각이 같으면 다시 읽지 않음)"""
+    key = (path, os.stat(path).st_mtime_ns)
+    if key not in _hash_cache:
+        with open(path, 'rb') as f:
+            _hash_cache[key] = hashlib.sha1(f.read()).hexdigest()
+    return _hash_cache[key]
+
+
+def encode_variant(path, width, image_format=IMAGE_FORMAT):
+    """원본 이미지를 width 이하로 줄여 인코딩한 바이트 반환 (확대는 하지 않음)"""
+    with Image.open(path) as image:
+        if image.width > width:
+            height = round(image.height * width / image.width)
+            image = image.resize((width, height), Image.LANCZOS)
+        else:
+            image = image.copy()
+
+        buffer = io.BytesIO()
+        if image_format == "WEBP":
+            image.save(buffer, format="WEBP", quality=85, method=4)
+        else:
+            image.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue()
+
+
+def get_variant(filename, width, image_folder=IMAGE_FOLDER, cache_dir=CACHE_DIR):
+    """
+    표시 폭에 맞춘 이미지 변형본의 인코딩된 바이트 반환
+
+    변형본은 '파일명_원본해시_폭.확장자'로 디스크에 저장되므로
+    원본이 바뀌면 자동으로 새로 만들어집니다.
+    """
+    path = os.path.join(image_folder, filename)
+    stem = os.path.splitext(filename)[0]
+    extension = IMAGE_FORMAT.lower()
+    cache_path = os.path.join(cache_dir, f"{stem}_{source_hash(path)[:12]}_{width}.{extension}")
+
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            return f.read()
+
+    data = encode_variant(path, width)
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = cache_path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, cache_path)  # 여러 세션이 동시에 만들어도 안전하게 교체
+    return data
+
+
+def load_page_variants(page, image_folder=IMAGE_FOLDER):
+    """현재 페이지에 필요한 이미지만 {제목: 인코딩된 바이트} 형태로 반환"""
+    images = {}
+    for filename, width in PAGE_IMAGES.get(page, {}).items():
+        if os.path.exists(os.path.join(image_folder, filename)):
+            images[IMAGE_FILES[filename]] = get_variant(filename, width, image_folder)
+    return images
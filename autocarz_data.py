@@ -0,0 +1,223 @@
+# AutoCarz 로드킬 데이터 로더 및 집계 계층
+# 연도 x 권역 x 도로유형 x 동물종류 단위의 건수 데이터를 미리 집계하여
+# 대시보드 차트와 메트릭 카드를 정적 이미지/하드코딩 값 대신 데이터로 그립니다.
+#
+# 데이터 파일 형식 (dataset/roadkill.csv):
+#   year,region,road_type,species,count
+#   2023,경기도,고속국도,고라니,125
+#
+# 실제 통계 파일(dataset/roadkill.csv)은 저장소에 없습니다. 없으면 generate_sample_roadkill로 만든
+# 합성 예시 데이터(dataset/roadkill_sample.csv)를 읽고, 대시보드는 이를 "예시 데이터"로 표시합니다.
+#   python autocarz_data.py                                  # 현재 데이터 집계 확인 (파일을 쓰지 않음)
+#   python autocarz_data.py --regenerate --out PATH          # 합성 예시 데이터 다시 만들기
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+ROADKILL_PATH = "dataset/roadkill.csv"
+SAMPLE_ROADKILL_PATH = "dataset/roadkill_sample.csv"
+ROADKILL_COLUMNS = ['year', 'region', 'road_type', 'species', 'count']
+
+# 예시 데이터 구성 (권역/도로유형/동물종류별 상대 비중)
+SAMPLE_YEARS = range(2019, 2024)
+SAMPLE_REGIONS = {'경기도': 0.24, '강원도': 0.16, '충청도': 0.15, '경상도': 0.18,
+                  '전라도': 0.15, '제주도': 0.04, '수도권(서울/인천)': 0.08}
+SAMPLE_ROAD_TYPES = {'고속국도': 0.22, '일반국도': 0.38, '지방도': 0.27, '시군도': 0.13}
+SAMPLE_SPECIES = {'고라니': 0.55, '너구리': 0.14, '고양이': 0.14, '멧돼지': 0.05,
+                  '개': 0.04, '기타': 0.08}
+SAMPLE_TOTAL = 25_000
+
+
+def generate_sample_roadkill(total=SAMPLE_TOTAL, seed=42):
+    """
+    연도 x 권역 x 도로유형 x 동물종류 합성 예시 건수 데이터 (같은 seed면 항상 같은 결과)
+
+    연도별로 조금씩 늘어나는 추세에 권역/도로유형/동물종류 비중과 무작위 변동을 곱한 뒤
+    전체 합계가 정확히 total이 되도록 최대 잉여 방식으로 정수 건수를 배분합니다.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.MultiIndex.from_product(
+        [list(SAMPLE_YEARS), list(SAMPLE_REGIONS), list(SAMPLE_ROAD_TYPES), list(SAMPLE_SPECIES)],
+        names=ROADKILL_COLUMNS[:-1],
+    )
+    frame = index.to_frame(index=False)
+
+    weights = (
+        (1 + 0.06 * (frame['year'] - SAMPLE_YEARS[0]))
+        * frame['region'].map(SAMPLE_REGIONS)
+        * frame['road_type'].map(SAMPLE_ROAD_TYPES)
+        * frame['species'].map(SAMPLE_SPECIES)
+        * rng.uniform(0.7, 1.3, len(frame))
+    )
+    exact = weights / weights.sum() * total
+    counts = np.floor(exact).astype(int)
+    remainder = total - counts.sum()
+    counts[np.argsort(-(exact - counts).to_numpy())[:remainder]] += 1
+    frame['count'] = counts
+    return frame
+
+
+def roadkill_source():
+    """
+    읽을 데이터 파일과 예시 데이터 여부 (path, is_sample)
+
+    실제 데이터 파일이 있으면 그것을, 없으면 합성 예시 데이터를 씁니다 (둘 다 없으면 (None, False)).
+    """
+    if os.path.exists(ROADKILL_PATH):
+        return ROADKILL_PATH, False
+    if os.path.exists(SAMPLE_ROADKILL_PATH):
+        return SAMPLE_ROADKILL_PATH, True
+    return None, False
+
+
+def roadkill_version():
+    """읽을 데이터 파일 경로와 수정 시각 (파일이 없으면 None) - 캐시 무효화 키로 사용"""
+    path, _ = roadkill_source()
+    return (path, os.path.getmtime(path)) if path else None
+
+
+def load_roadkill(path):
+    """로드킬 데이터 로드"""
+    frame = pd.read_csv(path)
+    missing = set(ROADKILL_COLUMNS) - set(frame.columns)
+    if missing:
+        raise ValueError(f"로드킬 데이터에 필요한 컬럼이 없습니다: {sorted(missing)}")
+
+    frame = frame[ROADKILL_COLUMNS].copy()
+    frame['year'] = frame['year'].astype(int)
+    frame['count'] = frame['count'].astype(int)
+    return frame
+
+
+def _by_year(frame, column):
+    """연도 x column 건수 표"""
+    return frame.pivot_table(index='year', columns=column, values='count',
+                             aggfunc='sum', fill_value=0)
+
+
+def build_aggregates(frame, sample=False):
+    """대시보드에서 쓰는 집계 결과를 한 번에 계산 (sample: 합성 예시 데이터 여부)"""
+    by_year = frame.groupby('year')['count'].sum().sort_index()
+    by_region_year = _by_year(frame, 'region')
+    latest_year = int(by_year.index[-1])
+
+    region_latest = by_region_year.loc[latest_year].sort_values(ascending=False)
+    region_ranking = pd.DataFrame({
+        '순위': [f"{i}위" for i in range(1, len(region_latest) + 1)],
+        '권역': region_latest.index,
+        '건수': [f"{count:,}건" for count in region_latest.values],
+        '비율': [f"{count / region_latest.sum() * 100:.1f}%" for count in region_latest.values],
+    })
+
+    return {
+        'years': by_year.index.tolist(),
+        'latest_year': latest_year,
+        'total': int(by_year.sum()),
+        'by_year': by_year,
+        'by_region_year': by_region_year,
+        'by_roadtype_year': _by_year(frame, 'road_type'),
+        'by_species_year': _by_year(frame, 'species'),
+        'region_ranking': region_ranking,
+        'sample': sample,
+    }
+
+
+def yearly_change(aggregates, year):
+    """특정 연도 건수와 전년 대비 증감률(%) - 전년 데이터가 없으면 None"""
+    by_year = aggregates['by_year']
+    count = int(by_year.loc[year])
+    if year - 1 not in by_year.index or by_year.loc[year - 1] == 0:
+        return count, None
+    return count, (count / by_year.loc[year - 1] - 1) * 100
+
+
+# 차트 생성 함수
+
+def yearly_trend_chart(aggregates):
+    by_year = aggregates['by_year']
+    fig = px.line(x=by_year.index, y=by_year.values, markers=True,
+                  labels={'x': '연도', 'y': '로드킬 건수'},
+                  title='연도별 로드킬 총 건수 추이')
+    fig.update_xaxes(dtick=1)
+    return fig
+
+
+def region_year_chart(aggregates):
+    table = aggregates['by_region_year']
+    long = table.reset_index().melt(id_vars='year', var_name='권역', value_name='건수')
+    fig = px.bar(long, x='year', y='건수', color='권역', barmode='group',
+                 labels={'year': '연도'}, title='각 권역 연도별 로드킬 건수')
+    fig.update_xaxes(dtick=1)
+    return fig
+
+
+def roadtype_chart(aggregates):
+    table = aggregates['by_roadtype_year']
+    long = table.reset_index().melt(id_vars='year', var_name='도로유형', value_name='건수')
+    fig = px.bar(long, x='year', y='건수', color='도로유형', barmode='group',
+                 labels={'year': '연도'}, title='연도별 도로유형별 로드킬 건수 비교')
+    fig.update_xaxes(dtick=1)
+    return fig
+
+
+def roadtype_total_chart(aggregates):
+    totals = aggregates['by_roadtype_year'].sum().sort_values(ascending=False)
+    return px.bar(x=totals.index, y=totals.values,
+                  labels={'x': '도로유형', 'y': '건수'},
+                  title='도로유형별 로드킬 합계')
+
+
+def species_chart(aggregates):
+    totals = aggregates['by_species_year'].sum().sort_values(ascending=True)
+    return px.bar(x=totals.values, y=totals.index, orientation='h',
+                  labels={'x': '건수', 'y': '동물 종류'},
+                  title='동물 종류별 로드킬 건수 합계')
+
+
+def species_ratio_chart(aggregates):
+    table = aggregates['by_species_year']
+    ratio = table.div(table.sum(axis=1), axis=0) * 100
+    long = ratio.reset_index().melt(id_vars='year', var_name='동물 종류', value_name='비율(%)')
+    fig = px.bar(long, x='year', y='비율(%)', color='동물 종류',
+                 labels={'year': '연도'}, title='동물종류 연도별 로드킬 비율')
+    fig.update_xaxes(dtick=1)
+    return fig
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AutoCarz 로드킬 데이터 집계 확인 / 합성 예시 데이터 생성")
+    parser.add_argument("--regenerate", action="store_true", help="합성 예시 데이터를 새로 만들어 --out에 저장")
+    parser.add_argument("--out", help="--regenerate로 만든 데이터를 저장할 경로")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.regenerate:
+        if not args.out:
+            parser.error("--regenerate에는 저장할 경로 --out이 필요합니다 (예: --out dataset/roadkill_sample.csv)")
+        generate_sample_roadkill(seed=args.seed).to_csv(args.out, index=False)
+        path, sample = args.out, True
+    else:
+        path, sample = roadkill_source()
+        if path is None:
+            parser.error(f"{ROADKILL_PATH} 또는 {SAMPLE_ROADKILL_PATH}가 없습니다.")
+
+    # 집계 결과가 원본 합계와 맞는지 확인 (파일은 읽기만 함)
+    frame = load_roadkill(path)
+    aggregates = build_aggregates(frame, sample)
+    assert aggregates['total'] == int(frame['count'].sum())
+    assert int(aggregates['by_region_year'].to_numpy().sum()) == aggregates['total']
+    count, change = yearly_change(aggregates, aggregates['latest_year'])
+    label = "합성 예시 데이터" if sample else "실제 데이터"
+    print(f"✅ {path} ({label}): {len(frame):,}행, 총 {aggregates['total']:,}건 "
+          f"({aggregates['years'][0]}-{aggregates['latest_year']})")
+    change_text = f"전년 대비 {change:+.1f}%" if change is not None else "전년 데이터 없음"
+    print(f"   {aggregates['latest_year']}년 {count:,}건 ({change_text})")
+    print(aggregates['region_ranking'].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
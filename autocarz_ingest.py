@@ -0,0 +1,99 @@
+# AutoCarz 카메라 신고 비동기 처리 큐
+# 신고 버튼을 누르면 신고 번호만 바로 발급하고, 사진 저장과 썸네일 생성은
+# 크기가 제한된 큐를 통해 백그라운드 작업 스레드가 처리합니다.
+
+import io
+import logging
+import os
+import queue
+import threading
+
+from PIL import Image
+
+from autocarz_reports import STATUS_DONE, STATUS_FAILED, STATUS_PENDING, remove_files
+
+PHOTO_DIR = ".cache/autocarz_photos"
+THUMBNAIL_SIZE = (320, 320)
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueueFull(Exception):
+    """신고가 몰려 처리 대기열이 가득 찬 경우"""
+
+
+class ReportIngestor:
+    """
+    신고 사진 백그라운드 처리기
+
+    submit()은 DB에 'pending' 상태의 신고를 기록하고 즉시 신고 번호를 반환합니다.
+    작업 스레드가 사진 원본과 썸네일을 저장한 뒤 상태를 'done'으로 바꾸므로,
+    화면에서는 store.get(신고 번호)로 처리 완료 여부를 확인할 수 있습니다.
+    """
+
+    def __init__(self, store, photo_dir=PHOTO_DIR, workers=2, max_queue=100):
+        self.store = store
+        self.photo_dir = photo_dir
+        self.max_queue = max_queue
+        self.jobs = queue.Queue()
+        # 대기열 자리 - DB에 기록하기 전에 먼저 잡아서, 받을 수 없는 신고는 아예 저장하지 않음
+        self.slots = threading.BoundedSemaphore(max_queue)
+        os.makedirs(photo_dir, exist_ok=True)
+
+        self.workers = [
+            threading.Thread(target=self._worker, name=f"report-ingest-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, image_bytes, lat, lon, created_at=None, session_id=None):
+        """
+        신고 접수 후 신고 번호 반환
+
+        대기열이 가득 차 있으면 기다리지 않고(스크립트 실행 스레드를 막지 않도록) 신고를 저장하지 않은 채
+        바로 IngestQueueFull을 발생시킵니다 (지도, 군집, 위험 구간 집계에 들어가지 않음).
+        """
+        if not self.slots.acquire(blocking=False):
+            raise IngestQueueFull(f"신고 처리 대기열이 가득 찼습니다 (최대 {self.max_queue}건)")
+        try:
+            report_id = self.store.add_report(lat, lon, created_at=created_at,
+                                              session_id=session_id, status=STATUS_PENDING)
+        except Exception:
+            self.slots.release()
+            raise
+        self.jobs.put((report_id, image_bytes))  # 자리를 잡아 두었으므로 막히지 않음
+        return report_id
+
+    def pending_count(self):
+        """처리 대기 중인 작업 수"""
+        return self.jobs.qsize()
+
+    def _worker(self):
+        while True:
+            report_id, image_bytes = self.jobs.get()
+            try:
+                photo_path, thumb_path = self._save_photo(report_id, image_bytes)
+                if not self.store.update_report(report_id, STATUS_DONE, photo_path, thumb_path):
+                    remove_files([photo_path, thumb_path])  # 처리 중에 세션 기록이 초기화됨
+            except Exception:
+                logger.exception("신고 #%s 사진 처리 실패", report_id)
+                self.store.update_report(report_id, STATUS_FAILED)
+            finally:
+                self.jobs.task_done()
+                self.slots.release()
+
+    def _save_photo(self, report_id, image_bytes):
+        """원본 사진과 썸네일을 디스크에 저장하고 두 경로를 반환"""
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            extension = (image.format or 'png').lower()
+            photo_path = os.path.join(self.photo_dir, f"report_{report_id}.{extension}")
+            with open(photo_path, 'wb') as f:
+                f.write(image_bytes)
+
+            thumbnail = image.convert('RGB')
+            thumbnail.thumbnail(THUMBNAIL_SIZE)
+            thumb_path = os.path.join(self.photo_dir, f"report_{report_id}_thumb.jpg")
+            thumbnail.save(thumb_path, format='JPEG', quality=80)
+
+        return photo_path, thumb_path
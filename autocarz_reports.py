@@ -0,0 +1,214 @@
+# AutoCarz 로드킬 신고 저장소
+# 세션별 파이썬 리스트 대신 SQLite(WAL 모드)에 신고를 저장하여
+# 모든 세션이 같은 기록을 공유하고, 시간/위치 인덱스로 필요한 만큼만 조회합니다.
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+DB_PATH = ".cache/autocarz_reports.db"
+
+# 위치 인덱스 격자 크기 (경위도 0.01도 ≈ 1km)
+GRID_SIZE = 0.01
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at  TEXT    NOT NULL,
+    lat         REAL    NOT NULL,
+    lon         REAL    NOT NULL,
+    grid_x      INTEGER NOT NULL,
+    grid_y      INTEGER NOT NULL,
+    session_id  TEXT,
+    status      TEXT    NOT NULL DEFAULT 'done',
+    photo_path  TEXT,
+    thumb_path  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reports_created ON reports (created_at);
+CREATE INDEX IF NOT EXISTS idx_reports_grid ON reports (grid_x, grid_y);
+CREATE INDEX IF NOT EXISTS idx_reports_session ON reports (session_id);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key         TEXT PRIMARY KEY,
+    value       INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('generation', 0);
+"""
+
+# 이전 버전 DB 파일에 없는 컬럼 (열 때 자동으로 추가)
+ADDED_COLUMNS = {
+    'status': "TEXT NOT NULL DEFAULT 'done'",
+    'photo_path': "TEXT",
+    'thumb_path': "TEXT",
+}
+
+# 처리 상태
+STATUS_PENDING = 'pending'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+def grid_cell(lat, lon, grid_size=GRID_SIZE):
+    """위도/경도를 격자 좌표 (grid_x, grid_y)로 변환"""
+    return int(lon // grid_size), int(lat // grid_size)
+
+
+class ReportStore:
+    """SQLite 기반 신고 저장소 (스레드별 연결, 여러 세션이 공유)"""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._migrate()
+
+    def _migrate(self):
+        connection = self._connection()
+        connection.executescript(SCHEMA)
+        existing = {row['name'] for row in connection.execute("PRAGMA table_info(reports)")}
+        with connection:
+            for name, definition in ADDED_COLUMNS.items():
+                if name not in existing:
+                    connection.execute(f"ALTER TABLE reports ADD COLUMN {name} {definition}")
+
+    def _connection(self):
+        """현재 스레드 전용 연결 (스트림릿은 세션마다 다른 스레드에서 실행됨)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")  # 읽기와 쓰기가 서로 막지 않음
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _row(report, session_id=None):
+        lat, lon = float(report['lat']), float(report['lon'])
+        grid_x, grid_y = grid_cell(lat, lon)
+        created_at = report.get('time') or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return (created_at, lat, lon, grid_x, grid_y, report.get('session_id', session_id))
+
+    def add_report(self, lat, lon, created_at=None, session_id=None, status=STATUS_DONE):
+        """신고 한 건 저장 후 신고 번호(id) 반환"""
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(
+                "INSERT INTO reports (created_at, lat, lon, grid_x, grid_y, session_id, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._row({'time': created_at, 'lat': lat, 'lon': lon}, session_id) + (status,)
+            )
+        return cursor.lastrowid
+
+    def add_reports(self, reports, session_id=None):
+        """여러 건을 한 트랜잭션으로 일괄 저장 (reports: time/lat/lon 딕셔너리 목록)"""
+        rows = [self._row(report, session_id) for report in reports]
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT INTO reports (created_at, lat, lon, grid_x, grid_y, session_id) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def update_report(self, report_id, status, photo_path=None, thumb_path=None):
+        """백그라운드 처리 결과(상태, 사진 경로) 기록 - 그사이 신고가 삭제되었으면 False"""
+        connection = self._connection()
+        with connection:
+            updated = connection.execute(
+                "UPDATE reports SET status = ?, photo_path = COALESCE(?, photo_path), "
+                "thumb_path = COALESCE(?, thumb_path) WHERE id = ?",
+                (status, photo_path, thumb_path, report_id)
+            ).rowcount
+        return updated > 0
+
+    def get(self, report_id):
+        """신고 한 건 조회 (없으면 None)"""
+        row = self._connection().execute(
+            "SELECT id, created_at AS time, lat, lon, status, photo_path, thumb_path "
+            "FROM reports WHERE id = ?", (report_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def recent(self, limit=10, before_id=None):
+        """
+        최근 신고 limit건 (최신순)
+
+        다음 페이지는 마지막으로 받은 id를 before_id로 넘겨 조회합니다.
+        """
+        query = "SELECT id, created_at AS time, lat, lon, status, thumb_path FROM reports"
+        params = []
+        if before_id is not None:
+            query += " WHERE id < ?"
+            params.append(before_id)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self._connection().execute(query, params)]
+
+    def after(self, after_id=0, limit=1000):
+        """id가 after_id보다 큰 신고를 id 순으로 limit건 (증분 처리용)"""
+        rows = self._connection().execute(
+            "SELECT id, created_at AS time, lat, lon FROM reports "
+            "WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)
+        )
+        return [dict(row) for row in rows]
+
+    def in_bbox(self, min_lat, min_lon, max_lat, max_lon, limit=1000, after_id=0):
+        """
+        영역(bbox) 안의 신고 (id 순, 최대 limit건)
+
+        격자 인덱스로 후보를 좁힌 뒤 실제 좌표로 한 번 더 거릅니다.
+        다음 페이지는 마지막으로 받은 id를 after_id로 넘겨 조회합니다.
+        """
+        min_x, min_y = grid_cell(min_lat, min_lon)
+        max_x, max_y = grid_cell(max_lat, max_lon)
+        rows = self._connection().execute(
+            "SELECT id, created_at AS time, lat, lon FROM reports "
+            "WHERE grid_x BETWEEN ? AND ? AND grid_y BETWEEN ? AND ? "
+            "AND lat BETWEEN ? AND ? AND lon BETWEEN ? AND ? AND id > ? "
+            "ORDER BY id LIMIT ?",
+            (min_x, max_x, min_y, max_y, min_lat, max_lat, min_lon, max_lon, after_id, limit)
+        )
+        return [dict(row) for row in rows]
+
+    def count(self, since=None):
+        """전체 신고 수 (since가 주어지면 그 시각 이후 신고만)"""
+        if since is None:
+            return self._connection().execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM reports WHERE created_at >= ?", (since,)
+        ).fetchone()[0]
+
+    def generation(self):
+        """
+        삭제 세대 번호 - 신고가 삭제될 때마다 1씩 증가
+
+        증분 인덱스는 이 값이 바뀌면 처음부터 다시 만듭니다 (기본 키 조회 한 번이라 매번 확인해도 저렴함).
+        """
+        return self._connection().execute(
+            "SELECT value FROM store_meta WHERE key = 'generation'"
+        ).fetchone()[0]
+
+    def clear_session(self, session_id):
+        """특정 세션이 남긴 신고와 그 사진 파일(원본, 썸네일) 삭제 후 삭제한 신고 수 반환"""
+        connection = self._connection()
+        with connection:
+            paths = [path for row in connection.execute(
+                "SELECT photo_path, thumb_path FROM reports WHERE session_id = ?", (session_id,)
+            ) for path in row if path]
+            deleted = connection.execute("DELETE FROM reports WHERE session_id = ?", (session_id,)).rowcount
+            if deleted:
+                connection.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'generation'")
+        remove_files(paths)  # 커밋한 뒤에 지워서 삭제가 취소되어도 사진은 남도록 함
+        return deleted
+
+
+def remove_files(paths):
+    """파일 삭제 (이미 없는 파일은 무시)"""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,200 @@
+# AutoCarz 신고 위치 공간 집계
+# 확대 수준(zoom)별 격자로 신고 좌표를 묶어 핫스팟 마커로 만들고,
+# 새 신고가 들어올 때마다 모든 확대 수준의 격자를 증분 갱신합니다.
+# 시간 감쇠를 적용한 격자별 점수로 위험 구간을 찾아 순위를 매깁니다.
+
+import heapq
+import math
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+import pandas as pd
+
+# 지원하는 지도 확대 수준 (st.map / pydeck zoom 기준)
+MIN_ZOOM = 5
+MAX_ZOOM = 16
+
+# 한 타일(256px)을 몇 칸으로 나눌지 - 클수록 마커가 촘촘해짐
+CELLS_PER_TILE = 4
+
+
+def cell_size(zoom):
+    """확대 수준별 격자 한 칸의 크기 (경위도 degree)"""
+    return 360.0 / (2 ** zoom * CELLS_PER_TILE)
+
+
+def cell_key(lat, lon, zoom):
+    size = cell_size(zoom)
+    return math.floor(lon / size), math.floor(lat / size)
+
+
+class _IncrementalIndex(ABC):
+    """신고 저장소를 id 순으로 따라가며 증분 갱신되는 인덱스의 공통 부분"""
+
+    def __init__(self):
+        self.total = 0
+        self.last_id = 0
+        self.generation = None  # 마지막으로 반영한 저장소 삭제 세대
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()  # 여러 세션이 동시에 sync해도 중복 반영하지 않도록
+        self._reset()
+
+    @abstractmethod
+    def _reset(self):
+        """집계 상태를 비움"""
+
+    @abstractmethod
+    def add_row(self, row):
+        """저장소의 신고 한 건(id, time, lat, lon)을 반영"""
+
+    def sync(self, store, batch_size=5000):
+        """
+        저장소에서 마지막으로 반영한 id 이후의 신고만 읽어 반영
+
+        다른 세션이 신고를 삭제해 저장소의 삭제 세대가 바뀌었으면 처음부터 다시 만듭니다.
+        """
+        with self._sync_lock:
+            generation = store.generation()
+            if generation != self.generation:
+                with self._lock:
+                    self._reset()
+                    self.total = 0
+                    self.last_id = 0
+                self.generation = generation
+
+            while True:
+                rows = store.after(self.last_id, limit=batch_size)
+                for row in rows:
+                    self.add_row(row)
+                if rows:
+                    self.last_id = rows[-1]['id']
+                if len(rows) < batch_size:
+                    break
+
+
+class ClusterIndex(_IncrementalIndex):
+    """
+    확대 수준별 격자 집계 인덱스
+
+    각 수준마다 격자 칸 -> [건수, 위도 합, 경도 합]을 유지하므로
+    신고 한 건 추가는 O(확대 수준 수), 마커 조회는 O(비어 있지 않은 칸 수)입니다.
+    """
+
+    def __init__(self, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM):
+        self.zooms = range(min_zoom, max_zoom + 1)
+        super().__init__()
+
+    def _reset(self):
+        self.cells = {zoom: {} for zoom in self.zooms}
+
+    def add(self, lat, lon):
+        with self._lock:
+            for zoom in self.zooms:
+                cell = self.cells[zoom].setdefault(cell_key(lat, lon, zoom), [0, 0.0, 0.0])
+                cell[0] += 1
+                cell[1] += lat
+                cell[2] += lon
+            self.total += 1
+
+    def add_row(self, row):
+        self.add(row['lat'], row['lon'])
+
+    def clusters(self, zoom):
+        """확대 수준에 맞는 핫스팟 마커 (중심 좌표, 건수) DataFrame"""
+        zoom = min(max(zoom, self.zooms[0]), self.zooms[-1])
+        with self._lock:
+            cells = [tuple(cell) for cell in self.cells[zoom].values()]
+
+        frame = pd.DataFrame(cells, columns=['count', 'lat_sum', 'lon_sum'])
+        frame['lat'] = frame['lat_sum'] / frame['count']
+        frame['lon'] = frame['lon_sum'] / frame['count']
+
+        # 마커 반지름 (미터): 칸 크기에 비례, 건수의 제곱근으로 키움
+        cell_meters = cell_size(zoom) * 111_000
+        frame['size'] = (cell_meters * 0.15 * frame['count'].pow(0.5)).clip(upper=cell_meters)
+        return frame[['lat', 'lon', 'count', 'size']].sort_values('count', ascending=False)
+
+
+# 위험 구간 판정 설정
+HOTSPOT_ZOOM = 13          # 격자 한 칸 약 1km
+HALF_LIFE_DAYS = 30        # 신고 가중치가 절반으로 줄어드는 기간
+DANGER_SCORE = 3.0         # 감쇠 적용 후 점수가 이 값 이상이면 위험 구간
+
+# 기준 시각 재설정 임계값 (exp 오버플로 방지)
+_MAX_EXPONENT = 50.0
+
+
+def parse_report_time(text):
+    """'YYYY-MM-DD HH:MM:SS' 형식의 신고 시각을 epoch 초로 변환"""
+    return datetime.strptime(text, "%Y-%m-%d %H:%M:%S").timestamp()
+
+
+class HotspotDetector(_IncrementalIndex):
+    """
+    시간 감쇠 격자 점수 기반 위험 구간 탐지기
+
+    신고 한 건의 가중치는 exp(-λ·경과시간)으로 줄어듭니다. 모든 칸에 같은 비율로
+    줄어들기 때문에 각 칸에는 기준 시각(origin) 기준으로 키운 값 exp(λ·(t - origin))을
+    더해 두고, 조회할 때만 exp(-λ·(now - origin))을 곱합니다. 따라서 신고 추가는
+    O(1)이고, 가끔 기준 시각을 옮길 때만 전체 칸을 한 번 다시 계산합니다 (분할 상환 O(1)).
+    """
+
+    def __init__(self, half_life_days=HALF_LIFE_DAYS, zoom=HOTSPOT_ZOOM):
+        self.decay = math.log(2) / (half_life_days * 86400)
+        self.zoom = zoom
+        super().__init__()
+
+    def _reset(self):
+        self.origin = None
+        self.cells = {}  # 격자 칸 -> [기준 시각 기준 점수, 건수, 위도 합, 경도 합]
+
+    def _rebase(self, timestamp):
+        """기준 시각을 timestamp로 옮기고 모든 칸의 점수를 다시 계산"""
+        factor = math.exp(-self.decay * (timestamp - self.origin))
+        for cell in self.cells.values():
+            cell[0] *= factor
+        self.origin = timestamp
+
+    def add(self, lat, lon, timestamp):
+        with self._lock:
+            if self.origin is None:
+                self.origin = timestamp
+            if self.decay * (timestamp - self.origin) > _MAX_EXPONENT:
+                self._rebase(timestamp)
+
+            cell = self.cells.setdefault(cell_key(lat, lon, self.zoom), [0.0, 0, 0.0, 0.0])
+            cell[0] += math.exp(self.decay * (timestamp - self.origin))
+            cell[1] += 1
+            cell[2] += lat
+            cell[3] += lon
+            self.total += 1
+
+    def add_row(self, row):
+        self.add(row['lat'], row['lon'], parse_report_time(row['time']))
+
+    def _scale(self, now):
+        """기준 시각 기준 점수를 now 시점 점수로 바꾸는 배율"""
+        if self.origin is None:
+            return 1.0
+        return math.exp(-self.decay * ((now or datetime.now().timestamp()) - self.origin))
+
+    def danger_count(self, threshold=DANGER_SCORE, now=None):
+        """현재 점수가 threshold 이상인 위험 구간 수"""
+        with self._lock:
+            scale = self._scale(now)
+            return sum(1 for cell in self.cells.values() if cell[0] * scale >= threshold)
+
+    def top_k(self, k=10, now=None):
+        """현재 점수 상위 k개 위험 구간 (순위, 중심 좌표, 누적 건수, 점수) DataFrame"""
+        with self._lock:
+            scale = self._scale(now)
+            top = heapq.nlargest(k, self.cells.values(), key=lambda cell: cell[0])
+            rows = [{
+                '순위': f"{rank}위",
+                '위도': round(cell[2] / cell[1], 4),
+                '경도': round(cell[3] / cell[1], 4),
+                '누적 신고': cell[1],
+                '위험 점수': round(cell[0] * scale, 2),
+            } for rank, cell in enumerate(top, 1)]
+        return pd.DataFrame(rows, columns=['순위', '위도', '경도', '누적 신고', '위험 점수'])
@@ -1,8 +1,19 @@
 import streamlit as st
 import pandas as pd
-from PIL import Image
-import os
+import time
+import uuid
 from datetime import datetime
+from autocarz_assets import load_page_variants
+from autocarz_data import (load_roadkill, roadkill_version, build_aggregates, yearly_change, ROADKILL_PATH,
+                           yearly_trend_chart, region_year_chart, roadtype_chart,
+                           roadtype_total_chart, species_chart, species_ratio_chart)
+from autocarz_reports import ReportStore, STATUS_PENDING, STATUS_DONE
+from autocarz_ingest import ReportIngestor, IngestQueueFull
+from autocarz_spatial import (ClusterIndex, HotspotDetector, MIN_ZOOM, MAX_ZOOM,
+                              HALF_LIFE_DAYS, DANGER_SCORE)
+from autocarz_telemetry import Telemetry, format_duration
+from theme import apply_stylesheet
+from page_profiler import start_profiler, section, profiled, plotly_chart
 
 # 페이지 설정
 st.set_page_config(
@@ -11,64 +22,158 @@ st.set_page_config(
     layout="wide"
 )
 
+# 신고 사진 처리 상태 자동 확인 주기(초)와 계속 표시할 처리 완료 신고 수
+REPORT_POLL_SECONDS = 2
+RECENT_FINISHED_REPORTS = 3
+
+# CSS 파일이 없을 때 쓰는 기본 스타일
+DEFAULT_CSS = """
+.main-header {
+    text-align: center;
+    color: #333;
+    padding: 20px 0;
+    margin-bottom: 30px;
+}
+.section-panel {
+    background: white;
+    border: 1px solid #ddd;
+    border-radius: 8px;
+    padding: 20px;
+    margin-bottom: 20px;
+}
+"""
+
 # CSS 파일 로드 함수
 def load_custom_css():
-    """외부 CSS 파일을 로드하여 스타일을 적용하는 함수"""
-    try:
-        with open('styles.css', 'r', encoding='utf-8') as f:
-            css_content = f.read()
-        st.markdown(f'<style>{css_content}</style>', unsafe_allow_html=True)
-    except FileNotFoundError:
+    """외부 CSS 파일을 적용하는 함수 (압축본을 프로세스에 캐시, 파일이 바뀔 때만 다시 읽음)"""
+    if not apply_stylesheet('styles.css', fallback=DEFAULT_CSS):
         st.warning("CSS 파일을 찾을 수 없습니다. 기본 스타일을 사용합니다.")
-        # 기본 스타일 적용
-        st.markdown("""
-        <style>
-        .main-header {
-            text-align: center;
-            color: #333;
-            padding: 20px 0;
-            margin-bottom: 30px;
-        }
-        .section-panel {
-            background: white;
-            border: 1px solid #ddd;
-            border-radius: 8px;
-            padding: 20px;
-            margin-bottom: 20px;
-        }
-        </style>
-        """, unsafe_allow_html=True)
 
-# 이미지 로드 함수
+# 이미지 로드 함수 (현재 페이지에 필요한 변형본만, 인코딩된 바이트로 캐시)
+# 읽기 오류는 예외로 전달되어 캐시되지 않으므로 일시적인 실패 뒤에는 다음 실행에서 다시 읽음
 @st.cache_data
-def load_images():
-    image_folder = "autocarz/image"
-    images = {}
-    
-    if os.path.exists(image_folder):
-        image_files = {
-            "roadkill_by_region_year.png": "각 권역 연도별 로드킬 건수",
-            "roadkill_yearly_trend.png": "연도별 로드킬 총 건수 추이", 
-            "region_abnormal_ratio.png": "권역별 이상 지역 비율",
-            "roadtype_comparison.png": "연도별 도로유형별 로드킬 건수 비교",
-            "roadtype_trend.png": "도로유형별 로드킬 합계 및 추이",
-            "animal_roadkill.png": "동물 종류별 로드킬 건수 및 합계",
-            "animal_yearly_ratio.png": "동물종류 연도별 로드킬 비율",
-            "combined_4_5.png": "도로유형별 분석 (통합)"
-        }
-        
-        for filename, title in image_files.items():
-            filepath = os.path.join(image_folder, filename)
-            if os.path.exists(filepath):
-                try:
-                    images[title] = Image.open(filepath)
-                except Exception as e:
-                    st.error(f"이미지 로드 실패 {filename}: {e}")
-    
-    return images
+def load_page_images(page):
+    get_telemetry().cache_miss('images')
+    return load_page_variants(page)
+
+def load_images(page):
+    try:
+        return load_page_images(page)
+    except Exception as e:
+        st.error(f"이미지 로드 실패: {e}")
+        return {}
+
+# 로드킬 데이터 집계 함수 (데이터 파일이 바뀌면 version이 달라져 다시 집계)
+@st.cache_data
+def load_roadkill_aggregates(version):
+    get_telemetry().cache_miss('roadkill')
+    if version is None:
+        return None
+    path = version[0]
+    try:
+        return build_aggregates(load_roadkill(path), sample=path != ROADKILL_PATH)
+    except Exception as e:
+        st.error(f"로드킬 데이터 로드 실패: {e}")
+        return None
+
+# 런타임 계측 저장소 (프로세스 전체에서 하나를 공유)
+@st.cache_resource
+def get_telemetry():
+    return Telemetry()
+
+# 신고 저장소 (프로세스 전체에서 하나를 공유)
+@st.cache_resource
+def get_report_store():
+    return ReportStore()
+
+# 신고 사진 백그라운드 처리기 (프로세스 전체에서 하나를 공유)
+@st.cache_resource
+def get_ingestor():
+    return ReportIngestor(get_report_store())
+
+# 신고 위치 격자 집계 인덱스 (프로세스 전체에서 하나를 공유, 증분 갱신)
+@st.cache_resource
+def get_cluster_index():
+    return ClusterIndex()
 
-# 메인 함수
+# 시간 감쇠 위험 구간 탐지기 (프로세스 전체에서 하나를 공유, 증분 갱신)
+@st.cache_resource
+def get_hotspot_detector():
+    return HotspotDetector()
+
+@st.fragment(run_every=REPORT_POLL_SECONDS)
+def show_report_status():
+    """
+    이 세션에서 접수한 신고의 사진 처리 상태
+
+    프래그먼트로 REPORT_POLL_SECONDS마다 이 블록만 다시 실행하므로
+    페이지 전체를 새로 고치지 않아도 처리가 끝나면 바로 표시됩니다.
+    """
+    pending_reports = st.session_state.get('pending_reports', [])
+    finished = st.session_state.setdefault('finished_reports', [])
+    if pending_reports:
+        report_store = get_report_store()
+        still_pending = []
+        for report_id in pending_reports:
+            report = report_store.get(report_id)
+            if report is None:
+                continue
+            if report['status'] == STATUS_PENDING:
+                still_pending.append(report_id)
+            else:
+                finished.append((report_id, report['status']))
+        st.session_state.pending_reports = still_pending
+        # 최근에 끝난 신고 몇 건만 계속 표시
+        del finished[:-RECENT_FINISHED_REPORTS]
+    
+    for report_id, status in finished:
+        if status == STATUS_DONE:
+            st.caption(f"✅ 신고 #{report_id} 사진 처리 완료")
+        else:
+            st.caption(f"❌ 신고 #{report_id} 사진 처리 실패")
+    if st.session_state.get('pending_reports'):
+        st.caption(f"⏳ 사진 처리 중: {len(st.session_state.pending_reports)}건 "
+                   f"({REPORT_POLL_SECONDS}초마다 자동 확인)")
+
+@profiled
+def show_hotspot_ranking(report_store, k=5):
+    """신고 밀도 기반 실시간 위험 구간 순위 표"""
+    hotspots = get_hotspot_detector()
+    hotspots.sync(report_store)
+    
+    st.markdown("#### 🚧 실시간 위험 구간 순위 (신고 밀도 기준)")
+    if hotspots.total:
+        st.table(hotspots.top_k(k))
+        st.caption(f"신고 가중치는 {HALF_LIFE_DAYS}일마다 절반으로 줄어들며, "
+                   f"위험 점수 {DANGER_SCORE:g} 이상인 구간을 위험 구간으로 봅니다.")
+    else:
+        st.info("아직 접수된 신고가 없습니다.")
+
+# 현재 세션 식별자 (세션별 기록 초기화에 사용)
+def get_session_id():
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+# 메인 함수 - 스크립트 1회 실행 시간과 성공 여부를 계측
+# (DASHBOARD_PROFILE을 켜고 실행하면 페이지 하단에 구간별 소요 시간 표시)
 def main():
+    profiler = start_profiler("autocarz")
+    telemetry = get_telemetry()
+    telemetry.touch_session(get_session_id())
+    started = time.perf_counter()
+    failed = False
+    try:
+        render_app(telemetry)
+    except Exception:
+        failed = True
+        raise
+    finally:
+        telemetry.record_run(st.session_state.get('page'), time.perf_counter() - started, failed)
+        if profiler:
+            profiler.finish()
+
+def render_app(telemetry):
     load_custom_css()
     
     # 헤더
@@ -84,7 +189,7 @@ def main():
             "지역별 통계 분석",
             "도로유형별 분석",
             "동물종류별 분석"
-        ])
+        ], key="page")
         
         # 상태 정보
         st.markdown("---")
@@ -92,49 +197,80 @@ def main():
         st.info(f"현재 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         st.success("시스템 정상 운영중")
     
-    # 이미지 데이터 로드
-    images = load_images()
+    # 이미지 데이터 로드 (현재 페이지 분량만)
+    telemetry.cache_call('images')
+    with telemetry.timer('image_load'), section("이미지 로드"):
+        images = load_images(page)
+    
+    # 로드킬 집계 데이터 (없으면 기존 이미지로 표시)
+    telemetry.cache_call('roadkill')
+    with section("데이터 집계"):
+        roadkill = load_roadkill_aggregates(roadkill_version())
+    if roadkill and roadkill['sample']:
+        st.warning(f"⚠️ 로드킬 통계는 실제 데이터가 아닌 합성 예시 데이터입니다. "
+                   f"실제 통계를 보려면 {ROADKILL_PATH} 파일을 추가하세요.")
     
     if page == "종합 대시보드":
-        show_integrated_dashboard(images)
+        show_integrated_dashboard(images, roadkill)
     elif page == "실시간 모니터링 현황":
-        show_realtime_monitoring(images)
+        show_realtime_monitoring(images, roadkill)
     elif page == "연도별 로드킬 분석":
-        show_roadkill_analysis(images)
+        show_roadkill_analysis(images, roadkill)
     elif page == "지역별 통계 분석":
-        show_regional_stats(images)
+        show_regional_stats(images, roadkill)
     elif page == "도로유형별 분석":
-        show_roadtype_analysis(images)
+        show_roadtype_analysis(images, roadkill)
     elif page == "동물종류별 분석":
-        show_animal_analysis(images)
+        show_animal_analysis(images, roadkill)
 
 # 종합 대시보드 페이지 (개선된 레이아웃)
-def show_integrated_dashboard(images):
+@profiled
+def show_integrated_dashboard(images, roadkill):
     """종합 대시보드 메인 페이지 - 주요 지표와 실시간 모니터링 기능"""
     st.markdown("## 📈 AutoCarz 종합 대시보드")
     
+    report_store = get_report_store()
+    telemetry = get_telemetry()
+    
+    hotspots = get_hotspot_detector()
+    hotspots.sync(report_store)
+    
+    if roadkill:
+        total_text = f"{roadkill['total']:,}건"
+        period_text = f"{roadkill['years'][0]}-{roadkill['years'][-1]} 누적"
+        if roadkill['sample']:
+            period_text += " (예시 데이터)"
+    else:
+        total_text, period_text = "-", "데이터 없음"
+    
+    this_year = datetime.now().year
+    reports_this_year = report_store.count(since=f"{this_year}-01-01")
+    
+    success_rate = telemetry.success_rate()
+    success_text = f"{success_rate * 100:.1f}%" if success_rate is not None else "-"
+    
     # 메트릭 카드들 - 반응형 레이아웃으로 개선
-    st.markdown("""
+    st.markdown(f"""
     <div class="metric-container">
         <div class="metric-card">
             <h3>총 로드킬 건수</h3>
-            <h2>25,847건</h2>
-            <p>2019-2023 누적</p>
+            <h2>{total_text}</h2>
+            <p>{period_text}</p>
         </div>
         <div class="metric-card">
             <h3>위험 구간</h3>
-            <h2>143개소</h2>
-            <p>모니터링 중</p>
+            <h2>{hotspots.danger_count():,}개소</h2>
+            <p>신고 밀도 기준</p>
         </div>
         <div class="metric-card">
-            <h3>동물 보호 건수</h3>
-            <h2>1,254건</h2>
-            <p>금년 누적</p>
+            <h3>신고 건수</h3>
+            <h2>{reports_this_year:,}건</h2>
+            <p>{this_year}년 누적</p>
         </div>
         <div class="metric-card">
-            <h3>시스템 가동률</h3>
-            <h2>99.2%</h2>
-            <p>정상 운영중</p>
+            <h3>실행 성공률</h3>
+            <h2>{success_text}</h2>
+            <p>가동 {format_duration(telemetry.uptime())}</p>
         </div>
     </div>
     """, unsafe_allow_html=True)
@@ -161,21 +297,22 @@ def show_integrated_dashboard(images):
                 
                 if st.button("📍 로드킬 위험 신고", type="primary", use_container_width=True):
                     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    if 'photo_logs' not in st.session_state:
-                        st.session_state.photo_logs = []
                     
                     import random
                     lat = round(37.5665 + random.uniform(-0.01, 0.01), 6)
                     lon = round(126.9780 + random.uniform(-0.01, 0.01), 6)
                     
-                    st.session_state.photo_logs.insert(0, {
-                        'time': current_time,
-                        'lat': lat,
-                        'lon': lon
-                    })
-                    
-                    st.success("📍 신고 접수 완료!")
-                    st.balloons()
+                    # 사진 저장/썸네일 생성은 백그라운드에서 처리하고 신고 번호만 바로 받음
+                    try:
+                        report_id = get_ingestor().submit(
+                            camera_image.getvalue(), lat, lon,
+                            created_at=current_time, session_id=get_session_id()
+                        )
+                        st.session_state.setdefault('pending_reports', []).append(report_id)
+                        st.success(f"📍 신고 접수 완료! (신고 번호 #{report_id})")
+                        st.balloons()
+                    except IngestQueueFull:
+                        st.warning("⏳ 신고가 몰려 처리가 지연되고 있습니다. 잠시 후 다시 시도해주세요.")
             else:
                 st.markdown("""
                 <div style="
@@ -191,6 +328,9 @@ def show_integrated_dashboard(images):
                 </div>
                 """, unsafe_allow_html=True)
             
+            # 이 세션에서 접수한 신고의 사진 처리 상태 (이 부분만 주기적으로 다시 실행)
+            show_report_status()
+            
             st.markdown('</div>', unsafe_allow_html=True)
         
         # 신고 위치 지도
@@ -198,11 +338,17 @@ def show_integrated_dashboard(images):
             st.markdown('<div class="section-panel">', unsafe_allow_html=True)
             st.markdown("#### 🗺️ 신고 위치")
             
-            if 'photo_logs' in st.session_state and st.session_state.photo_logs:
-                map_data = pd.DataFrame([
-                    {'lat': log['lat'], 'lon': log['lon']} for log in st.session_state.photo_logs[:10]
-                ])
-                st.map(map_data, height=250, zoom=11)
+            # 전체 신고를 확대 수준별 격자로 묶은 핫스팟 마커만 전송
+            zoom = st.select_slider("🔍 지도 확대 수준", options=list(range(MIN_ZOOM, MAX_ZOOM + 1)),
+                                    value=11, key="report_map_zoom")
+            cluster_index = get_cluster_index()
+            cluster_index.sync(report_store)
+            
+            if cluster_index.total:
+                markers = cluster_index.clusters(zoom)
+                st.map(markers, latitude='lat', longitude='lon', size='size',
+                       height=250, zoom=zoom)
+                st.caption(f"전체 신고 {cluster_index.total:,}건 → 핫스팟 {len(markers):,}개")
             else:
                 default_map = pd.DataFrame([{'lat': 37.5665, 'lon': 126.9780}])
                 st.map(default_map, height=250, zoom=11)
@@ -218,9 +364,10 @@ def show_integrated_dashboard(images):
             st.markdown('<div class="section-panel">', unsafe_allow_html=True)
             st.markdown("#### 🗂️ 최근 신고 기록")
             
-            if 'photo_logs' in st.session_state and st.session_state.photo_logs:
+            latest_reports = report_store.recent(limit=3)
+            if latest_reports:
                 # 최대 3개만 컴팩트하게 표시
-                for i, log in enumerate(st.session_state.photo_logs[:3]):
+                for log in latest_reports:
                     st.markdown(f"""
                     <div style="
                         background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
@@ -230,7 +377,7 @@ def show_integrated_dashboard(images):
                         border-left: 4px solid #4CAF50;
                         font-size: 13px;
                     ">
-                        <strong style="color: #2c3e50;">🚨 신고 #{i+1}</strong><br>
+                        <strong style="color: #2c3e50;">🚨 신고 #{log['id']}</strong><br>
                         <span style="color: #555;">
                             📅 {log['time']}<br>
                             📍 {log['lat']:.4f}, {log['lon']:.4f}
@@ -241,12 +388,12 @@ def show_integrated_dashboard(images):
                 # 관리 버튼들
                 btn_col1, btn_col2 = st.columns(2)
                 with btn_col1:
-                    if st.button("🗑️ 기록 초기화", use_container_width=True):
-                        st.session_state.photo_logs = []
+                    if st.button("🗑️ 내 기록 초기화", use_container_width=True):
+                        report_store.clear_session(get_session_id())
                         st.rerun()
                 with btn_col2:
                     if st.button("📊 통계 보기", use_container_width=True):
-                        st.info(f"총 {len(st.session_state.photo_logs)}건의 신고")
+                        st.info(f"총 {report_store.count():,}건의 신고")
             else:
                 st.markdown("""
                 <div style="
@@ -272,18 +419,36 @@ def show_integrated_dashboard(images):
             # 메트릭 2x2 배치
             metric_row1_col1, metric_row1_col2 = st.columns(2)
             with metric_row1_col1:
-                st.metric("오늘 신고", f"{len(st.session_state.photo_logs) if 'photo_logs' in st.session_state else 0}건", "🟢")
+                today = datetime.now().strftime("%Y-%m-%d 00:00:00")
+                st.metric("오늘 신고", f"{report_store.count(since=today):,}건", "🟢")
             with metric_row1_col2:
-                st.metric("응답시간", "0.3초", "⚡")
+                run_stats = telemetry.percentiles('run')
+                if run_stats:
+                    st.metric("응답시간 (p50)", f"{run_stats[50]:.2f}초",
+                              f"p95 {run_stats[95]:.2f}초 · p99 {run_stats[99]:.2f}초",
+                              delta_color="off")
+                else:
+                    st.metric("응답시간 (p50)", "-")
             
             metric_row2_col1, metric_row2_col2 = st.columns(2)
             with metric_row2_col1:
-                st.metric("활성 사용자", "142명", "👥")
+                st.metric("활성 세션", f"{telemetry.active_sessions()}명", "최근 5분", delta_color="off")
             with metric_row2_col2:
-                st.metric("시스템 상태", "정상", "✅")
+                hit_rate = telemetry.cache_hit_rate()
+                st.metric("캐시 적중률", f"{hit_rate * 100:.1f}%" if hit_rate is not None else "-")
+            
+            # 페이지별 실행 시간 / 이미지 로드 시간 백분위수
+            page_stats = telemetry.summary(prefix='run:')
+            if page_stats:
+                st.markdown("##### ⏱️ 페이지별 실행 시간")
+                st.dataframe(pd.DataFrame(page_stats), hide_index=True, use_container_width=True)
+            image_stats = telemetry.percentiles('image_load')
+            if image_stats:
+                st.caption("🖼️ 이미지 로드 " + " · ".join(
+                    f"p{p} {seconds * 1000:.1f}ms" for p, seconds in image_stats.items()))
             
             # 시스템 상태 표시
-            st.markdown("""
+            st.markdown(f"""
             <div style="
                 background: linear-gradient(135deg, #e8f5e8 0%, #d4edda 100%);
                 padding: 15px;
@@ -291,22 +456,37 @@ def show_integrated_dashboard(images):
                 text-align: center;
                 margin-top: 10px;
             ">
-                <h5 style="color: #155724; margin: 0;">🔋 시스템 가동률: 99.2%</h5>
-                <small style="color: #155724;">모든 서비스가 정상 운영 중입니다</small>
+                <h5 style="color: #155724; margin: 0;">🔋 가동 시간: {format_duration(telemetry.uptime())}</h5>
+                <small style="color: #155724;">실행 {telemetry.runs:,}회 · 오류 {telemetry.failures:,}회</small>
             </div>
             """, unsafe_allow_html=True)
             
             st.markdown('</div>', unsafe_allow_html=True)
 
 # 실시간 모니터링 현황 페이지 (차트들 이동)
-def show_realtime_monitoring(images):
+@profiled
+def show_realtime_monitoring(images, roadkill):
     st.markdown("## 📊 실시간 모니터링 현황")
     
     # 탭으로 구성
     tab1, tab2 = st.tabs(["📈 연도별 추이", "🗺️ 권역별 현황"])
     
     with tab1:
-        if "연도별 로드킬 총 건수 추이" in images:
+        if roadkill:
+            st.markdown("### 📈 연도별 로드킬 추이")
+            plotly_chart(yearly_trend_chart(roadkill), use_container_width=True)
+            
+            # 간단한 통계 (최근 2개 연도 + 전체 평균)
+            years = roadkill['years']
+            col1, col2, col3 = st.columns(3)
+            for col, year in zip([col1, col2], years[::-1][:2]):
+                count, change = yearly_change(roadkill, year)
+                with col:
+                    st.metric(f"{year}년", f"{count:,}건",
+                              f"{change:+.1f}%" if change is not None else "")
+            with col3:
+                st.metric(f"{len(years)}년 평균", f"{roadkill['by_year'].mean():,.0f}건", "")
+        elif "연도별 로드킬 총 건수 추이" in images:
             st.markdown("### 📈 연도별 로드킬 추이")
             st.image(images["연도별 로드킬 총 건수 추이"], use_container_width=True)
             
@@ -320,29 +500,33 @@ def show_realtime_monitoring(images):
                 st.metric("5년 평균", "5,169건", "")
     
     with tab2:
-        if "각 권역 연도별 로드킬 건수" in images:
+        if roadkill:
             st.markdown("### 🗺️ 권역별 로드킬 현황")
-            st.image(images["각 권역 연도별 로드킬 건수"], use_container_width=True)
+            plotly_chart(region_year_chart(roadkill), use_container_width=True)
             
             # 권역별 순위
-            st.markdown("#### 🏆 권역별 로드킬 발생 순위 (2023년 기준)")
-            ranking_data = pd.DataFrame({
-                '순위': ['1위', '2위', '3위', '4위', '5위'],
-                '권역': ['경기도', '강원도', '충청남도', '전라남도', '경상북도'],
-                '건수': ['2,341건', '1,892건', '1,234건', '987건', '654건'],
-                '비율': ['34.2%', '27.6%', '18.0%', '14.4%', '9.5%']
-            })
-            st.table(ranking_data)
+            st.markdown(f"#### 🏆 권역별 로드킬 발생 순위 ({roadkill['latest_year']}년 기준)")
+            st.table(roadkill['region_ranking'].head(5))
+        elif "각 권역 연도별 로드킬 건수" in images:
+            st.markdown("### 🗺️ 권역별 로드킬 현황")
+            st.image(images["각 권역 연도별 로드킬 건수"], use_container_width=True)
+        
+        # 신고 위치 기반 위험 구간 순위
+        show_hotspot_ranking(get_report_store())
 
 # 로드킬 분석 페이지
-def show_roadkill_analysis(images):
+@profiled
+def show_roadkill_analysis(images, roadkill):
     st.markdown("## 🚨 로드킬 종합 분석")
     
     # 연도별 추이
-    if "연도별 로드킬 총 건수 추이" in images:
+    if roadkill or "연도별 로드킬 총 건수 추이" in images:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.markdown("### 📈 연도별 로드킬 총 건수 추이")
-        st.image(images["연도별 로드킬 총 건수 추이"], use_container_width=True)
+        if roadkill:
+            plotly_chart(yearly_trend_chart(roadkill), use_container_width=True)
+        else:
+            st.image(images["연도별 로드킬 총 건수 추이"], use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
         
         with st.expander("📝 분석 결과"):
@@ -354,17 +538,22 @@ def show_roadkill_analysis(images):
             """)
 
 # 지역별 통계 페이지  
-def show_regional_stats(images):
+@profiled
+def show_regional_stats(images, roadkill):
     st.markdown("## 🗺️ 지역별 로드킬 통계")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        if "각 권역 연도별 로드킬 건수" in images:
+        if roadkill:
+            st.markdown("### 📍 권역별 연도별 로드킬 건수")
+            plotly_chart(region_year_chart(roadkill), use_container_width=True)
+        elif "각 권역 연도별 로드킬 건수" in images:
             st.markdown("### 📍 권역별 연도별 로드킬 건수")
             st.image(images["각 권역 연도별 로드킬 건수"], use_container_width=True)
     
     with col2:
+        # 이상 지역 판정 기준은 건수 데이터에 없으므로 기존 이미지 유지
         if "권역별 이상 지역 비율" in images:
             st.markdown("### ⚠️ 권역별 이상 지역 비율")
             st.image(images["권역별 이상 지역 비율"], use_container_width=True)
@@ -378,9 +567,22 @@ def show_regional_stats(images):
         """)
 
 # 도로유형별 분석 페이지
-def show_roadtype_analysis(images):
+@profiled
+def show_roadtype_analysis(images, roadkill):
     st.markdown("## 🛣️ 도로유형별 로드킬 분석")
     
+    if roadkill:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("### 📊 연도별 도로유형별 비교")
+            plotly_chart(roadtype_chart(roadkill), use_container_width=True)
+        
+        with col2:
+            st.markdown("### 📈 도로유형별 합계")
+            plotly_chart(roadtype_total_chart(roadkill), use_container_width=True)
+        return
+    
     if "도로유형별 분석 (통합)" in images:
         st.image(images["도로유형별 분석 (통합)"], use_container_width=True)
     
@@ -397,18 +599,25 @@ def show_roadtype_analysis(images):
             st.image(images["도로유형별 로드킬 합계 및 추이"], use_container_width=True)
 
 # 동물종류별 분석 페이지
-def show_animal_analysis(images):
+@profiled
+def show_animal_analysis(images, roadkill):
     st.markdown("## 🦌 동물종류별 로드킬 분석")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        if "동물 종류별 로드킬 건수 및 합계" in images:
+        if roadkill:
+            st.markdown("### 🐾 동물 종류별 로드킬 건수")
+            plotly_chart(species_chart(roadkill), use_container_width=True)
+        elif "동물 종류별 로드킬 건수 및 합계" in images:
             st.markdown("### 🐾 동물 종류별 로드킬 건수")
             st.image(images["동물 종류별 로드킬 건수 및 합계"], use_container_width=True)
     
     with col2:
-        if "동물종류 연도별 로드킬 비율" in images:
+        if roadkill:
+            st.markdown("### 📊 동물종류 연도별 비율")
+            plotly_chart(species_ratio_chart(roadkill), use_container_width=True)
+        elif "동물종류 연도별 로드킬 비율" in images:
             st.markdown("### 📊 동물종류 연도별 비율")
             st.image(images["동물종류 연도별 로드킬 비율"], use_container_width=True)
     
@@ -421,6 +630,5 @@ def show_animal_analysis(images):
         - **소형 동물**: 지하통로, 동물 전용 횡단시설
         """)
 
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
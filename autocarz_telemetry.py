@@ -0,0 +1,139 @@
+# AutoCarz 런타임 계측
+# 페이지별 스크립트 실행 시간, 캐시 적중률, 활성 세션 수, 이미지 로드 시간을
+# 프로세스 안의 링 버퍼에 기록하고 백분위수(p50/p95/p99)로 요약합니다.
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# 지표별로 보관할 최근 샘플 수 (오래된 샘플은 자동으로 밀려남)
+SAMPLE_SIZE = 1000
+
+# 마지막 실행 후 이 시간(초)이 지나면 비활성 세션으로 봄
+SESSION_TTL = 300
+
+PERCENTILES = (50, 95, 99)
+
+
+class Telemetry:
+    """
+    프로세스 전체에서 공유하는 계측 저장소
+
+    시간 지표는 이름별 deque(maxlen)에 저장하므로 기록은 O(1)이고,
+    메모리는 지표 수 x SAMPLE_SIZE를 넘지 않습니다.
+    """
+
+    def __init__(self, sample_size=SAMPLE_SIZE, session_ttl=SESSION_TTL):
+        self.sample_size = sample_size
+        self.session_ttl = session_ttl
+        self.started_at = time.time()
+        self.timings = defaultdict(lambda: deque(maxlen=self.sample_size))
+        self.cache_calls = defaultdict(int)
+        self.cache_misses = defaultdict(int)
+        self.sessions = {}  # 세션 id -> 마지막 실행 시각
+        self.runs = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    # 시간 지표
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.timings[name].append(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        """with 블록 실행 시간을 name 지표로 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def percentiles(self, name, percentiles=PERCENTILES):
+        """name 지표의 백분위수 {50: 초, 95: 초, ...} (샘플이 없으면 None)"""
+        with self._lock:
+            samples = np.array(self.timings.get(name, ()), dtype=float)
+        if samples.size == 0:
+            return None
+        values = np.percentile(samples, percentiles)
+        return dict(zip(percentiles, values))
+
+    def summary(self, prefix=''):
+        """prefix로 시작하는 지표별 샘플 수와 백분위수 표 (행: 지표)"""
+        with self._lock:
+            names = sorted(name for name in self.timings if name.startswith(prefix))
+        rows = []
+        for name in names:
+            stats = self.percentiles(name)
+            rows.append({
+                '구간': name[len(prefix):],
+                '샘플': len(self.timings[name]),
+                **{f"p{p}(ms)": round(stats[p] * 1000, 1) for p in PERCENTILES},
+            })
+        return rows
+
+    # 캐시 적중률 - 호출부에서 cache_call, 캐시된 함수 본문에서 cache_miss를 기록
+
+    def cache_call(self, name):
+        with self._lock:
+            self.cache_calls[name] += 1
+
+    def cache_miss(self, name):
+        with self._lock:
+            self.cache_misses[name] += 1
+
+    def cache_hit_rate(self, name=None):
+        """캐시 적중률 (0~1, 호출 기록이 없으면 None) - name이 없으면 전체 합산"""
+        with self._lock:
+            names = [name] if name else list(self.cache_calls)
+            calls = sum(self.cache_calls[n] for n in names)
+            misses = sum(self.cache_misses[n] for n in names)
+        if calls == 0:
+            return None
+        return max(calls - misses, 0) / calls
+
+    # 세션 및 실행
+
+    def touch_session(self, session_id):
+        with self._lock:
+            self.sessions[session_id] = time.time()
+
+    def active_sessions(self):
+        """최근 SESSION_TTL초 안에 실행된 세션 수 (오래된 세션은 정리)"""
+        cutoff = time.time() - self.session_ttl
+        with self._lock:
+            self.sessions = {sid: seen for sid, seen in self.sessions.items() if seen >= cutoff}
+            return len(self.sessions)
+
+    def record_run(self, page, seconds, failed=False):
+        """스크립트 1회 실행 기록 (전체와 페이지별 지표에 모두 반영)"""
+        self.record('run', seconds)
+        if page:
+            self.record(f"run:{page}", seconds)
+        with self._lock:
+            self.runs += 1
+            self.failures += int(failed)
+
+    def success_rate(self):
+        """예외 없이 끝난 실행 비율 (실행 기록이 없으면 None)"""
+        with self._lock:
+            return (self.runs - self.failures) / self.runs if self.runs else None
+
+    def uptime(self):
+        return time.time() - self.started_at
+
+
+def format_duration(seconds):
+    """가동 시간 표시용 (예: 3일 4시간, 2시간 5분, 12분)"""
+    minutes, _ = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    if days:
+        return f"{days}일 {hours}시간"
+    if hours:
+        return f"{hours}시간 {minutes}분"
+    return f"{minutes}분"
@@ -0,0 +1,85 @@
+# 차트 렌더링 벤치마크
+# SVG vs WebGL 산점도의 생성 시간과 브라우저 전송 용량(JSON 크기) 비교
+#
+# 실행: python chart_benchmark.py
+#       python chart_benchmark.py --sizes 10000 100000
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from chart_factory import choose_render_mode, make_scatter
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def make_sample_data(n_points, seed=42):
+    """EV 충전 데이터와 비슷한 형태의 합성 데이터 생성"""
+    rng = np.random.default_rng(seed)
+    charge_time = rng.gamma(2.0, 1.2, n_points)
+    return pd.DataFrame({
+        'chargeTimeHrs': charge_time,
+        'kwhTotal': charge_time * 3.5 + rng.normal(0, 1.5, n_points),
+        'platform': rng.choice(['android', 'ios', 'web'], n_points),
+        'locationId': rng.integers(0, 100, n_points),
+        'dollars': rng.uniform(0, 5, n_points),
+    })
+
+
+def measure(build_figure):
+    """차트 생성 시간과 직렬화 시간, JSON 크기 측정"""
+    start = time.perf_counter()
+    fig = build_figure()
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    payload = fig.to_json()
+    serialize_time = time.perf_counter() - start
+
+    return build_time, serialize_time, len(payload.encode('utf-8'))
+
+
+def run_benchmark(sizes):
+    results = []
+
+    for n_points in sizes:
+        data = make_sample_data(n_points)
+        cases = {
+            'svg (px.scatter)': lambda: px.scatter(
+                data, x='chargeTimeHrs', y='kwhTotal', color='platform',
+                hover_data=['locationId'], render_mode='svg'),
+            'auto (make_scatter)': lambda: make_scatter(
+                data, x='chargeTimeHrs', y='kwhTotal', color='platform',
+                hover_data=['locationId']),
+        }
+
+        for name, build_figure in cases.items():
+            build_time, serialize_time, payload_bytes = measure(build_figure)
+            results.append({
+                '포인트 수': n_points,
+                '방식': name,
+                '렌더 모드': 'svg' if name.startswith('svg') else choose_render_mode(n_points),
+                '생성(초)': round(build_time, 3),
+                '직렬화(초)': round(serialize_time, 3),
+                '전송 크기(MB)': round(payload_bytes / 1024 / 1024, 2),
+            })
+
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="산점도 렌더링 벤치마크")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="측정할 포인트 수 목록")
+    args = parser.parse_args()
+
+    print("⏱️ 산점도 렌더링 벤치마크 시작...")
+    results = run_benchmark(args.sizes)
+    print(results.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
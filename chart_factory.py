@@ -0,0 +1,360 @@
+# 차트 팩토리 - 대시보드 공용 Plotly 차트 생성 함수
+# 15주차 클라우드 기반 데이터 시각화 - 대용량 데이터 렌더링 최적화
+#
+# 데이터 크기에 따라 SVG / WebGL 렌더링을 자동으로 선택하여
+# 수천 개 이상의 포인트에서도 브라우저가 느려지지 않도록 합니다.
+# 밀집된 데이터는 서버에서 2차원 구간(bin)으로 집계하여 전송합니다.
+# 박스플롯은 사분위수를 서버에서 계산하여 요약 통계만 전송합니다.
+# 히스토그램은 구간 경계와 건수만 계산하여 막대 차트로 전송합니다.
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# box_stats 결과 컬럼 (데이터가 비어 있어도 같은 컬럼을 가짐)
+BOX_STAT_COLUMNS = ['group', 'count', 'mean', 'q1', 'median', 'q3',
+                    'lowerfence', 'upperfence', 'outliers']
+
+# WebGL 전환 기준 포인트 수 (SVG는 수천 개를 넘으면 눈에 띄게 느려짐)
+WEBGL_THRESHOLD = 5000
+
+
+def choose_render_mode(n_points, threshold=WEBGL_THRESHOLD):
+    """포인트 수에 따라 'svg' 또는 'webgl' 렌더링 모드 반환"""
+    return 'webgl' if n_points > threshold else 'svg'
+
+
+def _used_columns(data, *fields, hover_data=None):
+    """차트에 실제로 사용되는 컬럼 목록 (순서 유지, 중복 제거)"""
+    columns = []
+    for field in fields:
+        if isinstance(field, str) and field in data.columns and field not in columns:
+            columns.append(field)
+
+    if isinstance(hover_data, dict):
+        hover_columns = [col for col, spec in hover_data.items() if spec is not False]
+    else:
+        hover_columns = list(hover_data or [])
+
+    for col in hover_columns:
+        if col in data.columns and col not in columns:
+            columns.append(col)
+    return columns
+
+
+def make_scatter(data, x, y, color=None, size=None, hover_data=None,
+                 threshold=WEBGL_THRESHOLD, **kwargs):
+    """
+    포인트 수에 따라 SVG / WebGL(Scattergl)을 자동 선택하는 산점도
+
+    차트에 쓰이는 컬럼만 잘라서 전달하므로 호버 정보는 customdata
+    배열(컬럼 단위)로만 직렬화되고, 사용하지 않는 컬럼은 전송되지 않습니다.
+    """
+    columns = _used_columns(data, x, y, color, size, *kwargs.values(),
+                           hover_data=hover_data)
+    render_mode = choose_render_mode(len(data), threshold)
+
+    return px.scatter(
+        data[columns],
+        x=x,
+        y=y,
+        color=color,
+        size=size,
+        hover_data=hover_data,
+        render_mode=render_mode,
+        **kwargs
+    )
+
+
+def bin_2d(data, x, y, nbins=40, mean_columns=(), mode_columns=()):
+    """
+    np.histogram2d 기반 2차원 구간 집계
+
+    각 구간(셀)별 건수와 함께 mean_columns의 평균값,
+    mode_columns의 최빈값(예: 가장 많은 제조사)을 계산합니다.
+    반환되는 배열은 모두 (y 구간 수, x 구간 수) 모양입니다.
+    """
+    xs = data[x].to_numpy(dtype=float)
+    ys = data[y].to_numpy(dtype=float)
+    valid = np.isfinite(xs) & np.isfinite(ys)
+    xs, ys = xs[valid], ys[valid]
+
+    counts, x_edges, y_edges = np.histogram2d(xs, ys, bins=nbins)
+    counts = counts.T  # Plotly Heatmap은 z[행=y][열=x] 순서
+    n_y, n_x = counts.shape
+
+    means = {}
+    for col in mean_columns:
+        values = data[col].to_numpy(dtype=float)[valid]
+        has_value = np.isfinite(values)
+        sums, _, _ = np.histogram2d(xs[has_value], ys[has_value],
+                                    bins=[x_edges, y_edges], weights=values[has_value])
+        value_counts, _, _ = np.histogram2d(xs[has_value], ys[has_value],
+                                            bins=[x_edges, y_edges])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[col] = np.where(value_counts.T > 0, sums.T / value_counts.T, np.nan)
+
+    modes = {}
+    if mode_columns:
+        # histogram2d와 같은 규칙으로 셀 번호 계산 (마지막 경계값은 마지막 구간에 포함)
+        x_idx = np.clip(np.searchsorted(x_edges, xs, side='right') - 1, 0, n_x - 1)
+        y_idx = np.clip(np.searchsorted(y_edges, ys, side='right') - 1, 0, n_y - 1)
+        cells = y_idx * n_x + x_idx
+
+        for col in mode_columns:
+            cell_values = pd.DataFrame({'cell': cells, 'value': data[col].to_numpy()[valid]})
+            top = (cell_values.groupby(['cell', 'value']).size()
+                   .reset_index(name='n')
+                   .sort_values('n', ascending=False)
+                   .drop_duplicates('cell'))
+            grid = np.full(n_y * n_x, None, dtype=object)
+            grid[top['cell'].to_numpy()] = top['value'].to_numpy()
+            modes[col] = grid.reshape(n_y, n_x)
+
+    return {
+        'counts': counts,
+        'x_edges': x_edges,
+        'y_edges': y_edges,
+        'means': means,
+        'modes': modes,
+    }
+
+
+def make_density(data, x, y, nbins=40, mean_columns=(), mode_columns=(),
+                 labels=None, title=None, colorscale='Viridis'):
+    """
+    2차원 구간 집계 결과를 Heatmap으로 표시하는 밀도 차트
+
+    브라우저로는 원본 행이 아니라 구간별 집계값만 전송되므로
+    전송 크기가 데이터 행 수가 아닌 구간 수에 비례합니다.
+    """
+    labels = labels or {}
+    binned = bin_2d(data, x, y, nbins=nbins,
+                    mean_columns=mean_columns, mode_columns=mode_columns)
+    counts = binned['counts']
+    x_edges, y_edges = binned['x_edges'], binned['y_edges']
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+
+    x_label = labels.get(x, x)
+    y_label = labels.get(y, y)
+
+    # 빈 셀은 호버 텍스트 없이 투명하게 표시
+    hover_text = np.full(counts.shape, '', dtype=object)
+    for row, col in zip(*np.nonzero(counts)):
+        lines = [
+            f"{x_label}: {x_edges[col]:.2f} ~ {x_edges[col + 1]:.2f}",
+            f"{y_label}: {y_edges[row]:.2f} ~ {y_edges[row + 1]:.2f}",
+            f"건수: {int(counts[row, col]):,}",
+        ]
+        for name, grid in binned['means'].items():
+            lines.append(f"평균 {labels.get(name, name)}: {grid[row, col]:.2f}")
+        for name, grid in binned['modes'].items():
+            lines.append(f"최다 {labels.get(name, name)}: {grid[row, col]}")
+        hover_text[row, col] = '<br>'.join(lines)
+
+    fig = go.Figure(go.Heatmap(
+        x=x_centers,
+        y=y_centers,
+        z=np.where(counts > 0, counts, np.nan),
+        text=hover_text,
+        hovertemplate='%{text}<extra></extra>',
+        colorscale=colorscale,
+        colorbar=dict(title='건수'),
+    ))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label)
+    return fig
+
+
+def box_stats(data, y, x=None):
+    """
+    그룹별 박스플롯 요약 통계 계산
+
+    사분위수는 Plotly 기본값(quartilemethod='linear')과 같은 방식이며,
+    수염은 Q1 - 1.5*IQR ~ Q3 + 1.5*IQR 안에서 가장 바깥에 있는 값까지입니다.
+    """
+    if x is None:
+        groups = [(y, data[y])]
+    else:
+        groups = data.groupby(x, sort=False)[y]
+
+    rows = []
+    for name, values in groups:
+        values = values.dropna().to_numpy(dtype=float)
+        if len(values) == 0:
+            continue
+
+        q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        low_limit, high_limit = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        is_outlier = (values < low_limit) | (values > high_limit)
+        inside = values[~is_outlier]
+
+        rows.append({
+            'group': name,
+            'count': len(values),
+            'mean': values.mean(),
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'lowerfence': inside.min(),
+            'upperfence': inside.max(),
+            'outliers': values[is_outlier],
+        })
+
+    return pd.DataFrame(rows, columns=BOX_STAT_COLUMNS)
+
+
+def _box_traces(stats, name, color=None, show_outliers=True, showlegend=True,
+                offsetgroup=None):
+    """
+    요약 통계로 go.Box(사전 계산된 펜스)와 이상치 마커 트레이스 생성
+
+    offsetgroup을 주면 같은 x 안에서 색상 그룹별로 나란히 놓인 박스와
+    이상치 마커가 같은 위치에 정렬됩니다.
+    """
+    groups = stats['group'].astype(str).tolist()
+    traces = [go.Box(
+        x=groups,
+        q1=stats['q1'],
+        median=stats['median'],
+        q3=stats['q3'],
+        lowerfence=stats['lowerfence'],
+        upperfence=stats['upperfence'],
+        mean=stats['mean'],
+        name=name,
+        marker_color=color,
+        showlegend=showlegend,
+        offsetgroup=offsetgroup,
+    )]
+
+    if show_outliers:
+        outlier_x = [group for group, outliers in zip(groups, stats['outliers'])
+                     for _ in range(len(outliers))]
+        if outlier_x:
+            traces.append(go.Scatter(
+                x=outlier_x,
+                y=np.concatenate(stats['outliers'].tolist()),
+                mode='markers',
+                name=f'{name} 이상치',
+                marker=dict(color=color, size=4, opacity=0.6),
+                showlegend=False,
+                offsetgroup=offsetgroup,
+            ))
+    return traces
+
+
+def make_box(data, y, x=None, color=None, title=None, labels=None,
+             color_discrete_sequence=None, show_outliers=True):
+    """
+    서버에서 계산한 사분위수로 그리는 박스플롯
+
+    px.box와 달리 원본 값 전체가 아니라 그룹별 요약 통계
+    (Q1/중앙값/Q3/수염/평균)와 이상치만 브라우저로 전송합니다.
+    color가 x와 같은 컬럼(또는 x 없이 color만)이면 그룹별로 색만 나누고,
+    x와 다른 컬럼이면 px.box처럼 x 안에서 color 그룹별 박스를 나란히 그립니다.
+    데이터가 비어 있으면 제목과 축 이름만 있는 빈 차트를 반환합니다.
+    """
+    labels = labels or {}
+    colors = color_discrete_sequence or px.colors.qualitative.Plotly
+
+    fig = go.Figure()
+    if color is None:
+        stats = box_stats(data, y, x)
+        for trace in _box_traces(stats, labels.get(y, y), show_outliers=show_outliers,
+                                 showlegend=False):
+            fig.add_trace(trace)
+    elif x is None or x == color:
+        stats = box_stats(data, y, color)
+        for i, (_, group_stats) in enumerate(stats.groupby('group', sort=False)):
+            group_name = str(group_stats['group'].iloc[0])
+            for trace in _box_traces(group_stats, group_name, colors[i % len(colors)],
+                                     show_outliers=show_outliers):
+                fig.add_trace(trace)
+    else:
+        for i, (group, group_data) in enumerate(data.groupby(color, sort=False)):
+            group_name = str(group)
+            stats = box_stats(group_data, y, x)
+            for trace in _box_traces(stats, group_name, colors[i % len(colors)],
+                                     show_outliers=show_outliers, offsetgroup=group_name):
+                fig.add_trace(trace)
+        fig.update_layout(boxmode='group', scattermode='group',
+                          legend_title_text=labels.get(color, color))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=labels.get(x, x),
+        yaxis_title=labels.get(y, y),
+    )
+    return fig
+
+
+def histogram_counts(data, column, nbins=30, color=None):
+    """
+    np.histogram 기반 히스토그램 구간 경계와 건수 계산
+
+    color가 주어지면 모든 그룹이 같은 구간 경계를 공유하므로
+    merge_histograms로 다시 구간을 나누지 않고 그룹 건수를 합칠 수 있습니다.
+    """
+    values = data[column].to_numpy(dtype=float)
+    finite = np.isfinite(values)
+    values = values[finite]
+    edges = np.histogram_bin_edges(values, bins=nbins)
+
+    counts = {}
+    if color is None:
+        counts[column] = np.histogram(values, bins=edges)[0]
+    else:
+        groups = data[color].to_numpy()[finite]
+        for group in pd.unique(groups):
+            counts[group] = np.histogram(values[groups == group], bins=edges)[0]
+
+    return {'column': column, 'edges': edges, 'counts': counts}
+
+
+def merge_histograms(hist, groups=None, name=None):
+    """같은 구간 경계를 공유하는 그룹별 건수를 하나로 합산"""
+    selected = list(hist['counts']) if groups is None else list(groups)
+    merged = np.zeros(len(hist['edges']) - 1, dtype=np.int64)
+    for group in selected:
+        merged += hist['counts'][group]
+
+    return {
+        'column': hist['column'],
+        'edges': hist['edges'],
+        'counts': {name or hist['column']: merged},
+    }
+
+
+def make_histogram(hist, title=None, labels=None, colors=None):
+    """미리 계산된 구간/건수로 그리는 히스토그램 (그룹이 여러 개면 누적 막대)"""
+    labels = labels or {}
+    colors = colors or px.colors.qualitative.Plotly
+    edges = hist['edges']
+    centers = (edges[:-1] + edges[1:]) / 2
+    widths = np.diff(edges)
+    x_label = labels.get(hist['column'], hist['column'])
+
+    fig = go.Figure()
+    for i, (name, counts) in enumerate(hist['counts'].items()):
+        fig.add_trace(go.Bar(
+            x=centers,
+            y=counts,
+            width=widths,
+            name=str(name),
+            marker_color=colors[i % len(colors)],
+            customdata=np.column_stack((edges[:-1], edges[1:])),
+            hovertemplate=(f'{x_label}: ' + '%{customdata[0]:.2f} ~ %{customdata[1]:.2f}<br>'
+                           '건수: %{y:,}<extra>' + str(name) + '</extra>'),
+        ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_label,
+        yaxis_title='count',
+        barmode='stack',
+        bargap=0,
+        showlegend=len(hist['counts']) > 1,
+    )
+    return fig
@@ -2,11 +2,21 @@
 # CO2 배출량 데이터 Plotly 시각화 예제
 # 환경 친화적 차량 분석 대시보드
 
+import argparse
+
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
+from chart_factory import make_scatter, make_density, make_box
+
+# 버블 차트 보기 방식: "point" (개별 차량) 또는 "density" (구간별 집계)
+# 실행 예: python co2_plotly_viz.py --view density
+parser = argparse.ArgumentParser(description="CO2 배출량 데이터 Plotly 시각화")
+parser.add_argument("--view", choices=["point", "density"], default="point",
+                    help="버블 차트 보기 방식 (point: 개별 차량, density: 구간별 집계)")
+args = parser.parse_args()
 
 # 데이터 로드
 co2_data = pd.read_csv("dataset/CO2_Emissions.csv")
@@ -23,28 +33,49 @@ print("\n🎨 생성 중: 인터랙티브 버블 차트...")
 top_makes = co2_data['Make'].value_counts().head(15).index
 filtered_data = co2_data[co2_data['Make'].isin(top_makes)].copy()
 
-# 버블 차트 생성
-fig_bubble = px.scatter(
-    filtered_data,
-    x='Engine Size(L)',
-    y='CO2 Emissions(g/km)',
-    size='Fuel Consumption Comb (mpg)',  # 버블 크기: 연비 (역설적으로 큰 것이 좋음)
-    color='Make',  # 색상: 제조사별
-    hover_data={
-        'Model': True,
-        'Vehicle Class': True,
-        'Cylinders': True,
-        'Fuel Consumption Comb (mpg)': ':.1f'
-    },
-    title='🌍 차량별 환경 성능 분석: 엔진 크기 vs CO2 배출량 vs 연비',
-    labels={
-        'Engine Size(L)': '🔧 엔진 크기 (L)',
-        'CO2 Emissions(g/km)': '🌱 CO2 배출량 (g/km)',
-        'Make': '🏭 제조사'
-    },
-    size_max=20,
-    color_discrete_sequence=px.colors.qualitative.Set3
-)
+bubble_labels = {
+    'Engine Size(L)': '🔧 엔진 크기 (L)',
+    'CO2 Emissions(g/km)': '🌱 CO2 배출량 (g/km)',
+    'Fuel Consumption Comb (mpg)': '연비 (mpg)',
+    'Make': '🏭 제조사'
+}
+
+if args.view == "density":
+    # 밀도 차트 생성 (구간별 건수, 평균 연비, 최다 제조사만 전송)
+    fig_bubble = make_density(
+        filtered_data,
+        x='Engine Size(L)',
+        y='CO2 Emissions(g/km)',
+        nbins=30,
+        mean_columns=['Fuel Consumption Comb (mpg)'],
+        mode_columns=['Make'],
+        labels=bubble_labels
+    )
+    bubble_subtitle = '색상: 차량 수 | 호버: 평균 연비, 최다 제조사 | 위치: 엔진크기 vs CO2배출량'
+else:
+    # 버블 차트 생성 (포인트 수가 많으면 WebGL로 자동 전환)
+    fig_bubble = make_scatter(
+        filtered_data,
+        x='Engine Size(L)',
+        y='CO2 Emissions(g/km)',
+        size='Fuel Consumption Comb (mpg)',  # 버블 크기: 연비 (역설적으로 큰 것이 좋음)
+        color='Make',  # 색상: 제조사별
+        hover_data={
+            'Model': True,
+            'Vehicle Class': True,
+            'Cylinders': True,
+            'Fuel Consumption Comb (mpg)': ':.1f'
+        },
+        title='🌍 차량별 환경 성능 분석: 엔진 크기 vs CO2 배출량 vs 연비',
+        labels={
+            'Engine Size(L)': '🔧 엔진 크기 (L)',
+            'CO2 Emissions(g/km)': '🌱 CO2 배출량 (g/km)',
+            'Make': '🏭 제조사'
+        },
+        size_max=20,
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    bubble_subtitle = '버블 크기: 연비 (mpg) | 색상: 제조사 | 위치: 엔진크기 vs CO2배출량'
 
 # 친환경 기준선 추가
 fig_bubble.add_hline(
@@ -67,7 +98,7 @@ fig_bubble.add_vline(
 # 레이아웃 개선
 fig_bubble.update_layout(
     title={
-        'text': '🌍 차량별 환경 성능 분석<br><sub>버블 크기: 연비 (mpg) | 색상: 제조사 | 위치: 엔진크기 vs CO2배출량</sub>',
+        'text': f'🌍 차량별 환경 성능 분석<br><sub>{bubble_subtitle}</sub>',
         'x': 0.5,
         'xanchor': 'center',
         'font': {'size': 18}
@@ -209,7 +240,8 @@ fig_ranking.show()
 # 3. 📊 차량 클래스별 CO2 분포 박스플롯
 print("\n📦 생성 중: 차량 클래스별 CO2 분포...")
 
-fig_box = px.box(
+# 사분위수는 서버에서 계산하여 클래스별 요약 통계만 전송
+fig_box = make_box(
     co2_data,
     x='Vehicle Class',
     y='CO2 Emissions(g/km)',
@@ -0,0 +1,79 @@
+# 글로벌 인터넷 사용자 패널 데이터 저장소
+# 15주차 클라우드 기반 데이터 시각화 - 연도별 인덱스 배열 구조
+#
+# (국가, 연도) 형태의 긴(long) 데이터를 지표별 2차원 NumPy 배열
+# (국가 수 x 연도 수)로 변환하여, 연도별 지도 / 국가별 추이 / 상위 N개 순위를
+# groupby나 필터 없이 배열 슬라이스로 계산합니다.
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = "dataset/global_internet_users.csv"
+
+METRICS = [
+    'Cellular Subscription',
+    'Internet Users(%)',
+    'No. of Internet Users',
+    'Broadband Subscription',
+]
+
+
+class InternetPanel:
+    """국가 x 연도 지표 배열 저장소 (ISO 코드 / 연도 인덱스 포함)"""
+
+    def __init__(self, codes, names, years, values):
+        self.codes = np.asarray(codes)
+        self.names = np.asarray(names)
+        self.years = np.asarray(years)
+        self.values = values  # 지표명 -> (국가 수, 연도 수) float 배열
+        self.code_index = {code: i for i, code in enumerate(self.codes)}
+        self.year_index = {int(year): j for j, year in enumerate(self.years)}
+
+    @classmethod
+    def from_frame(cls, frame, metrics=METRICS):
+        """긴 형태의 DataFrame을 지표별 2차원 배열로 변환"""
+        codes, code_pos = np.unique(frame['Code'].to_numpy(), return_inverse=True)
+        years, year_pos = np.unique(frame['Year'].to_numpy(), return_inverse=True)
+        names = (frame.drop_duplicates('Code')
+                 .set_index('Code')['Entity']
+                 .reindex(codes)
+                 .to_numpy())
+
+        values = {}
+        for metric in metrics:
+            grid = np.full((len(codes), len(years)), np.nan)
+            grid[code_pos, year_pos] = frame[metric].to_numpy(dtype=float)
+            values[metric] = grid
+
+        return cls(codes, names, years, values)
+
+    def year_slice(self, metric, year):
+        """특정 연도의 국가별 값 (codes 순서)"""
+        return self.values[metric][:, self.year_index[int(year)]]
+
+    def country_series(self, metric, code):
+        """특정 국가의 연도별 값 (years 순서)"""
+        return self.values[metric][self.code_index[code]]
+
+    def top_n(self, metric, year, n=10):
+        """
+        특정 연도 상위 N개 국가 (code, name, value) 목록
+
+        전체 정렬 대신 argpartition으로 상위 N개만 골라낸 뒤 그 안에서만 정렬합니다.
+        """
+        column = self.year_slice(metric, year)
+        scores = np.where(np.isfinite(column), column, -np.inf)
+        n = min(n, int(np.isfinite(column).sum()))
+        if n == 0:
+            return []
+
+        top = np.argpartition(scores, -n)[-n:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(self.codes[i], self.names[i], column[i]) for i in top]
+
+
+def load_panel(path=DATA_PATH):
+    """CSV를 읽어 패널 저장소 생성 (이름 없는 인덱스 컬럼은 인덱스로 흡수)"""
+    frame = pd.read_csv(path, index_col=0)
+    frame = frame[frame['Code'].str.len() == 3]  # OWID_WRL 같은 집계 행 제외
+    return InternetPanel.from_frame(frame)
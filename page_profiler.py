@@ -0,0 +1,222 @@
+# 스트림릿 페이지 구간별 프로파일러
+# 서버를 띄울 때 환경변수 DASHBOARD_PROFILE을 켜 둔 경우에만 동작합니다.
+#   DASHBOARD_PROFILE=1 (또는 timing/cprofile)  모든 실행을 그 모드로 프로파일 (URL ?profile=로 모드 변경/끄기)
+#   DASHBOARD_PROFILE=query                     URL에 ?profile=1 또는 ?profile=cprofile이 있는 실행만 프로파일
+# 환경변수가 없으면 URL 쿼리는 무시합니다 (tracemalloc은 프로세스 전체를 느리게 하므로
+# 방문자가 URL만으로 켤 수 없도록 함).
+# 구간(데이터 로드, 필터, 집계, 차트 생성, 직렬화)별 실행 시간과 메모리 할당량을 기록해
+# 페이지 하단에 접을 수 있는 워터폴 차트로 보여주고,
+# cprofile 모드면 rerun마다 cProfile 결과를 .cache/profiles/*.pstats로 저장합니다 (앱별 최근 PROFILE_KEEP개만 유지).
+#
+# 사용 예:
+#   profiler = start_profiler("dashboard")
+#   try:
+#       with section("데이터 로드"):
+#           data = load_data()
+#   finally:
+#       if profiler:
+#           profiler.finish()
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+PROFILE_ENV = "DASHBOARD_PROFILE"
+PROFILE_PARAM = "profile"
+PROFILE_DIR = ".cache/profiles"
+PROFILE_QUERY_ONLY = "query"
+
+# 앱별로 남겨 둘 최근 cProfile 결과 파일 수
+PROFILE_KEEP = 20
+
+# 프로파일 결과 하단에 보여줄 pstats 상위 함수 수
+PSTATS_TOP = 20
+
+# 스크립트 실행 스레드(세션)별 현재 프로파일러
+_current = threading.local()
+
+# tracemalloc은 프로세스 전체에 하나뿐이라, 마지막 사용자가 끝날 때만 멈춤
+_tracing_users = 0
+_tracing_lock = threading.Lock()
+
+
+def _normalize_mode(mode):
+    mode = str(mode).lower()
+    if mode in ("", "0", "off", "false"):
+        return None
+    return "cprofile" if mode == "cprofile" else "timing"
+
+
+def requested_mode():
+    """요청된 프로파일 모드 ('timing', 'cprofile' 또는 꺼져 있으면 None)"""
+    enabled = os.environ.get(PROFILE_ENV, "").lower()
+    if _normalize_mode(enabled) is None:
+        return None  # 서버에서 켜지 않았으면 URL 쿼리로도 켤 수 없음
+
+    default = "" if enabled == PROFILE_QUERY_ONLY else enabled
+    try:
+        mode = st.query_params.get(PROFILE_PARAM, default)
+    except AttributeError:  # streamlit < 1.30
+        mode = st.experimental_get_query_params().get(PROFILE_PARAM, [default])[0]
+    return _normalize_mode(mode)
+
+
+def _start_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class PageProfiler:
+    """스크립트 1회 실행(rerun) 동안의 구간별 시간/메모리 기록"""
+
+    def __init__(self, app, mode="timing", dump_dir=PROFILE_DIR):
+        self.app = app
+        self.mode = mode
+        self.dump_dir = dump_dir
+        self.sections = []
+        self.depth = 0
+        self.started = None
+        self.dump_path = None
+        self._profile = None
+        self._tracing = False
+
+    def start(self):
+        _start_tracing()
+        self._tracing = True
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self.started = time.perf_counter()
+        _current.profiler = self
+        return self
+
+    @contextmanager
+    def section(self, label):
+        """with 블록을 하나의 구간으로 기록 (중첩 가능)"""
+        entry = {
+            'label': label,
+            'depth': self.depth,
+            'start': time.perf_counter() - self.started,
+        }
+        memory_before = tracemalloc.get_traced_memory()[0]
+        self.sections.append(entry)
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            entry['duration'] = time.perf_counter() - self.started - entry['start']
+            entry['allocated'] = tracemalloc.get_traced_memory()[0] - memory_before
+
+    def finish(self):
+        """기록을 마치고 (cProfile 결과 저장 후) 페이지 하단에 결과 표시"""
+        total = time.perf_counter() - self.started
+        try:
+            peak = tracemalloc.get_traced_memory()[1]
+            if self._profile:
+                self._profile.disable()
+                self._dump()
+        finally:
+            # 저장에 실패해도 이 실행의 tracemalloc 사용은 반드시 끝냄
+            if self._tracing:
+                self._tracing = False
+                _stop_tracing()
+            _current.profiler = None
+        self.render(total, peak)
+
+    def _dump(self):
+        """cProfile 결과 저장 후 이 앱의 오래된 결과 파일 정리 (최근 PROFILE_KEEP개만 유지)"""
+        os.makedirs(self.dump_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.dump_path = os.path.join(self.dump_dir, f"{self.app}_{stamp}.pstats")
+        self._profile.dump_stats(self.dump_path)
+
+        # 파일 이름의 시각이 정렬 순서와 같으므로 이름순으로 오래된 것부터 삭제
+        dumps = sorted(name for name in os.listdir(self.dump_dir)
+                       if name.startswith(f"{self.app}_") and name.endswith(".pstats"))
+        for name in dumps[:-PROFILE_KEEP]:
+            try:
+                os.remove(os.path.join(self.dump_dir, name))
+            except FileNotFoundError:  # 다른 세션이 먼저 지움
+                pass
+
+    def timeline(self):
+        """구간 기록 DataFrame (시작 순서)"""
+        frame = pd.DataFrame(self.sections, columns=['label', 'depth', 'start', 'duration', 'allocated'])
+        frame['구간'] = ['  ' * depth + label for depth, label in zip(frame['depth'], frame['label'])]
+        frame['시작(ms)'] = (frame['start'] * 1000).round(1)
+        frame['소요(ms)'] = (frame['duration'] * 1000).round(1)
+        frame['할당(KB)'] = (frame['allocated'] / 1024).round(1)
+        return frame
+
+    def render(self, total, peak):
+        with st.expander(f"⏱️ 프로파일: 전체 {total * 1000:.0f}ms · 최대 메모리 {peak / 1024 ** 2:.1f}MB"):
+            if self.sections:
+                frame = self.timeline()
+                fig = go.Figure(go.Bar(
+                    y=frame['구간'], x=frame['소요(ms)'], base=frame['시작(ms)'],
+                    orientation='h', marker_color=frame['depth'],
+                    hovertemplate='%{y}<br>시작 %{base}ms<br>소요 %{x}ms<extra></extra>'
+                ))
+                fig.update_yaxes(autorange='reversed')
+                fig.update_layout(height=max(200, 24 * len(frame) + 80),
+                                  xaxis_title='경과 시간 (ms)', margin=dict(l=10, r=10, t=10, b=10))
+                st.plotly_chart(fig, use_container_width=True)
+                st.dataframe(frame[['구간', '시작(ms)', '소요(ms)', '할당(KB)']],
+                             hide_index=True, use_container_width=True)
+
+            if self.dump_path:
+                st.caption(f"cProfile 저장: {self.dump_path}")
+                buffer = io.StringIO()
+                pstats.Stats(self.dump_path, stream=buffer).sort_stats('cumulative').print_stats(PSTATS_TOP)
+                st.code(buffer.getvalue(), language=None)
+
+
+def start_profiler(app):
+    """프로파일이 요청된 경우에만 프로파일러를 시작해 반환 (아니면 None)"""
+    mode = requested_mode()
+    return PageProfiler(app, mode).start() if mode else None
+
+
+def section(label):
+    """현재 프로파일러의 구간 (프로파일이 꺼져 있으면 아무 일도 하지 않음)"""
+    profiler = getattr(_current, 'profiler', None)
+    return profiler.section(label) if profiler else nullcontext()
+
+
+def profiled(func):
+    """함수 전체를 함수 이름의 구간으로 기록하는 데코레이터"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with section(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def plotly_chart(fig, **kwargs):
+    """st.plotly_chart와 같되, 차트 직렬화/전송 시간을 구간으로 기록"""
+    title = fig.layout.title.text
+    with section(f"직렬화: {title}" if title else "직렬화"):
+        return st.plotly_chart(fig, **kwargs)
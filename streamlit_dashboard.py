@@ -11,7 +11,16 @@ from plotly.subplots import make_subplots
 import seaborn as sns
 import matplotlib.pyplot as plt
 from datetime import datetime, time
+from time import perf_counter
 import warnings
+import httpx
+from openai import OpenAI, OpenAIError
+from chart_factory import (make_scatter, make_density, make_box,
+                           histogram_counts, merge_histograms, make_histogram)
+from world_map import TOLERANCES, load_world_geometry, make_choropleth
+from internet_panel import load_panel
+from theme import apply_css
+from page_profiler import start_profiler, section, profiled, plotly_chart
 warnings.filterwarnings('ignore')
 
 # 페이지 설정
@@ -22,9 +31,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# CSS 스타일
-st.markdown("""
-<style>
+# CSS 스타일 (압축본을 프로세스에 캐시)
+DASHBOARD_CSS = """
 .main {
     padding-top: 1rem;
 }
@@ -34,8 +42,8 @@ st.markdown("""
     padding: 0.5rem;
     border-radius: 0.25rem;
 }
-</style>
-""", unsafe_allow_html=True)
+"""
+apply_css(DASHBOARD_CSS)
 
 # 데이터 로드 함수
 @st.cache_data
@@ -66,15 +74,58 @@ def load_data():
     
     return abnb_stock, ev_charge, medical_cost, co2_data, covid_india, product_inspection
 
-# 메인 함수
+# 인터넷 사용자 데이터 로드 함수 (해당 페이지에서만 사용)
+@st.cache_data
+def load_internet_panel():
+    """글로벌 인터넷 사용자 데이터를 국가 x 연도 배열 저장소로 로드"""
+    return load_panel()
+
+# 간략화 지도 캐시 함수
+@st.cache_data
+def get_world_geometry(tolerance):
+    """허용 오차별 간략화 세계 지도 GeoJSON (프로세스 내 캐시)"""
+    return load_world_geometry(tolerance)
+
+# 히스토그램 구간 캐시 함수
+@st.cache_data(max_entries=128)
+def get_histogram(dataset, column, filter_state, nbins, color=None, _data=None):
+    """히스토그램 구간/건수를 (데이터셋, 컬럼, 필터 상태, 구간 수) 기준으로 캐시"""
+    return histogram_counts(_data, column, nbins=nbins, color=color)
+
+# LLM 클라이언트 캐시 함수 - 모든 세션이 하나의 연결 풀을 공유
+@st.cache_resource
+def get_llm_client():
+    """
+    프로세스 전체에서 공유하는 OpenAI 클라이언트
+
+    httpx 연결 풀과 keep-alive 연결을 재사용하므로 동시 사용자가 많아도
+    요청마다 TCP/TLS 연결을 새로 맺지 않습니다.
+    API 키와 서버 주소는 OPENAI_API_KEY / OPENAI_BASE_URL 환경변수에서 읽습니다.
+    """
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=120),
+        timeout=httpx.Timeout(60.0, connect=5.0)
+    )
+    return OpenAI(http_client=http_client, max_retries=2)
+
+# 메인 함수 - DASHBOARD_PROFILE을 켜고 실행하면 페이지 하단에 구간별 소요 시간 표시
 def main():
+    profiler = start_profiler("dashboard")
+    try:
+        render_dashboard()
+    finally:
+        if profiler:
+            profiler.finish()
+
+def render_dashboard():
     # 제목
     st.title("📊 종합 데이터 시각화 대시보드")
     st.markdown("##### 15주차 클라우드 기반 데이터 시각화 - 스트림릿 실습")
     
     # 데이터 로드
     try:
-        abnb_stock, ev_charge, medical_cost, co2_data, covid_india, product_inspection = load_data()
+        with section("데이터 로드"):
+            abnb_stock, ev_charge, medical_cost, co2_data, covid_india, product_inspection = load_data()
         st.success("데이터 로드 완료! 📈")
     except Exception as e:
         st.error(f"데이터 로드 실패: {e}")
@@ -87,7 +138,7 @@ def main():
     page = st.sidebar.selectbox(
         "분석할 데이터 선택",
         ["📊 전체 개요", "📈 ABNB 주식", "⚡ EV 충전", "🏥 의료비", "🌱 CO2 배출량", 
-         "🦠 Covid-19 인도", "🏭 제품 검사", "🔧 스트림릿 구성요소"]
+         "🦠 Covid-19 인도", "🏭 제품 검사", "🌐 인터넷 사용자", "💬 데이터 챗봇", "🔧 스트림릿 구성요소"]
     )
     
     # 페이지별 렌더링
@@ -105,9 +156,19 @@ def main():
         render_covid_analysis(covid_india)
     elif page == "🏭 제품 검사":
         render_product_inspection(product_inspection)
+    elif page == "🌐 인터넷 사용자":
+        with section("데이터 로드: 인터넷 사용자"):
+            panel = load_internet_panel()
+        render_internet_analysis(panel)
+    elif page == "💬 데이터 챗봇":
+        render_chat_page({
+            "ABNB 주식": abnb_stock, "EV 충전": ev_charge, "의료비": medical_cost,
+            "CO2 배출량": co2_data, "Covid-19 인도": covid_india, "제품 검사": product_inspection
+        })
     elif page == "🔧 스트림릿 구성요소":
         render_streamlit_components()
 
+@profiled
 def render_overview(abnb_stock, ev_charge, medical_cost, co2_data, covid_india, product_inspection):
     """전체 개요 페이지"""
     st.header("📊 데이터셋 전체 개요")
@@ -174,7 +235,7 @@ def render_overview(abnb_stock, ev_charge, medical_cost, co2_data, covid_india,
         
         # 간단한 차트
         fig = px.line(abnb_stock, x='Date', y='Close', title='ABNB 주가 추이')
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
     
     with tab2:
         st.subheader("EV 충전 데이터 미리보기")
@@ -184,16 +245,16 @@ def render_overview(abnb_stock, ev_charge, medical_cost, co2_data, covid_india,
         platform_counts = ev_charge['platform'].value_counts()
         fig = px.pie(values=platform_counts.values, names=platform_counts.index, 
                      title='플랫폼별 충전 세션 분포')
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
     
     with tab3:
         st.subheader("의료비 데이터 미리보기")
         st.dataframe(medical_cost.head(), use_container_width=True)
         
         # 흡연 여부별 의료비
-        fig = px.box(medical_cost, x='smoker', y='charges', 
-                     title='흡연 여부별 의료비 분포')
-        st.plotly_chart(fig, use_container_width=True)
+        fig = make_box(medical_cost, x='smoker', y='charges', 
+                       title='흡연 여부별 의료비 분포')
+        plotly_chart(fig, use_container_width=True)
     
     with tab4:
         st.subheader("CO2 배출량 데이터 미리보기")
@@ -206,7 +267,7 @@ def render_overview(abnb_stock, ev_charge, medical_cost, co2_data, covid_india,
                      color=make_co2_avg.values,
                      color_continuous_scale='RdYlGn_r')
         fig.update_layout(xaxis_title='평균 CO2 배출량 (g/km)', yaxis_title='제조사')
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
     
     with tab5:
         st.subheader("Covid-19 인도 데이터 미리보기")
@@ -222,23 +283,24 @@ def render_overview(abnb_stock, ev_charge, medical_cost, co2_data, covid_india,
                      color='confirmed',
                      color_continuous_scale='Reds')
         fig.update_layout(xaxis_title='확진자 수', yaxis_title='지역')
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
     
     with tab6:
         st.subheader("제품 검사 데이터 미리보기")
         st.dataframe(product_inspection.head(), use_container_width=True)
         
         # 검사 단계별 측정값 분포
-        fig = px.box(product_inspection, x='inspection_step', y='value',
-                     title='검사 단계별 측정값 분포')
+        fig = make_box(product_inspection, x='inspection_step', y='value',
+                       title='검사 단계별 측정값 분포')
         fig.add_hline(y=product_inspection['target'].iloc[0], line_dash="dash", 
                      line_color="green", annotation_text="Target")
         fig.add_hline(y=product_inspection['upper_spec'].iloc[0], line_dash="dash", 
                      line_color="red", annotation_text="Upper Spec")
         fig.add_hline(y=product_inspection['lower_spec'].iloc[0], line_dash="dash", 
                      line_color="red", annotation_text="Lower Spec")
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
+@profiled
 def render_abnb_analysis(abnb_stock):
     """ABNB 주식 분석 페이지"""
     st.header("📈 ABNB 주식 데이터 분석")
@@ -270,7 +332,7 @@ def render_abnb_analysis(abnb_stock):
         height=500
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(fig, use_container_width=True)
     
     # 거래량과 주가 상관관계
     col1, col2 = st.columns(2)
@@ -278,7 +340,7 @@ def render_abnb_analysis(abnb_stock):
     with col1:
         fig_volume = px.bar(filtered_data, x='Date', y='Volume', 
                            title='일별 거래량')
-        st.plotly_chart(fig_volume, use_container_width=True)
+        plotly_chart(fig_volume, use_container_width=True)
     
     with col2:
         # 일일 수익률 계산
@@ -288,8 +350,9 @@ def render_abnb_analysis(abnb_stock):
         fig_return = px.line(filtered_data, x='Date', y='Daily_Return',
                             title='일일 수익률 (%)')
         fig_return.add_hline(y=0, line_dash="dash", line_color="red")
-        st.plotly_chart(fig_return, use_container_width=True)
+        plotly_chart(fig_return, use_container_width=True)
 
+@profiled
 def render_ev_analysis(ev_charge):
     """EV 충전 분석 페이지"""
     st.header("⚡ 전기차 충전 패턴 분석")
@@ -304,10 +367,12 @@ def render_ev_analysis(ev_charge):
     )
     
     # 데이터 필터링
-    filtered_data = ev_charge[
-        (ev_charge['kwhTotal'] >= min_kwh) &
-        (ev_charge['platform'].isin(selected_platform))
-    ]
+    with section("필터"):
+        filtered_data = ev_charge[
+            (ev_charge['kwhTotal'] >= min_kwh) &
+            (ev_charge['platform'].isin(selected_platform))
+        ]
+    filter_state = (min_kwh, tuple(selected_platform))
     
     # 기본 통계
     col1, col2, col3, col4 = st.columns(4)
@@ -328,14 +393,25 @@ def render_ev_analysis(ev_charge):
         col1, col2 = st.columns(2)
         
         with col1:
-            fig1 = px.histogram(filtered_data, x='kwhTotal', nbins=30,
-                               title='충전량 분포')
-            st.plotly_chart(fig1, use_container_width=True)
+            with section("집계: 충전량 히스토그램"):
+                kwh_hist = get_histogram('ev_charge', 'kwhTotal', filter_state, 30,
+                                         _data=filtered_data)
+            with section("차트 생성: 충전량 분포"):
+                fig1 = make_histogram(kwh_hist, title='충전량 분포')
+            plotly_chart(fig1, use_container_width=True)
         
         with col2:
-            fig2 = px.scatter(filtered_data, x='chargeTimeHrs', y='kwhTotal',
-                             color='platform', title='충전시간 vs 충전량')
-            st.plotly_chart(fig2, use_container_width=True)
+            view_mode = st.radio("보기 방식", ["포인트", "밀도"], horizontal=True,
+                                 key='ev_scatter_view')
+            with section(f"차트 생성: 충전시간 vs 충전량 ({view_mode})"):
+                if view_mode == "밀도":
+                    fig2 = make_density(filtered_data, x='chargeTimeHrs', y='kwhTotal',
+                                        mean_columns=['dollars'], mode_columns=['platform'],
+                                        title='충전시간 vs 충전량 (밀도)')
+                else:
+                    fig2 = make_scatter(filtered_data, x='chargeTimeHrs', y='kwhTotal',
+                                       color='platform', title='충전시간 vs 충전량')
+            plotly_chart(fig2, use_container_width=True)
     
     with tab2:
         # 요일별 패턴
@@ -348,7 +424,7 @@ def render_ev_analysis(ev_charge):
         weekday_df = pd.DataFrame(weekday_data)
         fig3 = px.bar(weekday_df, x='Day', y='Sessions',
                      title='요일별 충전 세션 수')
-        st.plotly_chart(fig3, use_container_width=True)
+        plotly_chart(fig3, use_container_width=True)
         
         # 시간대별 패턴
         hourly_data = filtered_data['startTime'].value_counts().sort_index().reset_index()
@@ -356,7 +432,7 @@ def render_ev_analysis(ev_charge):
         
         fig4 = px.line(hourly_data, x='Hour', y='Sessions',
                       title='시간대별 충전 시작 패턴', markers=True)
-        st.plotly_chart(fig4, use_container_width=True)
+        plotly_chart(fig4, use_container_width=True)
     
     with tab3:
         # 위치별 통계
@@ -370,6 +446,7 @@ def render_ev_analysis(ev_charge):
         st.subheader("위치별 충전 통계 (상위 20개)")
         st.dataframe(location_stats.head(20), use_container_width=True)
 
+@profiled
 def render_medical_analysis(medical_cost):
     """의료비 분석 페이지"""
     st.header("🏥 의료비 영향 요인 분석")
@@ -390,6 +467,7 @@ def render_medical_analysis(medical_cost):
         (medical_cost['smoker'].isin(smoker_filter)) &
         (medical_cost['region'].isin(region_filter))
     ]
+    filter_state = (age_range, tuple(gender_filter), tuple(smoker_filter), tuple(region_filter))
     
     # 기본 통계
     col1, col2, col3, col4 = st.columns(4)
@@ -414,33 +492,35 @@ def render_medical_analysis(medical_cost):
         col1, col2 = st.columns(2)
         
         with col1:
-            fig1 = px.histogram(filtered_data, x='charges', nbins=30,
-                               title='의료비 분포')
-            st.plotly_chart(fig1, use_container_width=True)
+            charges_hist = get_histogram('medical_cost', 'charges', filter_state, 30,
+                                         _data=filtered_data)
+            fig1 = make_histogram(charges_hist, title='의료비 분포')
+            plotly_chart(fig1, use_container_width=True)
         
         with col2:
-            fig2 = px.histogram(filtered_data, x='age', nbins=20,
-                               title='나이 분포')
-            st.plotly_chart(fig2, use_container_width=True)
+            age_hist = get_histogram('medical_cost', 'age', filter_state, 20,
+                                     _data=filtered_data)
+            fig2 = make_histogram(age_hist, title='나이 분포')
+            plotly_chart(fig2, use_container_width=True)
     
     with tab2:
         # 흡연 여부별 의료비
-        fig3 = px.box(filtered_data, x='smoker', y='charges', color='smoker',
-                     title='흡연 여부별 의료비 분포')
-        st.plotly_chart(fig3, use_container_width=True)
+        fig3 = make_box(filtered_data, x='smoker', y='charges', color='smoker',
+                        title='흡연 여부별 의료비 분포')
+        plotly_chart(fig3, use_container_width=True)
         
         # 나이 vs 의료비
-        fig4 = px.scatter(filtered_data, x='age', y='charges', color='smoker',
-                         size='bmi', title='나이 vs 의료비 (흡연 여부별)',
-                         hover_data=['sex', 'children', 'region'])
-        st.plotly_chart(fig4, use_container_width=True)
+        fig4 = make_scatter(filtered_data, x='age', y='charges', color='smoker',
+                           size='bmi', title='나이 vs 의료비 (흡연 여부별)',
+                           hover_data=['sex', 'children', 'region'])
+        plotly_chart(fig4, use_container_width=True)
     
     with tab3:
         # BMI vs 의료비
         fig5 = px.scatter(filtered_data, x='bmi', y='charges', color='sex',
                          facet_col='smoker', title='BMI vs 의료비 (성별 및 흡연 여부별)',
                          trendline='ols')
-        st.plotly_chart(fig5, use_container_width=True)
+        plotly_chart(fig5, use_container_width=True)
     
     with tab4:
         st.subheader("🤖 간단한 의료비 예측")
@@ -482,6 +562,7 @@ def render_medical_analysis(medical_cost):
                 avg_similar = similar_data['charges'].mean()
                 st.info(f"유사한 조건의 평균 의료비: ${avg_similar:,.0f}")
 
+@profiled
 def render_covid_analysis(covid_india):
     """Covid-19 인도 데이터 분석 페이지"""
     st.header("🦠 Covid-19 인도 데이터 분석")
@@ -571,7 +652,7 @@ def render_covid_analysis(covid_india):
                 hovermode='x unified',
                 height=500
             )
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
         else:
             metric_map = {
                 "확진자": "confirmed",
@@ -583,14 +664,14 @@ def render_covid_analysis(covid_india):
             
             fig = px.line(daily_total, x='date', y=selected_metric,
                          title=f'{metric_option} 추이')
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
         
         # 일일 신규 확진자
         daily_total['daily_new'] = daily_total['confirmed'].diff().fillna(0)
         
         fig2 = px.bar(daily_total, x='date', y='daily_new',
                      title='일일 신규 확진자 수')
-        st.plotly_chart(fig2, use_container_width=True)
+        plotly_chart(fig2, use_container_width=True)
     
     with tab2:
         # 지역별 비교
@@ -608,7 +689,7 @@ def render_covid_analysis(covid_india):
                          color='confirmed',
                          color_continuous_scale='Reds')
             fig1.update_layout(yaxis_title='지역', xaxis_title='확진자 수')
-            st.plotly_chart(fig1, use_container_width=True)
+            plotly_chart(fig1, use_container_width=True)
         
         with col2:
             # 치명률 계산
@@ -623,14 +704,14 @@ def render_covid_analysis(covid_india):
                          color='fatality_rate',
                          color_continuous_scale='OrRd')
             fig2.update_layout(yaxis_title='지역', xaxis_title='치명률 (%)')
-            st.plotly_chart(fig2, use_container_width=True)
+            plotly_chart(fig2, use_container_width=True)
         
         # 지역별 시계열 비교
         st.subheader("선택된 지역 시계열 비교")
         
         fig3 = px.line(filtered_data, x='date', y='confirmed', color='region',
                       title='지역별 확진자 추이')
-        st.plotly_chart(fig3, use_container_width=True)
+        plotly_chart(fig3, use_container_width=True)
     
     with tab3:
         # 현황 대시보드
@@ -650,7 +731,7 @@ def render_covid_analysis(covid_india):
             fig1 = px.pie(values=list(status_data.values()), names=list(status_data.keys()),
                          title='현재 상태별 분포',
                          color_discrete_map={'활성 환자': 'orange', '완치자': 'green', '사망자': 'gray'})
-            st.plotly_chart(fig1, use_container_width=True)
+            plotly_chart(fig1, use_container_width=True)
         
         with col2:
             # 지역별 확진자 분포
@@ -663,7 +744,7 @@ def render_covid_analysis(covid_india):
             
             fig2 = px.pie(top_regions_pie, values='confirmed', names='region',
                          title='지역별 확진자 분포')
-            st.plotly_chart(fig2, use_container_width=True)
+            plotly_chart(fig2, use_container_width=True)
         
         # 히트맵 - 지역별 지표
         st.subheader("지역별 주요 지표 히트맵")
@@ -680,7 +761,7 @@ def render_covid_analysis(covid_india):
                         color_continuous_scale='YlOrRd',
                         title='지역별 주요 지표 히트맵 (정규화)')
         fig3.update_layout(height=400)
-        st.plotly_chart(fig3, use_container_width=True)
+        plotly_chart(fig3, use_container_width=True)
     
     with tab4:
         # 증가율 분석
@@ -704,7 +785,7 @@ def render_covid_analysis(covid_india):
             hovermode='x unified',
             height=400
         )
-        st.plotly_chart(fig1, use_container_width=True)
+        plotly_chart(fig1, use_container_width=True)
         
         # 주간 통계
         st.subheader("주간 통계")
@@ -722,8 +803,9 @@ def render_covid_analysis(covid_india):
         
         fig2 = px.bar(weekly_data, x='date', y='weekly_new',
                      title='주간 신규 확진자 수')
-        st.plotly_chart(fig2, use_container_width=True)
+        plotly_chart(fig2, use_container_width=True)
 
+@profiled
 def render_product_inspection(product_inspection):
     """제품 검사 데이터 분석 페이지"""
     st.header("🏭 제품 검사 품질 관리 분석")
@@ -749,6 +831,7 @@ def render_product_inspection(product_inspection):
         (product_inspection['date'].dt.date <= end_date) &
         (product_inspection['inspection_step'].isin(selected_steps))
     ]
+    filter_state = (start_date, end_date, tuple(selected_steps))
     
     # 기본 통계
     col1, col2, col3, col4 = st.columns(4)
@@ -839,7 +922,7 @@ def render_product_inspection(product_inspection):
                 height=500
             )
             
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
             
             # 이상점 검출
             out_of_control = step_data[(step_data['value'] > ucl) | (step_data['value'] < lcl)]
@@ -867,9 +950,12 @@ def render_product_inspection(product_inspection):
         
         with col1:
             # 히스토그램
-            fig1 = px.histogram(filtered_data, x='value', nbins=30,
-                               title='측정값 분포',
-                               color='inspection_step')
+            value_hist = get_histogram('product_inspection', 'value', filter_state, 30,
+                                       color='inspection_step', _data=filtered_data)
+            # 단계 합산은 같은 구간 경계의 건수를 더하기만 하면 됨 (재계산 없음)
+            if st.checkbox("검사 단계 합산 보기", key='inspection_hist_merge'):
+                value_hist = merge_histograms(value_hist, name='전체')
+            fig1 = make_histogram(value_hist, title='측정값 분포')
             
             # 스펙 라인 추가
             fig1.add_vline(x=filtered_data['upper_spec'].iloc[0], line_dash="dash", 
@@ -879,12 +965,12 @@ def render_product_inspection(product_inspection):
             fig1.add_vline(x=filtered_data['target'].iloc[0], line_dash="dash", 
                           line_color="green", annotation_text="Target")
             
-            st.plotly_chart(fig1, use_container_width=True)
+            plotly_chart(fig1, use_container_width=True)
         
         with col2:
             # 박스 플롯
-            fig2 = px.box(filtered_data, x='inspection_step', y='value',
-                         title='검사 단계별 측정값 분포')
+            fig2 = make_box(filtered_data, x='inspection_step', y='value',
+                            title='검사 단계별 측정값 분포')
             
             # 스펙 라인 추가
             fig2.add_hline(y=filtered_data['upper_spec'].iloc[0], line_dash="dash", 
@@ -894,7 +980,7 @@ def render_product_inspection(product_inspection):
             fig2.add_hline(y=filtered_data['target'].iloc[0], line_dash="dash", 
                           line_color="green", annotation_text="Target")
             
-            st.plotly_chart(fig2, use_container_width=True)
+            plotly_chart(fig2, use_container_width=True)
         
         # 기술통계
         st.subheader("기술통계")
@@ -968,7 +1054,7 @@ def render_product_inspection(product_inspection):
                              barmode='group')
                 fig1.add_hline(y=1.33, line_dash="dash", line_color="green", 
                               annotation_text="목표 수준 (1.33)")
-                st.plotly_chart(fig1, use_container_width=True)
+                plotly_chart(fig1, use_container_width=True)
             
             with col2:
                 # 공정능력 등급 판정
@@ -1005,7 +1091,7 @@ def render_product_inspection(product_inspection):
                                      "즉시 개선": "red"
                                  })
                 fig2.update_traces(textposition='top center')
-                st.plotly_chart(fig2, use_container_width=True)
+                plotly_chart(fig2, use_container_width=True)
     
     with tab4:
         # 트렌드 분석
@@ -1050,7 +1136,7 @@ def render_product_inspection(product_inspection):
                 height=400
             )
             
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
         
         # 상관관계 분석 (여러 검사 단계가 있을 경우)
         if len(selected_steps) > 1:
@@ -1071,8 +1157,9 @@ def render_product_inspection(product_inspection):
                            labels=dict(x="검사 단계", y="검사 단계", color="상관계수"),
                            color_continuous_scale='RdBu_r',
                            title='검사 단계 간 상관관계 히트맵')
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
 
+@profiled
 def render_co2_analysis(co2_data):
     """CO2 배출량 분석 페이지 - 기존 함수 찾아서 추가"""
     st.header("🌱 CO2 배출량 데이터 분석")
@@ -1098,6 +1185,7 @@ def render_co2_analysis(co2_data):
     filtered_data = co2_data[co2_data['Make'].isin(makes)]
     if 'Fuel Type' in co2_data.columns and fuel_types:
         filtered_data = filtered_data[filtered_data['Fuel Type'].isin(fuel_types)]
+    filter_state = (tuple(makes), tuple(fuel_types))
     
     # 기본 통계
     col1, col2, col3, col4 = st.columns(4)
@@ -1130,14 +1218,14 @@ def render_co2_analysis(co2_data):
                      labels={'x': 'CO2 배출량 (g/km)', 'y': '제조사'},
                      color=make_avg.values,
                      color_continuous_scale='RdYlGn_r')
-        st.plotly_chart(fig1, use_container_width=True)
+        plotly_chart(fig1, use_container_width=True)
         
         # 제조사별 차량 수
         make_count = filtered_data['Make'].value_counts()
         
         fig2 = px.pie(values=make_count.values, names=make_count.index,
                      title='제조사별 차량 분포')
-        st.plotly_chart(fig2, use_container_width=True)
+        plotly_chart(fig2, use_container_width=True)
     
     with tab2:
         if 'Fuel Type' in co2_data.columns:
@@ -1146,12 +1234,12 @@ def render_co2_analysis(co2_data):
             
             fig3 = px.bar(fuel_avg, title='연료 타입별 평균 CO2 배출량',
                          labels={'value': 'CO2 배출량 (g/km)', 'index': '연료 타입'})
-            st.plotly_chart(fig3, use_container_width=True)
+            plotly_chart(fig3, use_container_width=True)
             
             # 연료 타입별 분포
-            fig4 = px.box(filtered_data, x='Fuel Type', y='CO2 Emissions(g/km)',
-                         title='연료 타입별 CO2 배출량 분포')
-            st.plotly_chart(fig4, use_container_width=True)
+            fig4 = make_box(filtered_data, x='Fuel Type', y='CO2 Emissions(g/km)',
+                            title='연료 타입별 CO2 배출량 분포')
+            plotly_chart(fig4, use_container_width=True)
         else:
             st.info("연료 타입 정보가 없습니다.")
     
@@ -1159,9 +1247,10 @@ def render_co2_analysis(co2_data):
         # 상세 분석
         st.subheader("CO2 배출량 분포")
         
-        fig5 = px.histogram(filtered_data, x='CO2 Emissions(g/km)', nbins=30,
-                           title='CO2 배출량 히스토그램')
-        st.plotly_chart(fig5, use_container_width=True)
+        co2_hist = get_histogram('co2_data', 'CO2 Emissions(g/km)', filter_state, 30,
+                                 _data=filtered_data)
+        fig5 = make_histogram(co2_hist, title='CO2 배출량 히스토그램')
+        plotly_chart(fig5, use_container_width=True)
         
         # 상위/하위 차량
         col1, col2 = st.columns(2)
@@ -1176,6 +1265,180 @@ def render_co2_analysis(co2_data):
             top_polluters = filtered_data.nlargest(10, 'CO2 Emissions(g/km)')[['Make', 'Model', 'CO2 Emissions(g/km)']] if 'Model' in filtered_data.columns else filtered_data.nlargest(10, 'CO2 Emissions(g/km)')[['Make', 'CO2 Emissions(g/km)']]
             st.dataframe(top_polluters, use_container_width=True)
 
+@profiled
+def render_internet_analysis(panel):
+    """글로벌 인터넷 사용자 분석 페이지"""
+    st.header("🌐 글로벌 인터넷 사용자 분석")
+    
+    metric_labels = {
+        "인터넷 사용률 (%)": "Internet Users(%)",
+        "이동전화 가입 (100명당)": "Cellular Subscription",
+        "초고속인터넷 가입 (100명당)": "Broadband Subscription"
+    }
+    
+    # 필터링 옵션
+    st.sidebar.subheader("🗺️ 지도 설정")
+    metric_label = st.sidebar.selectbox("지표 선택", list(metric_labels))
+    metric = metric_labels[metric_label]
+    
+    detail_options = list(TOLERANCES) + ["내장 지도 (Plotly)"]
+    detail = st.sidebar.selectbox("지도 간략화 수준", detail_options, index=1)
+    
+    first_year, last_year = int(panel.years[0]), int(panel.years[-1])
+    animate = st.sidebar.checkbox("연도 애니메이션", value=False)
+    if animate:
+        year_range = st.sidebar.slider("연도 범위", first_year, last_year, (2000, last_year))
+        selected_years = [y for y in panel.years if year_range[0] <= y <= year_range[1]]
+    else:
+        selected_years = [st.sidebar.slider("연도", first_year, last_year, last_year)]
+    latest_year = selected_years[-1]
+    
+    # 연도별 값은 (국가 x 연도) 배열의 열 슬라이스
+    values_by_year = {year: panel.year_slice(metric, year) for year in selected_years}
+    latest_values = values_by_year[latest_year]
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("국가 수", f"{np.isfinite(latest_values).sum()}개")
+    with col2:
+        st.metric(f"{latest_year}년 평균", f"{np.nanmean(latest_values):.1f}")
+    with col3:
+        top_code, top_name, top_value = panel.top_n(metric, latest_year, 1)[0]
+        st.metric(f"{latest_year}년 최대", f"{top_value:.1f}", top_name)
+    
+    tab1, tab2, tab3 = st.tabs(["🗺️ 세계 지도", "📈 국가별 추이", "🏆 상위 국가"])
+    
+    with tab1:
+        # 지오메트리 선택 (간략화된 GeoJSON 또는 Plotly 내장 지도)
+        geojson = None
+        if detail in TOLERANCES:
+            geojson = get_world_geometry(TOLERANCES[detail])
+            covered = {feature['id'] for feature in geojson['features']}
+            st.caption(f"지오메트리 보유 국가: {len(covered & set(panel.codes))}/{len(panel.codes)}개 "
+                       f"(허용 오차 {TOLERANCES[detail]}°)")
+        
+        fig = make_choropleth(panel.codes, values_by_year, geojson=geojson,
+                              title=f'국가별 {metric_label}',
+                              colorbar_title=metric_label,
+                              hover_names=panel.names.tolist())
+        fig.update_layout(height=550)
+        plotly_chart(fig, use_container_width=True)
+    
+    with tab2:
+        # 국가별 추이는 (국가 x 연도) 배열의 행 슬라이스
+        default_codes = [code for code, _, _ in panel.top_n(metric, latest_year, 5)]
+        selected_codes = st.multiselect(
+            "국가 선택",
+            panel.codes.tolist(),
+            default=default_codes,
+            format_func=lambda code: f"{panel.names[panel.code_index[code]]} ({code})"
+        )
+        
+        fig = go.Figure()
+        for code in selected_codes:
+            fig.add_trace(go.Scatter(x=panel.years, y=panel.country_series(metric, code),
+                                     mode='lines', name=panel.names[panel.code_index[code]]))
+        fig.update_layout(title=f'국가별 {metric_label} 추이', xaxis_title='연도',
+                          yaxis_title=metric_label, hovermode='x unified', height=450)
+        plotly_chart(fig, use_container_width=True)
+    
+    with tab3:
+        top_count = st.slider("표시할 국가 수", 5, 30, 15)
+        ranking = pd.DataFrame(panel.top_n(metric, latest_year, top_count),
+                               columns=['Code', '국가', metric_label])
+        
+        fig = px.bar(ranking, x=metric_label, y='국가', orientation='h',
+                     title=f'{latest_year}년 {metric_label} 상위 {top_count}개 국가',
+                     color=metric_label, color_continuous_scale='Blues')
+        fig.update_layout(yaxis=dict(autorange='reversed'), height=500)
+        plotly_chart(fig, use_container_width=True)
+
+# LLM 채팅 설정
+CHAT_MODEL = "gpt-4o-mini"
+CHAT_HISTORY_MESSAGES = 20  # 요청에 포함할 최근 메시지 수
+
+def chat_system_prompt(datasets):
+    """데이터셋 이름, 행 수, 컬럼으로 만든 시스템 프롬프트 (매 요청 같은 내용이라 프롬프트 캐시에 유리)"""
+    lines = [f"- {name}: {len(df):,}행, 컬럼 {', '.join(map(str, df.columns))}"
+             for name, df in datasets.items()]
+    return ("당신은 이 대시보드의 데이터셋에 대한 질문에 답하는 한국어 데이터 분석 도우미입니다.\n"
+            "사용 가능한 데이터셋:\n" + "\n".join(lines))
+
+def stream_deltas(stream, timing, started):
+    """
+    스트리밍 응답에서 텍스트 조각만 꺼내면서 첫 토큰 시간과 전체 시간 기록
+
+    started는 요청을 보내기 직전 시각 - 요청 왕복과 서버 대기 시간까지 첫 토큰 시간에 포함됨
+    """
+    try:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                timing.setdefault('ttft', perf_counter() - started)
+                yield chunk.choices[0].delta.content
+    finally:
+        stream.close()  # 중간에 멈춰도 연결을 풀에 반납
+        timing['total'] = perf_counter() - started
+
+@profiled
+def render_chat_page(datasets):
+    """데이터 챗봇 페이지"""
+    st.header("💬 데이터 챗봇")
+    st.caption("대시보드 데이터셋에 대해 질문해 보세요. 답변은 생성되는 대로 바로 표시됩니다.")
+    
+    # 대화 기록은 세션별로 유지
+    if 'chat_history' not in st.session_state:
+        st.session_state.chat_history = []
+    
+    st.sidebar.subheader("💬 챗봇 설정")
+    temperature = st.sidebar.slider("Temperature", 0.0, 1.5, 0.3, 0.1)
+    if st.sidebar.button("대화 지우기"):
+        st.session_state.chat_history = []
+    
+    try:
+        client = get_llm_client()
+    except OpenAIError as e:
+        st.warning(f"OpenAI 클라이언트를 만들 수 없습니다. OPENAI_API_KEY 환경변수를 확인하세요. ({e})")
+        return
+    
+    for message in st.session_state.chat_history:
+        with st.chat_message(message['role']):
+            st.markdown(message['content'])
+            if message.get('caption'):
+                st.caption(message['caption'])
+    
+    prompt = st.chat_input("질문을 입력하세요")
+    if not prompt:
+        return
+    
+    st.session_state.chat_history.append({'role': 'user', 'content': prompt})
+    with st.chat_message('user'):
+        st.markdown(prompt)
+    
+    messages = [{'role': 'system', 'content': chat_system_prompt(datasets)}]
+    messages += [{'role': m['role'], 'content': m['content']}
+                 for m in st.session_state.chat_history[-CHAT_HISTORY_MESSAGES:]]
+    
+    with st.chat_message('assistant'):
+        timing = {}
+        started = perf_counter()
+        try:
+            stream = client.chat.completions.create(
+                model=CHAT_MODEL, messages=messages, temperature=temperature,
+                max_tokens=800, stream=True
+            )
+            reply = st.write_stream(stream_deltas(stream, timing, started))
+        except (OpenAIError, httpx.HTTPError) as e:
+            # 답이 없는 질문을 남기면 다음 요청에 사용자 턴이 연달아 들어가므로 기록에서 뺌
+            st.session_state.chat_history.pop()
+            st.error(f"응답 생성 실패: {e}")
+            return
+        
+        caption = f"⏱️ 첫 토큰 {timing.get('ttft', timing['total']) * 1000:.0f}ms · 전체 {timing['total']:.1f}초"
+        st.caption(caption)
+    
+    st.session_state.chat_history.append({'role': 'assistant', 'content': reply, 'caption': caption})
+
+@profiled
 def render_streamlit_components():
     """스트림릿 구성요소 실습 페이지"""
     st.header("🔧 스트림릿 구성요소 실습")
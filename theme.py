@@ -0,0 +1,75 @@
+# 스트림릿 대시보드 공통 테마(CSS) 로더
+# CSS를 프로세스당 한 번만 읽고 압축(minify)해 두었다가 파일 수정 시각(mtime)이
+# 바뀔 때만 다시 읽습니다. 매 rerun마다 디스크를 읽지 않고, 주석과 공백을 뺀
+# 작은 <style> 블록만 브라우저로 보냅니다.
+
+import functools
+import os
+import re
+import threading
+
+import streamlit as st
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_WHITESPACE = re.compile(r"\s+")
+_AROUND_PUNCT = re.compile(r"\s*([{};,>])\s*")
+_AFTER_COLON = re.compile(r":\s+")
+
+# 경로 -> (수정 시각, 압축된 CSS)
+_stylesheets = {}
+_lock = threading.Lock()
+
+
+def _minify(css):
+    css = _COMMENT.sub("", css)
+    css = _WHITESPACE.sub(" ", css)
+    css = _AROUND_PUNCT.sub(r"\1", css)
+    css = _AFTER_COLON.sub(":", css)
+    return css.replace(";}", "}").strip()
+
+
+@functools.lru_cache(maxsize=32)
+def minify_css(css):
+    """CSS 문자열에서 주석과 불필요한 공백 제거 (같은 문자열은 한 번만 처리)"""
+    return _minify(css)
+
+
+def load_stylesheet(path):
+    """
+    CSS 파일을 압축해서 반환
+
+    수정 시각이 마지막으로 읽었을 때와 같으면 캐시된 결과를 그대로 돌려주므로
+    rerun마다 드는 비용은 os.stat 한 번뿐입니다. 파일이 없으면 FileNotFoundError.
+    """
+    mtime = os.path.getmtime(path)
+    with _lock:
+        cached = _stylesheets.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        css = _minify(f.read())
+    with _lock:
+        _stylesheets[path] = (mtime, css)
+    return css
+
+
+def apply_css(css):
+    """CSS 문자열을 압축해 페이지에 적용"""
+    st.markdown(f"<style>{minify_css(css)}</style>", unsafe_allow_html=True)
+
+
+def apply_stylesheet(path, fallback=None):
+    """
+    CSS 파일을 페이지에 적용하고 성공 여부를 반환
+
+    파일이 없으면 fallback CSS(주어진 경우)를 대신 적용하고 False를 반환합니다.
+    """
+    try:
+        css = load_stylesheet(path)
+    except FileNotFoundError:
+        if fallback:
+            apply_css(fallback)
+        return False
+    st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+    return True
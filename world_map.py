@@ -0,0 +1,206 @@
+# 세계 지도 지오메트리 전처리
+# 15주차 클라우드 기반 데이터 시각화 - 코로플레스(Choropleth) 전송량 최적화
+#
+# world_countries.json 폴리곤을 Douglas-Peucker 알고리즘으로 간략화하고
+# 좌표 소수점 자릿수를 줄여(양자화) ISO_A3 코드 기준으로 캐시합니다.
+
+import json
+import math
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+GEOJSON_PATH = "dataset/world_countries.json"
+CACHE_DIR = ".cache/geometry"
+
+# 간략화 수준별 허용 오차 (단위: 경위도 degree)
+TOLERANCES = {
+    "상세": 0.01,
+    "보통": 0.05,
+    "간략": 0.2,
+}
+
+
+def douglas_peucker(points, tolerance):
+    """
+    Douglas-Peucker 선 간략화
+
+    시작점과 끝점을 잇는 선분에서 tolerance보다 멀리 떨어진 점만 남깁니다.
+    재귀 대신 스택을 사용하여 긴 해안선에서도 재귀 한도에 걸리지 않습니다.
+    """
+    points = np.asarray(points, dtype=float)
+    n_points = len(points)
+    if n_points < 3 or tolerance <= 0:
+        return points
+
+    keep = np.zeros(n_points, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n_points - 1)]
+
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        segment = points[end] - points[start]
+        between = points[start + 1:end] - points[start]
+        length = math.hypot(segment[0], segment[1])
+
+        if length == 0:
+            distances = np.hypot(between[:, 0], between[:, 1])
+        else:
+            distances = np.abs(segment[0] * between[:, 1] - segment[1] * between[:, 0]) / length
+
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            index = start + 1 + farthest
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+
+    return points[keep]
+
+
+def _simplify_ring(ring, tolerance, decimals, is_exterior):
+    """폴리곤 링 하나를 간략화 (너무 작아진 구멍은 제거, 외곽선은 원본 유지)"""
+    simplified = np.round(douglas_peucker(ring, tolerance), decimals)
+    if len(simplified) >= 4:
+        return simplified.tolist()
+    if is_exterior:
+        return np.round(np.asarray(ring, dtype=float), decimals).tolist()
+    return None
+
+
+def _simplify_polygon(polygon, tolerance, decimals):
+    rings = []
+    for i, ring in enumerate(polygon):
+        simplified = _simplify_ring(ring, tolerance, decimals, is_exterior=(i == 0))
+        if simplified is not None:
+            rings.append(simplified)
+    return rings
+
+
+def simplify_geometry(geometry, tolerance, decimals):
+    """Polygon / MultiPolygon 지오메트리 간략화 및 좌표 양자화"""
+    if geometry['type'] == 'Polygon':
+        coordinates = _simplify_polygon(geometry['coordinates'], tolerance, decimals)
+    elif geometry['type'] == 'MultiPolygon':
+        coordinates = [_simplify_polygon(polygon, tolerance, decimals)
+                       for polygon in geometry['coordinates']]
+    else:
+        coordinates = geometry['coordinates']
+    return {'type': geometry['type'], 'coordinates': coordinates}
+
+
+def decimals_for(tolerance):
+    """허용 오차보다 한 자리 더 정밀한 소수점 자릿수"""
+    return max(1, math.ceil(-math.log10(tolerance)) + 1)
+
+
+def simplify_geojson(geojson, tolerance):
+    """
+    FeatureCollection 전체를 간략화하여 ISO_A3 코드를 feature id로 하는
+    가벼운 FeatureCollection 반환 (속성은 이름과 코드만 유지)
+    """
+    decimals = decimals_for(tolerance)
+    features = []
+    for feature in geojson['features']:
+        iso_a3 = feature['properties'].get('iso_a3')
+        if not iso_a3 or iso_a3 == '-99':
+            continue
+        features.append({
+            'type': 'Feature',
+            'id': iso_a3,
+            'properties': {'name': feature['properties'].get('name'), 'iso_a3': iso_a3},
+            'geometry': simplify_geometry(feature['geometry'], tolerance, decimals),
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def load_world_geometry(tolerance, path=GEOJSON_PATH, cache_dir=CACHE_DIR):
+    """
+    간략화된 세계 지도 GeoJSON 로드
+
+    결과는 원본 파일 수정 시각과 허용 오차별로 디스크에 캐시되므로
+    원본이 바뀌지 않는 한 간략화는 한 번만 수행됩니다.
+    """
+    source_mtime = int(os.path.getmtime(path))
+    cache_path = os.path.join(cache_dir, f"world_{tolerance}_{source_mtime}.json")
+
+    if os.path.exists(cache_path):
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        geojson = json.load(f)
+    simplified = simplify_geojson(geojson, tolerance)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(simplified, f, separators=(',', ':'))
+    return simplified
+
+
+def make_choropleth(locations, values_by_year, geojson=None, title=None,
+                    colorbar_title=None, colorscale='Blues', hover_names=None):
+    """
+    연도별 값 배열로 코로플레스 차트 생성
+
+    지오메트리(geojson)와 국가 코드(locations)는 첫 트레이스에 한 번만 넣고,
+    애니메이션 프레임에는 연도별 값 배열(z)만 담아 전송량을 줄입니다.
+    geojson이 없으면 Plotly 내장 국가 경계(locationmode='ISO-3')를 사용합니다.
+    """
+    years = list(values_by_year)
+    all_values = np.concatenate([np.asarray(v, dtype=float) for v in values_by_year.values()])
+    finite = all_values[np.isfinite(all_values)]
+    zmin, zmax = (float(finite.min()), float(finite.max())) if len(finite) else (0.0, 1.0)
+
+    location_options = {'geojson': geojson} if geojson is not None else {'locationmode': 'ISO-3'}
+    fig = go.Figure(go.Choropleth(
+        locations=list(locations),
+        z=values_by_year[years[0]],
+        text=hover_names,
+        zmin=zmin,
+        zmax=zmax,  # 연도가 바뀌어도 색상 범위 고정
+        colorscale=colorscale,
+        colorbar=dict(title=colorbar_title),
+        hovertemplate='%{text} (%{location})<br>%{z:,.2f}<extra></extra>',
+        **location_options
+    ))
+
+    if len(years) > 1:
+        fig.frames = [
+            go.Frame(name=str(year), data=[go.Choropleth(z=values_by_year[year])], traces=[0])
+            for year in years
+        ]
+        fig.update_layout(
+            updatemenus=[dict(
+                type='buttons',
+                showactive=False,
+                x=0, y=0, xanchor='left', yanchor='top',
+                buttons=[
+                    dict(label='▶ 재생', method='animate',
+                         args=[None, dict(frame=dict(duration=300, redraw=True), fromcurrent=True)]),
+                    dict(label='⏸ 정지', method='animate',
+                         args=[[None], dict(frame=dict(duration=0, redraw=False), mode='immediate')]),
+                ],
+            )],
+            sliders=[dict(
+                active=0,
+                x=0.1, len=0.9,
+                currentvalue=dict(prefix='연도: '),
+                steps=[dict(label=str(year), method='animate',
+                            args=[[str(year)], dict(frame=dict(duration=0, redraw=True), mode='immediate')])
+                       for year in years],
+            )],
+        )
+
+    fig.update_layout(
+        title=title,
+        geo=dict(showframe=False, showcoastlines=True, projection_type='natural earth'),
+        margin=dict(l=0, r=0, t=50, b=0),
+    )
+    if geojson is not None:
+        fig.update_geos(fitbounds='locations')
+    return fig